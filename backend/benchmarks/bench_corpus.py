@@ -0,0 +1,268 @@
+"""Reproducible OCR accuracy/latency benchmark on a synthetic lyric-sheet corpus.
+
+Lyric sheets mixing Hindi, IAST and English lines are rendered offline from a
+fixed seed and degraded (blur, JPEG noise, skew, low resolution). Every
+strategy/config candidate, and the full `extract_text_like_imagetotext`
+pipeline as currently configured, runs over the whole corpus in its own
+subprocess. The report gives wall time, peak RSS and mean character error rate
+per candidate, and can be saved as a JSON baseline that later runs compare
+against.
+
+The fonts ship in benchmarks/fonts/ (override with --devanagari-font and
+--latin-font): NotoSerifDevanagari-Regular.ttf and NotoSans-Regular.ttf from
+Google's Noto project, under the SIL Open Font License in fonts/OFL.txt. A
+missing font is an error, since a corpus without Hindi lines or IAST diacritics
+would not measure Devanagari OCR. Devanagari is only shaped correctly when
+Pillow is built with libraqm. The fonts and shaping engine are recorded in the
+baseline, and comparing runs with different ones prints a warning.
+
+Usage (from the backend directory):
+    python benchmarks/bench_corpus.py [--sheets 4] [--json baseline.json] [--baseline baseline.json]
+"""
+import argparse
+import io
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageFont, features
+
+import main
+from bench_selection import character_error_rate
+
+FONTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts")
+
+HINDI_LINES = [
+    "श्री राधे गोविंद मधुर सिद्धांत",
+    "हरि बोल हरि बोल मन मेरे",
+    "राधा नाम की महिमा अपार",
+    "कृष्ण कृपा से मिले सुख सारे",
+    "प्रेम भक्ति का मार्ग सरल है",
+    "गुरु चरणों में शीश झुकाओ",
+    "भजन करो मन निशदिन प्यारे",
+    "सांवरिया मन भाया रे",
+]
+IAST_LINES = [
+    "śrī rādhe govinda madhura siddhānta",
+    "hari bola hari bola mana mere",
+    "rādhā nāma kī mahimā apāra",
+    "kṛṣṇa kṛpā se mile sukha sāre",
+    "prema bhakti kā mārga sarala hai",
+    "guru caraṇoṃ meṃ śīśa jhukāo",
+]
+ENGLISH_LINES = [
+    "Chorus: repeat twice",
+    "Sing this verse slowly",
+    "Love is the path to the divine",
+    "Verse 2",
+    "All together now",
+    "The name of Radha is sweet",
+]
+
+DEGRADATIONS = ["clean", "blur", "jpeg", "skew", "lowres"]
+
+
+def load_fonts(devanagari_font: str, latin_font: str, size: int) -> dict:
+    """{"devanagari": font, "latin": font, "names": {...}}; exits if a font file is missing"""
+    layout_engine = ImageFont.Layout.RAQM if features.check("raqm") else ImageFont.Layout.BASIC
+    fonts = {"names": {}}
+    for script, path in (("devanagari", devanagari_font), ("latin", latin_font)):
+        if not os.path.exists(path):
+            sys.exit(f"❌ {script} font {path} not found; the bundled fonts live in {FONTS_DIR}")
+        fonts[script] = ImageFont.truetype(path, size, layout_engine=layout_engine)
+        fonts["names"][script] = os.path.basename(path)
+    if layout_engine != ImageFont.Layout.RAQM:
+        print("⚠️ Pillow is built without libraqm, Devanagari conjuncts and matras will not be shaped")
+    fonts["names"]["shaping"] = "raqm" if layout_engine == ImageFont.Layout.RAQM else "basic"
+    return fonts
+
+
+def render_sheet(lines: list, fonts: dict, size: int) -> Image.Image:
+    """Render (script, text) lines as a white lyric sheet"""
+    line_height = int(size * 1.8)
+    sheet = Image.new("RGB", (1600, 2 * size + line_height * len(lines)), "white")
+    draw = ImageDraw.Draw(sheet)
+    for index, (script, text) in enumerate(lines):
+        draw.text((2 * size, size + index * line_height), text, fill="black", font=fonts[script])
+    return sheet
+
+
+def degrade(sheet: Image.Image, degradation: str, rng: random.Random) -> bytes:
+    """Apply one degradation and encode the sheet as the upload would arrive"""
+    image_format = "PNG"
+    save_options = {}
+    if degradation == "blur":
+        sheet = sheet.filter(ImageFilter.GaussianBlur(radius=rng.uniform(1.2, 2.0)))
+    elif degradation == "jpeg":
+        image_format = "JPEG"
+        save_options["quality"] = rng.randint(15, 30)
+    elif degradation == "skew":
+        sheet = sheet.rotate(rng.uniform(-4.0, 4.0), resample=Image.Resampling.BICUBIC, expand=True, fillcolor="white")
+    elif degradation == "lowres":
+        scale = rng.uniform(0.35, 0.5)
+        sheet = sheet.resize((int(sheet.width * scale), int(sheet.height * scale)), Image.Resampling.BILINEAR)
+
+    buffer = io.BytesIO()
+    sheet.save(buffer, format=image_format, **save_options)
+    return buffer.getvalue()
+
+
+def build_corpus(seed: int, sheets: int, fonts: dict, size: int = 36) -> list:
+    """Deterministic samples: [{"name", "degradation", "image", "truth"}]"""
+    rng = random.Random(seed)
+    pools = [("devanagari", HINDI_LINES), ("latin", IAST_LINES), ("latin", ENGLISH_LINES)]
+
+    samples = []
+    for sheet_index in range(sheets):
+        lines = []
+        for _ in range(rng.randint(6, 10)):
+            script, pool = rng.choice(pools)
+            lines.append((script, rng.choice(pool)))
+        sheet = render_sheet(lines, fonts, size)
+        truth = "\n".join(text for _, text in lines)
+        for degradation in DEGRADATIONS:
+            samples.append({
+                "name": f"sheet{sheet_index}_{degradation}",
+                "degradation": degradation,
+                "image": degrade(sheet, degradation, rng),
+                "truth": truth,
+            })
+    return samples
+
+
+def ocr_with_candidate(image_bytes: bytes, strategy_name: str, lang: str, config: str) -> str:
+    """OCR one sample with a single strategy/config, on the page as the pipeline would prepare it"""
+    graph = main.PreprocessingGraph(np.asarray(Image.open(io.BytesIO(image_bytes)).convert("RGB")))
+    if main.OCR_NORMALIZE:
+        normalized_rgb, normalization = main.normalize_page_resolution(graph.stage("rgb"))
+        if normalization:
+            graph = main.PreprocessingGraph(normalized_rgb)
+    stage_name = dict(main.get_preprocessing_strategies())[strategy_name]
+    return main.run_ocr_candidate(graph.stage(stage_name), lang, config)
+
+
+def measure(candidate: str, args) -> dict:
+    """Child process: run one candidate (or the whole pipeline) over the corpus"""
+    fonts = load_fonts(args.devanagari_font, args.latin_font, 36)
+    samples = build_corpus(args.seed, args.sheets, fonts)
+    if candidate == "pipeline":
+        main.OCR_CACHE_ENABLED = False
+        # Start cascade statistics from scratch so runs are reproducible and the server's file is untouched
+        main.OCR_STRATEGY_STATS_PATH = os.path.join(tempfile.mkdtemp(), "ocr_strategy_stats.sqlite3")
+        run = main.extract_text_like_imagetotext
+    else:
+        strategy_name, config_name = candidate.split("/")
+        _, lang, config = next(entry for entry in main.OCR_CONFIGS if entry[0] == config_name)
+        run = lambda image_bytes: ocr_with_candidate(image_bytes, strategy_name, lang, config)
+
+    seconds = 0.0
+    errors = {}
+    for sample in samples:
+        started = time.perf_counter()
+        try:
+            text = run(sample["image"])
+        except Exception as e:
+            print(f"{candidate} failed on {sample['name']}: {e}", file=sys.stderr)
+            text = ""
+        seconds += time.perf_counter() - started
+        errors.setdefault(sample["degradation"], []).append(character_error_rate(sample["truth"], text))
+
+    all_errors = [error for degradation_errors in errors.values() for error in degradation_errors]
+    return {
+        "seconds": round(seconds, 3),
+        "peak_rss_mib": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "cer": round(sum(all_errors) / len(all_errors), 4),
+        "cer_by_degradation": {
+            degradation: round(sum(values) / len(values), 4) for degradation, values in errors.items()
+        },
+    }
+
+
+def run_benchmark(args) -> dict:
+    candidates = [
+        f"{strategy_name}/{config_name}"
+        for strategy_name, _ in main.get_preprocessing_strategies()
+        for config_name, _, _ in main.OCR_CONFIGS
+    ] + ["pipeline"]
+
+    fonts = load_fonts(args.devanagari_font, args.latin_font, 36)
+    report = {
+        "corpus": {
+            "seed": args.seed,
+            "sheets": args.sheets,
+            "samples": args.sheets * len(DEGRADATIONS),
+            "fonts": fonts["names"],
+        },
+        "pipeline": main.get_pipeline_signature(),
+        "candidates": {},
+    }
+
+    for candidate in candidates:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--candidate", candidate,
+             "--seed", str(args.seed), "--sheets", str(args.sheets),
+             "--devanagari-font", args.devanagari_font, "--latin-font", args.latin_font],
+            capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        report["candidates"][candidate] = result
+        print(f"{candidate:36} {result['seconds']:8.2f} s   peak RSS {result['peak_rss_mib']:7.1f} MiB   CER {result['cer']:.4f}")
+
+    return report
+
+
+def compare(report: dict, baseline: dict, max_slowdown: float, max_cer_increase: float) -> bool:
+    """Print deltas against a baseline; False if any candidate regressed past the tolerances"""
+    if report["corpus"] != baseline.get("corpus"):
+        print(f"⚠️ Corpus differs from the baseline ({baseline.get('corpus')}), deltas are not comparable")
+
+    ok = True
+    print(f"\n{'candidate':36} {'time':>9} {'RSS':>9} {'CER':>9}")
+    for candidate, result in report["candidates"].items():
+        previous = baseline.get("candidates", {}).get(candidate)
+        if previous is None:
+            print(f"{candidate:36} (not in baseline)")
+            continue
+        time_ratio = result["seconds"] / previous["seconds"] if previous["seconds"] else 1.0
+        rss_delta = result["peak_rss_mib"] - previous["peak_rss_mib"]
+        cer_delta = result["cer"] - previous["cer"]
+        regressed = time_ratio > max_slowdown or cer_delta > max_cer_increase
+        ok = ok and not regressed
+        marker = "  ❌" if regressed else ""
+        print(f"{candidate:36} {time_ratio:8.2f}x {rss_delta:+8.1f}M {cer_delta:+9.4f}{marker}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sheets", type=int, default=4, help="lyric sheets to render (each in every degradation)")
+    parser.add_argument("--seed", type=int, default=1008, help="corpus random seed")
+    parser.add_argument("--devanagari-font", default=os.path.join(FONTS_DIR, "NotoSerifDevanagari-Regular.ttf"))
+    parser.add_argument("--latin-font", default=os.path.join(FONTS_DIR, "NotoSans-Regular.ttf"))
+    parser.add_argument("--json", help="write the results to this JSON file (use it as the next baseline)")
+    parser.add_argument("--baseline", help="compare against a JSON baseline from an earlier run")
+    parser.add_argument("--max-slowdown", type=float, default=1.2, help="allowed time ratio against the baseline")
+    parser.add_argument("--max-cer-increase", type=float, default=0.01, help="allowed CER increase against the baseline")
+    parser.add_argument("--candidate", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.candidate:
+        print(json.dumps(measure(args.candidate, args)))
+        sys.exit(0)
+
+    report = run_benchmark(args)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        sys.exit(0 if compare(report, baseline, args.max_slowdown, args.max_cer_increase) else 1)
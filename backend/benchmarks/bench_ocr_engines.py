@@ -0,0 +1,86 @@
+"""Compare per-call cost of the pytesseract and in-process tesserocr OCR engines.
+
+Each OCR config is timed on a tiny blank image, where recognition work is close
+to zero and the time is almost all per-call overhead (temp files, process
+startup, model loading), and on a real page.
+
+Usage (from the backend directory):
+    python benchmarks/bench_ocr_engines.py [image] [--runs 5] [--json results.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytesseract
+from PIL import Image
+
+import main
+
+
+def available_engines() -> list:
+    engines = []
+    try:
+        pytesseract.get_tesseract_version()
+        engines.append("pytesseract")
+    except Exception:
+        print("⚠️ tesseract binary not found, skipping pytesseract")
+    if main.tesserocr_available:
+        engines.append("tesserocr")
+    else:
+        print("⚠️ tesserocr not installed, skipping in-process engine")
+    return engines
+
+
+def time_engine(engine: str, image, lang: str, config: str, runs: int) -> float:
+    """Median seconds per call; the first call is a warm-up that initializes the engine"""
+    main.OCR_ENGINE = engine
+    main.run_ocr_candidate(image, lang, config)
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        main.run_ocr_candidate(image, lang, config)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def run_benchmark(image_path: str, runs: int) -> list:
+    page = Image.open(image_path).convert("RGB")
+    blank = Image.new("RGB", (64, 32), "white")
+    results = []
+
+    for engine in available_engines():
+        for config_name, lang, config in main.OCR_CONFIGS:
+            try:
+                overhead = time_engine(engine, blank, lang, config, runs)
+                full_page = time_engine(engine, page, lang, config, runs)
+            except Exception as e:
+                print(f"{engine:12} {config_name:16} failed: {e}")
+                continue
+            results.append({
+                "engine": engine,
+                "config": config_name,
+                "overhead_ms": round(overhead * 1000, 2),
+                "page_ms": round(full_page * 1000, 2),
+            })
+            print(f"{engine:12} {config_name:16} overhead {overhead * 1000:8.1f} ms   page {full_page * 1000:8.1f} ms")
+
+    return results
+
+
+if __name__ == "__main__":
+    default_image = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ocr_test.png")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("image", nargs="?", default=default_image, help="page image to OCR")
+    parser.add_argument("--runs", type=int, default=5, help="timed runs per engine/config")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.image, args.runs)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
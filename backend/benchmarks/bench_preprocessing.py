@@ -0,0 +1,125 @@
+"""Compare the ndarray preprocessing graph against the original PIL round-trip helpers.
+
+Both sides build the four OCR strategies (original, upscaled, enhanced_contrast,
+combined) the way the OCR pipeline consumes them. The script reports median
+wall time, peak RSS (each implementation runs in a fresh subprocess) and
+whether the outputs match pixel for pixel.
+
+Usage (from the backend directory):
+    python benchmarks/bench_preprocessing.py [image] [--runs 5]
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+from PIL import Image
+
+import main
+
+
+# Reference implementation: the PIL -> NumPy -> BGR -> LAB -> PIL helpers the graph replaced
+def legacy_smart_upscale_image(image):
+    width, height = image.size
+    if width < 1500 or height < 1000:
+        scale_factor = max(1500/width, 1000/height, 2.0)
+        return image.resize((int(width * scale_factor), int(height * scale_factor)), Image.Resampling.LANCZOS)
+    return image
+
+
+def legacy_enhance_contrast_for_ocr(image):
+    img_cv = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+    l, a, b = cv2.split(cv2.cvtColor(img_cv, cv2.COLOR_BGR2LAB))
+    l = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8)).apply(l)
+    enhanced = cv2.cvtColor(cv2.merge([l, a, b]), cv2.COLOR_LAB2BGR)
+    return Image.fromarray(cv2.cvtColor(enhanced, cv2.COLOR_BGR2RGB))
+
+
+def legacy_sharpen_for_ocr(image):
+    img_cv = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+    sharpened = cv2.filter2D(img_cv, -1, np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]]))
+    return Image.fromarray(cv2.cvtColor(sharpened, cv2.COLOR_BGR2RGB))
+
+
+def legacy_denoise_for_ocr(image):
+    img_cv = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+    denoised = cv2.bilateralFilter(img_cv, 9, 75, 75)
+    return Image.fromarray(cv2.cvtColor(denoised, cv2.COLOR_BGR2RGB))
+
+
+def legacy_strategies(image):
+    """The old pipeline built every strategy image up front and held them all"""
+    return {
+        "original": image,
+        "upscaled": legacy_smart_upscale_image(image),
+        "enhanced_contrast": legacy_enhance_contrast_for_ocr(image),
+        "combined": legacy_denoise_for_ocr(legacy_sharpen_for_ocr(legacy_enhance_contrast_for_ocr(image))),
+    }
+
+
+def graph_strategies(image, keep_outputs: bool = False):
+    """The graph builds each strategy when it is reached and releases what is no longer needed"""
+    graph = main.PreprocessingGraph(np.asarray(image))
+    strategies = main.get_preprocessing_strategies()
+    outputs = {}
+    for index, (name, stage) in enumerate(strategies):
+        output = graph.stage(stage)
+        if keep_outputs:
+            outputs[name] = output
+        del output
+        graph.release_unneeded([upcoming for _, upcoming in strategies[index + 1:]])
+    return outputs
+
+
+def measure(implementation: str, image_path: str, runs: int) -> dict:
+    """Child process: time one implementation and report its peak RSS"""
+    image = Image.open(image_path).convert("RGB")
+    build = legacy_strategies if implementation == "legacy" else graph_strategies
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        build(image)
+        samples.append(time.perf_counter() - started)
+    return {
+        "seconds": statistics.median(samples),
+        "peak_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+if __name__ == "__main__":
+    default_image = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ocr_test.png")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("image", nargs="?", default=default_image, help="page image to preprocess")
+    parser.add_argument("--runs", type=int, default=5, help="timed runs per implementation")
+    parser.add_argument("--implementation", choices=["legacy", "graph"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.implementation:
+        print(json.dumps(measure(args.implementation, args.image, args.runs)))
+        sys.exit(0)
+
+    image = Image.open(args.image).convert("RGB")
+    print(f"Image: {image.size[0]}x{image.size[1]}")
+
+    for label, implementation in (("PIL round-trips", "legacy"), ("ndarray graph", "graph")):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), args.image, "--runs", str(args.runs),
+             "--implementation", implementation],
+            capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{label:16} {result['seconds'] * 1000:8.1f} ms   peak RSS {result['peak_rss_mib']:7.1f} MiB")
+
+    legacy = legacy_strategies(image)
+    current = graph_strategies(image, keep_outputs=True)
+    for name in legacy:
+        difference = np.abs(np.asarray(legacy[name], dtype=np.int16) - current[name].astype(np.int16))
+        print(f"{name:18} max pixel difference {int(difference.max())}")
@@ -0,0 +1,194 @@
+"""Compare the shared `TextFeatures` scorers against the original per-feature scans.
+
+The legacy scorers walked each candidate once per character class, split its
+lines and ran every keyword as its own substring scan. Both implementations
+score a seeded set of OCR-like candidate pages (IAST, Devanagari and English
+lines with digit and symbol noise). The report gives the median time per
+candidate for each scorer, the speedup, and how many scores differ (expected 0).
+
+Usage (from the backend directory):
+    python benchmarks/bench_scoring.py [--pages 200] [--lines 24] [--runs 5] [--json results.json]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+DEVANAGARI_WORDS = ["मेरे", "मन", "में", "राधे", "श्याम", "हरि", "गुरु", "कृपा", "प्रेम", "रस", "बृज", "वास", "नाम", "सुंदर"]
+ENGLISH_WORDS = ["the", "divine", "abode", "of", "eternal", "bliss", "blessed", "is", "residence", "love", "and", "grace"]
+NOISE = ["|", "~", "@", "{", "]", "0", "1", "7", "%", "*", "//"]
+
+
+# Reference implementations: the scorers before the shared feature extractor
+def legacy_evaluate_advanced_text_quality(text: str) -> float:
+    if not text or len(text.strip()) < 5:
+        return 0.0
+    score = 0.5
+    if len(text) > 500:
+        score += 0.6
+    elif len(text) > 300:
+        score += 0.5
+    elif len(text) > 200:
+        score += 0.4
+    elif len(text) > 100:
+        score += 0.3
+    elif len(text) > 50:
+        score += 0.2
+    hindi_chars = len([c for c in text if '\u0900' <= c <= '\u097F'])
+    english_chars = len([c for c in text if c.isalpha() and ord(c) < 128])
+    total_chars = len(text)
+    if hindi_chars > 0 and english_chars > 0:
+        score += 0.6
+        if 0.1 <= hindi_chars / total_chars <= 0.8 and 0.1 <= english_chars / total_chars <= 0.8:
+            score += 0.3
+    line_count = len([line.strip() for line in text.split('\n') if line.strip()])
+    if line_count > 15:
+        score += 0.4
+    elif line_count > 10:
+        score += 0.3
+    elif line_count > 5:
+        score += 0.2
+    elif line_count > 2:
+        score += 0.1
+    if any(p in text for p in ['।', '॥', '.', '?', '!']):
+        score += 0.15
+    text_lower = text.lower()
+    spiritual_word_count = sum(1 for word in main.SPIRITUAL_KEYWORDS if word in text_lower)
+    if spiritual_word_count > 0:
+        score += min(0.3, spiritual_word_count * 0.05)
+    diacritic_chars = len([c for c in text if c in 'āīūṃḥṛ'])
+    if diacritic_chars > 0:
+        score += min(0.2, diacritic_chars * 0.01)
+    if len([c for c in text if c in '[]{}()@#$%^&*+=|\\/~`']) > len(text) * 0.1:
+        score -= 0.2
+    if len([c for c in text if c.isdigit()]) > len(text) * 0.2:
+        score -= 0.1
+    return min(10.0, max(0.0, score))
+
+
+def legacy_evaluate_text_quality(text: str) -> float:
+    if not text or len(text.strip()) < 5:
+        return 0.0
+    score = 0.5
+    if len(text) > 200:
+        score += 0.4
+    elif len(text) > 100:
+        score += 0.3
+    elif len(text) > 50:
+        score += 0.2
+    hindi_chars = len([c for c in text if '\u0900' <= c <= '\u097F'])
+    english_chars = len([c for c in text if c.isalpha() and ord(c) < 128])
+    total_chars = len(text)
+    if hindi_chars > 0 and english_chars > 0:
+        score += 0.5
+        if 0.1 <= hindi_chars / total_chars <= 0.7 and 0.1 <= english_chars / total_chars <= 0.7:
+            score += 0.2
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    if len(lines) > 10:
+        score += 0.3
+    elif len(lines) > 5:
+        score += 0.2
+    elif len(lines) > 2:
+        score += 0.1
+    if any(p in text for p in ['।', '॥', '.', '?', '!']):
+        score += 0.1
+    text_lower = text.lower()
+    if any(word in text_lower for word in main.BASIC_SPIRITUAL_KEYWORDS):
+        score += 0.2
+    special_chars = len([c for c in text if not c.isalnum() and not c.isspace() and not '\u0900' <= c <= '\u097F' and c not in '.,;:!?()[]{}"\'।॥'])
+    if special_chars / total_chars > 0.15:
+        score -= 0.4
+    elif special_chars / total_chars > 0.08:
+        score -= 0.2
+    words = text.split()
+    if len(words) > 0:
+        uniqueness_ratio = len(set(words)) / len(words)
+        if uniqueness_ratio < 0.5:
+            score -= 0.3
+        elif uniqueness_ratio < 0.7:
+            score -= 0.1
+    if len([line for line in lines if len(line) < 3]) > len(lines) * 0.3:
+        score -= 0.2
+    avg_word_length = sum(len(word) for word in words) / len(words) if words else 0
+    if 3 <= avg_word_length <= 8:
+        score += 0.1
+    return max(0.0, min(2.0, score))
+
+
+def build_candidates(seed: int, pages: int, lines_per_page: int) -> list:
+    """Candidate pages: IAST, Devanagari and English lines, some with OCR noise spliced into words"""
+    rng = random.Random(seed)
+    roman_words = [word for word in main.TRANSLITERATION_MAP if word.isalpha() and len(word) > 2]
+    pages_text = []
+    for _ in range(pages):
+        lines = []
+        for _ in range(lines_per_page):
+            vocabulary = rng.choice([roman_words, DEVANAGARI_WORDS, ENGLISH_WORDS])
+            words = [rng.choice(vocabulary) for _ in range(rng.randint(3, 9))]
+            if rng.random() < 0.3:
+                index = rng.randrange(len(words))
+                words[index] += rng.choice(NOISE)
+            lines.append(' '.join(words) + rng.choice(["", "", ".", " ।", " ॥", "!"]))
+        pages_text.append('\n'.join(lines))
+    return pages_text
+
+
+def time_scorer(score, candidates: list, runs: int) -> float:
+    """Median seconds per candidate over `runs` passes of the whole set"""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        for text in candidates:
+            score(text)
+        samples.append((time.perf_counter() - started) / len(candidates))
+    return statistics.median(samples)
+
+
+def run_benchmark(seed: int, pages: int, lines_per_page: int, runs: int) -> dict:
+    candidates = build_candidates(seed, pages, lines_per_page)
+    results = {
+        "pages": pages,
+        "chars_per_page": round(sum(map(len, candidates)) / len(candidates), 1),
+    }
+    for name, legacy, current in (
+        ("advanced", legacy_evaluate_advanced_text_quality, main.evaluate_advanced_text_quality),
+        ("basic", legacy_evaluate_text_quality, main.evaluate_text_quality),
+    ):
+        legacy_seconds = time_scorer(legacy, candidates, runs)
+        current_seconds = time_scorer(current, candidates, runs)
+        results[name] = {
+            "legacy_us_per_page": round(legacy_seconds * 1e6, 1),
+            "features_us_per_page": round(current_seconds * 1e6, 1),
+            "speedup": round(legacy_seconds / current_seconds, 2),
+            "score_mismatches": sum(1 for text in candidates if legacy(text) != current(text)),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200, help="candidate pages to score")
+    parser.add_argument("--lines", type=int, default=24, help="lines per page")
+    parser.add_argument("--runs", type=int, default=5, help="timed passes over the pages per scorer")
+    parser.add_argument("--seed", type=int, default=24, help="candidate seed")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.seed, args.pages, args.lines, args.runs)
+    print(f"{results['pages']} candidate pages, {results['chars_per_page']} chars per page")
+    for name in ("advanced", "basic"):
+        scorer = results[name]
+        print(f"{name:9} per-feature scans {scorer['legacy_us_per_page']:8.1f} us/page   "
+              f"shared features {scorer['features_us_per_page']:8.1f} us/page   ({scorer['speedup']}x)   "
+              f"score mismatches: {scorer['score_mismatches']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,113 @@
+"""Accuracy/latency curve for whole-page scoring vs confidence line merging.
+
+Every strategy/config candidate is OCR'd once, in the cascade's learned order,
+and its lines and time are recorded. The curve then replays the first k
+candidates for k = 1..N and reports, for each k, the cumulative OCR time and
+the character error rate of the page picked by `evaluate_advanced_text_quality`
+next to the page built by `merge_candidate_lines`.
+
+Without --truth, the merged output of the full grid is used as the reference,
+so the CER column reads as disagreement with the full fan-out.
+
+Usage (from the backend directory):
+    python benchmarks/bench_selection.py [image] [--truth page.txt] [--json curve.json]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PIL import Image
+
+import main
+
+
+def character_error_rate(reference: str, hypothesis: str) -> float:
+    """Levenshtein distance over characters, divided by the reference length (whitespace collapsed)"""
+    reference = re.sub(r'\s+', ' ', reference).strip()
+    hypothesis = re.sub(r'\s+', ' ', hypothesis).strip()
+    if not reference:
+        return float(bool(hypothesis))
+
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_char in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_char in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_char != hyp_char)))
+        previous = current
+    return previous[-1] / len(reference)
+
+
+def run_candidates(image_path: str) -> list:
+    """OCR every candidate once: [(strategy, config, seconds, lines)] in cascade order"""
+    main.OCR_SELECTION = "confidence"
+    graph = main.PreprocessingGraph(np.asarray(Image.open(image_path).convert("RGB")))
+    if main.OCR_NORMALIZE:
+        normalized_rgb, normalization = main.normalize_page_resolution(graph.stage("rgb"))
+        if normalization:
+            graph = main.PreprocessingGraph(normalized_rgb, normalized=True)
+    stage_names = dict(main.get_preprocessing_strategies(graph))
+
+    candidates = []
+    for strategy_name, config_name, lang, config in main.get_cascade_candidate_order(strategy_names=list(stage_names)):
+        started = time.perf_counter()
+        try:
+            lines = main.run_ocr_candidate_lines(graph.stage(stage_names[strategy_name]), lang, config)
+        except Exception as e:
+            print(f"{strategy_name}/{config_name} failed: {e}")
+            continue
+        candidates.append((strategy_name, config_name, time.perf_counter() - started, lines))
+    return candidates
+
+
+def build_curve(candidates: list, truth: str = None) -> list:
+    if truth is None:
+        full_grid = [(f"{strategy}_{config}", "", 0.0, lines) for strategy, config, _, lines in candidates]
+        merged = main.merge_candidate_lines(full_grid)
+        truth = merged[0] if merged else ""
+
+    curve = []
+    elapsed = 0.0
+    for k, (_, _, seconds, _) in enumerate(candidates, 1):
+        elapsed += seconds
+        all_results = []
+        for strategy_name, config_name, _, lines in candidates[:k]:
+            main.collect_candidate_result(all_results, strategy_name, config_name, lines)
+
+        best_text = max(all_results, key=lambda result: result[2])[1] if all_results else ""
+        merged = main.merge_candidate_lines(all_results)
+        curve.append({
+            "candidates": k,
+            "seconds": round(elapsed, 3),
+            "score_cer": round(character_error_rate(truth, best_text), 4),
+            "merged_cer": round(character_error_rate(truth, merged[0] if merged else ""), 4),
+        })
+    return curve
+
+
+if __name__ == "__main__":
+    default_image = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ocr_test.png")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("image", nargs="?", default=default_image, help="page image to OCR")
+    parser.add_argument("--truth", help="UTF-8 text file with the page's correct transcription")
+    parser.add_argument("--json", help="also write the curve to this JSON file")
+    args = parser.parse_args()
+
+    truth = None
+    if args.truth:
+        with open(args.truth, "r", encoding="utf-8") as f:
+            truth = f.read()
+
+    curve = build_curve(run_candidates(args.image), truth)
+    print(f"{'k':>3} {'seconds':>9} {'score CER':>10} {'merged CER':>11}")
+    for point in curve:
+        print(f"{point['candidates']:>3} {point['seconds']:>9.3f} {point['score_cer']:>10.4f} {point['merged_cer']:>11.4f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(curve, f, indent=2)
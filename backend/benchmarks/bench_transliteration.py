@@ -0,0 +1,155 @@
+"""Compare the compiled-trie `transliterate_to_hindi` against the original per-word loop.
+
+The legacy implementation rebuilt its mapping dict on every call and looked at
+most three characters ahead inside each word, so 4-character keys and
+multi-word phrases never matched. Both implementations run over a seeded set
+of full romanized songs: verses of everyday lyric words mixed with the
+mapping's own words and phrases, and a repeated refrain. The report gives the median time per
+song for each, the speedup, and how many output words changed because phrases
+and longer keys now match.
+
+Usage (from the backend directory):
+    python benchmarks/bench_transliteration.py [--songs 50] [--lines 32] [--runs 5] [--json results.json]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+# Everyday lyric words the mapping doesn't know; like real songs, most words take the
+# character-level path
+LYRIC_WORDS = [
+    "mere", "mana", "sukha", "sāre", "nisdin", "pyāre", "sāmvariyā", "bhāyā", "charanan",
+    "sīs", "jhukāo", "madhur", "mahimā", "apār", "kripā", "mile", "nām", "sarala", "mārg",
+    "soī", "jāne", "nainan", "bahat", "nīr", "kāhe", "bisrāyo", "lāl", "hamāre", "kabahum",
+    "bhūli", "piyā", "milan", "āsa", "lagī", "tihāre", "dvār", "khaḍo", "pukārūm", "sunahu",
+    "nāth", "ghanshyām", "bāṁsurī", "bajāī", "muraliyā", "gaiyan", "charāvat", "yamunā",
+    "tīr", "kadamb", "chhāyā", "sakhī", "batiyāṁ", "bhāvat", "jiyarā", "taras", "darasan",
+]
+
+
+# Reference implementation: the per-word loop the trie replaced
+def legacy_transliterate_to_hindi(transliteration_text: str) -> str:
+    # Stands in for the dict literal the old function rebuilt on every call
+    transliteration_map = dict(main.TRANSLITERATION_MAP)
+
+    words = transliteration_text.split()
+    hindi_words = []
+
+    for word in words:
+        word_lower = word.lower().strip('.,;:!?')
+
+        if word_lower in transliteration_map:
+            hindi_word = transliteration_map[word_lower]
+            if word != word_lower:
+                hindi_word += word[len(word_lower):]
+            hindi_words.append(hindi_word)
+        else:
+            hindi_word = ""
+            i = 0
+            while i < len(word_lower):
+                if i + 2 < len(word_lower) and word_lower[i:i+3] in transliteration_map:
+                    hindi_word += transliteration_map[word_lower[i:i+3]]
+                    i += 3
+                elif i + 1 < len(word_lower) and word_lower[i:i+2] in transliteration_map:
+                    hindi_word += transliteration_map[word_lower[i:i+2]]
+                    i += 2
+                elif word_lower[i] in transliteration_map:
+                    hindi_word += transliteration_map[word_lower[i]]
+                    i += 1
+                else:
+                    hindi_word += word[i]
+                    i += 1
+
+            if word != word_lower:
+                hindi_word += word[len(word_lower):]
+            hindi_words.append(hindi_word)
+
+    return ' '.join(hindi_words)
+
+
+def build_songs(seed: int, songs: int, lines_per_song: int) -> list:
+    """Full songs as one string each: verses of 4-8 words and a refrain repeated after each verse"""
+    rng = random.Random(seed)
+    vocabulary = [key for key in main.TRANSLITERATION_MAP if len(key) > 2 and key.isalpha()]
+    phrases = [key for key in main.TRANSLITERATION_MAP if ' ' in key]
+
+    corpus = []
+    for _ in range(songs):
+        refrain = f"{rng.choice(phrases)} {rng.choice(phrases)},"
+        lines = []
+        while len(lines) < lines_per_song:
+            for _ in range(4):
+                words = [rng.choice(vocabulary if rng.random() < 0.25 else LYRIC_WORDS)
+                         for _ in range(rng.randint(4, 8))]
+                if rng.random() < 0.3:
+                    words.insert(rng.randrange(len(words)), rng.choice(phrases))
+                if rng.random() < 0.2:
+                    words[0] = words[0].capitalize()
+                lines.append(' '.join(words) + rng.choice(["", ",", " ..", "!"]))
+            lines.append(refrain)
+        corpus.append('\n'.join(lines[:lines_per_song]))
+    return corpus
+
+
+def time_implementation(transliterate, corpus: list, runs: int) -> float:
+    """Median seconds per song over `runs` passes of the whole corpus"""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        for song in corpus:
+            transliterate(song)
+        samples.append((time.perf_counter() - started) / len(corpus))
+    return statistics.median(samples)
+
+
+def run_benchmark(seed: int, songs: int, lines_per_song: int, runs: int) -> dict:
+    corpus = build_songs(seed, songs, lines_per_song)
+    legacy_seconds = time_implementation(legacy_transliterate_to_hindi, corpus, runs)
+    trie_seconds = time_implementation(main.transliterate_to_hindi, corpus, runs)
+
+    total_words = 0
+    changed_words = 0
+    for song in corpus:
+        legacy_words = legacy_transliterate_to_hindi(song).split()
+        trie_words = main.transliterate_to_hindi(song).split()
+        total_words += len(legacy_words)
+        changed_words += sum(1 for old, new in zip(legacy_words, trie_words) if old != new)
+        changed_words += abs(len(legacy_words) - len(trie_words))
+
+    return {
+        "songs": songs,
+        "words_per_song": round(total_words / len(corpus), 1),
+        "legacy_ms_per_song": round(legacy_seconds * 1000, 3),
+        "trie_ms_per_song": round(trie_seconds * 1000, 3),
+        "speedup": round(legacy_seconds / trie_seconds, 2),
+        "changed_words": changed_words,
+        "total_words": total_words,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--songs", type=int, default=50, help="songs in the corpus")
+    parser.add_argument("--lines", type=int, default=32, help="lines per song")
+    parser.add_argument("--runs", type=int, default=5, help="timed passes over the corpus per implementation")
+    parser.add_argument("--seed", type=int, default=18, help="corpus seed")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.seed, args.songs, args.lines, args.runs)
+    print(f"{results['songs']} songs, {results['words_per_song']} words per song")
+    print(f"per-word loop  {results['legacy_ms_per_song']:8.3f} ms/song")
+    print(f"compiled trie  {results['trie_ms_per_song']:8.3f} ms/song   ({results['speedup']}x)")
+    print(f"output words changed by phrase/longest matching: {results['changed_words']} of {results['total_words']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
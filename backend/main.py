@@ -1,24 +1,153 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, Form, UploadFile, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 import pandas as pd
 import pytesseract
 import io
 import PyPDF2
 import docx
-from pdf2image import convert_from_bytes
+from pdf2image import convert_from_path, pdfinfo_from_path
 import logging
-from PIL import Image
+from PIL import Image, ImageOps
 import cv2
 import numpy as np
-import requests
+import httpx
 import json
 import re
+import os
+import uuid
+import mmap
+import shutil
+import tempfile
+import unicodedata
+import difflib
+import hashlib
+import sqlite3
+from collections import Counter as CharacterCounter, OrderedDict, deque
+from functools import cached_property, lru_cache
+import threading
+import time
+import multiprocessing
+import asyncio
+import contextvars
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import asynccontextmanager, contextmanager
+from multiprocessing import shared_memory
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Request-scoped OCR details (chosen configs, time saved, cache hits) returned to the client.
+# Endpoints set a fresh dict; executor lanes carry it into worker threads.
+ocr_request_metadata = contextvars.ContextVar("ocr_request_metadata", default=None)
+
+# Metrics: in-process Prometheus counters and histograms, exposed on /metrics
+METRICS_PREFIX = "ykcsv"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# (stage, seconds) pairs for the current request, reported in its Server-Timing header
+request_stage_timings = contextvars.ContextVar("request_stage_timings", default=None)
+
+def format_metric_labels(label_names: tuple, label_values: tuple) -> str:
+    """Render a Prometheus label set, escaping values"""
+    if not label_names:
+        return ""
+    pairs = []
+    for name, value in zip(label_names, label_values):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+class Counter:
+    """Monotonic counter with labels"""
+    
+    def __init__(self, name: str, help_text: str, label_names: tuple = ()):
+        self.name = f"{METRICS_PREFIX}_{name}"
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, *label_values, amount: float = 1.0):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+    
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{format_metric_labels(self.label_names, label_values)} {value:g}")
+        return lines
+
+class Histogram:
+    """Cumulative-bucket latency histogram with labels"""
+    
+    def __init__(self, name: str, help_text: str, label_names: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = f"{METRICS_PREFIX}_{name}"
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}  # label values -> [bucket counts..., count, sum]
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += 1
+            series[-1] += value
+    
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, series in sorted(self._series.items()):
+                for index, bound in enumerate(self.buckets + ("+Inf",)):
+                    count = series[index] if index < len(self.buckets) else series[-2]
+                    labels = format_metric_labels(self.label_names + ("le",), label_values + (f"{bound:g}" if bound != "+Inf" else bound,))
+                    lines.append(f"{self.name}_bucket{labels} {count}")
+                labels = format_metric_labels(self.label_names, label_values)
+                lines.append(f"{self.name}_count{labels} {series[-2]}")
+                lines.append(f"{self.name}_sum{labels} {series[-1]:.6f}")
+        return lines
+
+stage_duration_seconds = Histogram("stage_duration_seconds", "Time spent in each processing stage", ("stage",))
+http_request_duration_seconds = Histogram("http_request_duration_seconds", "HTTP request latency", ("method", "path"))
+http_requests_total = Counter("http_requests_total", "HTTP requests handled", ("method", "path", "status"))
+extraction_cache_requests_total = Counter("extraction_cache_requests_total", "Extraction cache lookups", ("kind", "result"))
+
+def record_stage(stage: str, seconds: float):
+    """Observe a stage duration and add it to the current request's Server-Timing"""
+    stage_duration_seconds.observe(seconds, stage)
+    timings = request_stage_timings.get()
+    if timings is not None:
+        timings.append((stage, seconds))
+
+@contextmanager
+def stage_timer(stage: str):
+    """Time a block as one processing stage"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+def format_server_timing(timings: list, total_seconds: float) -> str:
+    """Server-Timing header value: durations per stage (summed over repeats) in milliseconds"""
+    totals = {}
+    for stage, seconds in timings:
+        totals[stage] = totals.get(stage, 0.0) + seconds
+    entries = [
+        f"{re.sub(r'[^A-Za-z0-9!#$%&*+.^_`|~-]', '_', stage)};dur={seconds * 1000:.1f}"
+        for stage, seconds in totals.items()
+    ]
+    entries.append(f"total;dur={total_seconds * 1000:.1f}")
+    return ", ".join(entries)
+
 # Initialize Tesseract OCR
 tesseract_available = True
 try:
@@ -29,7 +158,36 @@ except Exception as e:
     logger.error(f"Tesseract OCR not available: {e}")
     tesseract_available = False
 
-app = FastAPI(title="YK-CSV API", description="Extract text from files and generate CSV for VMix lyrics")
+# Optional in-process Tesseract engine: keeps initialized API handles instead of
+# spawning the tesseract binary for every call
+# "pytesseract" (default) runs the tesseract binary, "tesserocr" uses the in-process engine
+OCR_ENGINE = os.getenv("OCR_ENGINE", "pytesseract").lower()
+TESSDATA_PATH = os.getenv("TESSDATA_PATH", "")
+# Initialized handles each worker thread keeps; every language model loaded costs tens of MB
+TESSEROCR_MAX_HANDLES = max(1, int(os.getenv("TESSEROCR_MAX_HANDLES", "5")))
+try:
+    import tesserocr
+    tesserocr_available = True
+except ImportError:
+    tesserocr = None
+    tesserocr_available = False
+
+if OCR_ENGINE == "tesserocr":
+    if tesserocr_available:
+        tesseract_available = True
+        logger.info(f"✅ In-process Tesseract engine enabled ({tesserocr.tesseract_version().splitlines()[0]})")
+    else:
+        logger.warning("OCR_ENGINE=tesserocr but tesserocr is not installed, falling back to pytesseract")
+        OCR_ENGINE = "pytesseract"
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the shared stores in the server process only; spawned OCR pool workers re-import
+    this module and must not repeat the SQLite opens, index builds and warm-up"""
+    open_shared_stores()
+    yield
+
+app = FastAPI(title="YK-CSV API", description="Extract text from files and generate CSV for VMix lyrics", lifespan=lifespan)
 
 # Enable CORS for production
 app.add_middleware(
@@ -42,70 +200,249 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
+)
+
+class RequestBodyLimitMiddleware:
+    """Answer 413 as soon as a request body grows past max_bytes, chunked or not.
+    
+    Declared Content-Length is checked up front; the body itself is counted as
+    the multipart parser pulls it in. Past the limit the app sees a client
+    disconnect, so an oversized upload is never spooled further, and its
+    response is replaced by the 413. max_bytes defaults to UPLOAD_REQUEST_MAX_BYTES.
+    """
+    
+    def __init__(self, app, max_bytes: int = None):
+        self.app = app
+        self.max_bytes = max_bytes
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        max_bytes = UPLOAD_REQUEST_MAX_BYTES if self.max_bytes is None else self.max_bytes
+        
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > max_bytes:
+            await self.reject(scope, receive, send, max_bytes)
+            return
+        
+        received = 0
+        too_large = False
+        response_started = False
+        
+        async def limited_receive():
+            nonlocal received, too_large
+            if too_large:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    too_large = True
+                    return {"type": "http.disconnect"}
+            return message
+        
+        async def guarded_send(message):
+            nonlocal response_started
+            if too_large and not response_started:
+                return
+            response_started = True
+            await send(message)
+        
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not too_large or response_started:
+                raise
+        if too_large and not response_started:
+            await self.reject(scope, receive, send, max_bytes)
+    
+    async def reject(self, scope, receive, send, max_bytes: int):
+        logger.warning(f"🚫 Rejecting request body larger than {max_bytes} bytes")
+        response = JSONResponse(status_code=413, content={"detail": "Request body is too large"})
+        await response(scope, receive, send)
+
+app.add_middleware(RequestBodyLimitMiddleware)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Count and time every request and attach a Server-Timing breakdown"""
+    timings = []
+    request_stage_timings.set(timings)
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        elapsed = time.perf_counter() - started
+        # Label by route template, not the raw path, so job ids don't explode cardinality
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        http_request_duration_seconds.observe(elapsed, request.method, path)
+        http_requests_total.inc(request.method, path, str(status))
+    response.headers["Server-Timing"] = format_server_timing(timings, elapsed)
+    return response
+
+# OCR candidate grid execution
+# "serial" runs every strategy/config candidate in-process, "pool" fans them out to worker processes,
+# "cascade" runs the historically best candidates first and stops once the result is good enough,
+# "layout" finds text lines once and OCRs each with the language model matching its script
+OCR_EXECUTION_MODE = os.getenv("OCR_EXECUTION_MODE", "serial").lower()
+OCR_POOL_WORKERS = int(os.getenv("OCR_POOL_WORKERS", str(os.cpu_count() or 1)))
+OCR_CASCADE_SCORE_THRESHOLD = float(os.getenv("OCR_CASCADE_SCORE_THRESHOLD", "2.5"))
+# Single-script pages top out below the threshold (a full Devanagari page scores ~1.65), so the
+# cascade also stops once this many candidates in a row fail to raise the best score by MIN_GAIN
+OCR_CASCADE_PATIENCE = int(os.getenv("OCR_CASCADE_PATIENCE", "2"))
+OCR_CASCADE_MIN_GAIN = float(os.getenv("OCR_CASCADE_MIN_GAIN", "0.05"))
+OCR_CASCADE_TIME_BUDGET = float(os.getenv("OCR_CASCADE_TIME_BUDGET", "8.0"))
+OCR_LAYOUT_WORKERS = int(os.getenv("OCR_LAYOUT_WORKERS", str(os.cpu_count() or 1)))
+OCR_LAYOUT_LANGUAGES = {
+    "devanagari": os.getenv("OCR_LAYOUT_DEVANAGARI_LANG", "hin"),
+    "latin": os.getenv("OCR_LAYOUT_LATIN_LANG", "eng"),
+    "mixed": "hin+eng",
+}
+OCR_SCRIPT_PREPASS = os.getenv("OCR_SCRIPT_PREPASS", "0") == "1"
+OCR_PREPASS_MAX_SIDE = 1200
+# Resolution normalization: crop to the text and rescale it to the x-height Tesseract reads best
+OCR_NORMALIZE = os.getenv("OCR_NORMALIZE", "0") == "1"
+OCR_TARGET_X_HEIGHT = float(os.getenv("OCR_TARGET_X_HEIGHT", "24"))
+OCR_DRAFT_MAX_SIDE = int(os.getenv("OCR_DRAFT_MAX_SIDE", "2048"))
+# Candidate selection: "score" keeps the single best-scoring page, "confidence" merges the
+# highest-confidence version of each line across all candidates
+OCR_SELECTION = os.getenv("OCR_SELECTION", "score").lower()
+OCR_MIN_LINE_CONFIDENCE = float(os.getenv("OCR_MIN_LINE_CONFIDENCE", "30"))
+OCR_MAX_CANDIDATES = int(os.getenv("OCR_MAX_CANDIDATES", "0"))
+OCR_STRATEGY_STATS_PATH = os.getenv(
+    "OCR_STRATEGY_STATS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "ocr_strategy_stats.sqlite3")
 )
 
+# Optimized OCR configurations for faster processing
+OCR_CONFIGS = [
+    # Best performing configurations only
+    ('hin+eng_psm6', 'hin+eng', '--oem 3 --psm 6'),
+    ('hin_only_psm6', 'hin', '--oem 3 --psm 6'),
+    ('eng_only_psm6', 'eng', '--oem 3 --psm 6'),
+    
+    # Legacy configurations
+    ('hin+eng_legacy', 'hin+eng', '--oem 1 --psm 6'),
+    ('hin_only_legacy', 'hin', '--oem 1 --psm 6')
+]
+
+_ocr_process_pool = None
+_ocr_process_pool_lock = threading.Lock()
+_ocr_layout_executor = None
+
+# Per (strategy, config) pair: runs, wins, total OCR seconds and timed runs, in SQLite so every
+# worker's counts are added in place instead of one worker's copy overwriting the others
+_ocr_strategy_stats_db = None
+_ocr_strategy_stats_lock = threading.Lock()
+
 def extract_text_like_imagetotext(image_data: bytes) -> str:
     """ULTRA-ADVANCED OCR - Professional grade text extraction"""
     try:
         logger.info("🚀 Using ULTRA-ADVANCED OCR for professional text extraction...")
         
-        # Convert bytes to PIL Image
-        image = Image.open(io.BytesIO(image_data))
-        
-        # Convert to RGB if necessary
-        if image.mode != 'RGB':
-            image = image.convert('RGB')
+        with stage_timer("decode"), open_content(image_data) as stream:
+            # Convert bytes to PIL Image (decoded before the stream closes)
+            image = Image.open(stream)
+            
+            if OCR_NORMALIZE:
+                # Let the JPEG decoder shrink oversized photos (by 1/2, 1/4 or 1/8) instead of decoding every pixel
+                if image.format == 'JPEG' and max(image.size) > OCR_DRAFT_MAX_SIDE:
+                    ratio = OCR_DRAFT_MAX_SIDE / max(image.size)
+                    image.draft('RGB', (int(image.size[0] * ratio), int(image.size[1] * ratio)))
+                # Phone photos are often stored sideways with an EXIF orientation tag
+                image = ImageOps.exif_transpose(image)
+            
+            # Convert to RGB if necessary
+            if image.mode != 'RGB':
+                image = image.convert('RGB')
+            
+            rgb = np.asarray(image)
+            del image
         
-        width, height = image.size
+    except Exception as e:
+        logger.error(f"Ultra-advanced OCR error: {e}")
+        return ""
+    
+    return ocr_image_array(rgb)
+
+def ocr_image_array(rgb: np.ndarray) -> str:
+    """Run the OCR candidate pipeline on an already decoded RGB page"""
+    try:
+        height, width = rgb.shape[:2]
         logger.info(f"Original image size: {width}x{height}")
         
-        # Try fewer preprocessing strategies for faster processing
-        preprocessing_strategies = [
-            ("original", image),
-            ("upscaled", smart_upscale_image(image)),
-            ("enhanced_contrast", enhance_contrast_for_ocr(image)),
-            ("combined", combined_preprocessing_for_ocr(image))
-        ]
+        # From here on the image lives in a single ndarray; preprocessing stages are built on demand
+        graph = PreprocessingGraph(rgb)
+        del rgb
         
-        all_results = []
+        timings = {}
+        run_metadata = {"mode": OCR_EXECUTION_MODE}
+        configs = OCR_CONFIGS
         
-        for strategy_name, processed_image in preprocessing_strategies:
-            logger.info(f"📸 Testing preprocessing strategy: {strategy_name}")
-            
-            # Optimized OCR configurations for faster processing
-            configs = [
-                # Best performing configurations only
-                ('hin+eng_psm6', 'hin+eng', '--oem 3 --psm 6'),
-                ('hin_only_psm6', 'hin', '--oem 3 --psm 6'),
-                ('eng_only_psm6', 'eng', '--oem 3 --psm 6'),
-                
-                # Legacy configurations
-                ('hin+eng_legacy', 'hin+eng', '--oem 1 --psm 6'),
-                ('hin_only_legacy', 'hin', '--oem 1 --psm 6')
-            ]
-            
-            for config_name, lang, config in configs:
-                try:
-                    text = pytesseract.image_to_string(processed_image, lang=lang, config=config)
-                    if text and text.strip() and len(text.strip()) > 10:
-                        # Calculate quality score
-                        score = evaluate_advanced_text_quality(text)
-                        all_results.append((f"{strategy_name}_{config_name}", text.strip(), score))
-                        logger.info(f"  {config_name}: {len(text.strip())} chars, score: {score:.2f}")
-                except Exception as e:
-                    logger.warning(f"  {config_name} failed: {e}")
+        if OCR_SCRIPT_PREPASS:
+            with stage_timer("prepass"):
+                prepass = run_script_prepass(graph)
+            if prepass["rotation"]:
+                graph = PreprocessingGraph(rotate_image(graph.stage("rgb"), prepass["rotation"]))
+            configs = select_ocr_configs(prepass["scripts"])
+            run_metadata.update(prepass)
+        run_metadata["configs"] = [config_name for config_name, _, _ in configs]
+        
+        if OCR_NORMALIZE:
+            with stage_timer("normalize"):
+                normalized_rgb, normalization = normalize_page_resolution(graph.stage("rgb"))
+            if normalization:
+                graph = PreprocessingGraph(normalized_rgb, normalized=True)
+                run_metadata["normalization"] = normalization
+            del normalized_rgb
+        
+        if OCR_EXECUTION_MODE == "layout":
+            with stage_timer("ocr.layout"):
+                all_results = run_layout_ocr(graph)
+            if not all_results:
+                logger.warning("Layout OCR found no usable text, falling back to the full candidate grid")
+                all_results = run_candidate_grid_serial(graph, timings, configs)
+        elif OCR_EXECUTION_MODE == "cascade":
+            all_results = run_candidate_grid_cascade(graph, timings, configs)
+        elif OCR_EXECUTION_MODE == "pool" and OCR_POOL_WORKERS > 1:
+            with stage_timer("ocr.pool"):
+                all_results = run_candidate_grid_pooled(graph, configs)
+        else:
+            all_results = run_candidate_grid_serial(graph, timings, configs)
         
         # Sort results by quality score
         all_results.sort(key=lambda x: x[2], reverse=True)
         
         logger.info(f"📊 Total OCR attempts: {len(all_results)}")
+        record_ocr_strategy_outcome(all_results, timings)
+        
+        if OCR_SELECTION == "confidence":
+            with stage_timer("merge_lines"):
+                merged = merge_candidate_lines(all_results)
+            if merged:
+                merged_text, selection = merged
+                all_results.insert(0, ("merged_lines", merged_text, evaluate_advanced_text_quality(merged_text)))
+                run_metadata["selection"] = selection
+        
+        pruned_candidates = (len(OCR_CONFIGS) - len(configs)) * len(get_preprocessing_strategies(graph))
+        run_metadata["pruned_candidates"] = pruned_candidates
+        if pruned_candidates and timings:
+            mean_candidate_seconds = sum(timings.values()) / len(timings)
+            run_metadata["estimated_seconds_saved"] = round(pruned_candidates * mean_candidate_seconds, 3)
+        publish_ocr_metadata(run_metadata)
         
         if all_results:
             best_result, best_score = all_results[0][1], all_results[0][2]
             logger.info(f"🏆 Best OCR result: {all_results[0][0]} - Score: {best_score:.2f}, Chars: {len(best_result)}")
             
             # Advanced post-processing
-            cleaned_result = advanced_text_postprocessing(best_result)
+            with stage_timer("postprocess"):
+                cleaned_result = advanced_text_postprocessing(best_result)
             
             logger.info(f"✅ Final result: {len(cleaned_result)} chars after post-processing")
             return cleaned_result.strip()
@@ -117,64 +454,763 @@ def extract_text_like_imagetotext(image_data: bytes) -> str:
         logger.error(f"Ultra-advanced OCR error: {e}")
         return ""
 
-def smart_upscale_image(image):
-    """Smart upscaling for better OCR"""
-    width, height = image.size
-    if width < 1500 or height < 1000:
-        scale_factor = max(1500/width, 1000/height, 2.0)
-        new_width = int(width * scale_factor)
-        new_height = int(height * scale_factor)
-        return image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-    return image
+def get_preprocessing_strategies(graph=None) -> list:
+    """Preprocessing strategies tried for every image, as (name, graph stage) pairs"""
+    # Try fewer preprocessing strategies for faster processing
+    strategies = [
+        ("original", "rgb"),
+        ("upscaled", "upscaled"),
+        ("enhanced_contrast", "enhanced_contrast"),
+        ("combined", "combined")
+    ]
+    # A normalized page is already at the right resolution, so upscaling would only add pixels
+    if graph is not None and graph.normalized:
+        strategies = [strategy for strategy in strategies if strategy[0] != "upscaled"]
+    return strategies
 
-def enhance_contrast_for_ocr(image):
-    """Enhance contrast for better text recognition"""
-    import numpy as np
-    img_array = np.array(image)
-    img_cv = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
+def publish_ocr_metadata(run_metadata: dict):
+    """Attach one OCR run's details to the current request's metadata, if any"""
+    request_metadata = ocr_request_metadata.get()
+    if request_metadata is not None:
+        request_metadata.setdefault("ocr_runs", []).append(run_metadata)
+
+def set_ocr_metadata(key: str, value):
+    """Set a request-level OCR metadata field, if a request is collecting them"""
+    request_metadata = ocr_request_metadata.get()
+    if request_metadata is not None:
+        request_metadata[key] = value
+
+# Script/orientation pre-pass: a cheap look at a downscaled page decides which OCR configs are worth running
+def run_script_prepass(graph) -> dict:
+    """Estimate page rotation and the scripts present from a downscaled copy of the page"""
+    started = time.monotonic()
     
-    # Convert to LAB color space
-    lab = cv2.cvtColor(img_cv, cv2.COLOR_BGR2LAB)
-    l, a, b = cv2.split(lab)
+    gray = graph.stage("gray")
+    scale = min(1.0, OCR_PREPASS_MAX_SIDE / max(gray.shape))
+    if scale < 1.0:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
     
-    # Apply CLAHE to L channel
-    clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
-    l = clahe.apply(l)
+    rotation = detect_page_rotation(gray)
+    if rotation:
+        gray = rotate_image(gray, rotation)
     
-    # Merge channels and convert back
-    enhanced = cv2.merge([l, a, b])
-    enhanced = cv2.cvtColor(enhanced, cv2.COLOR_LAB2BGR)
+    binary = binarize_for_layout(gray)
+    script_counts = {}
+    for x, y, w, h in detect_text_lines(binary):
+        script = classify_line_script(binary[y:y + h, x:x + w])
+        script_counts[script] = script_counts.get(script, 0) + 1
     
-    # Convert back to PIL
-    enhanced_rgb = cv2.cvtColor(enhanced, cv2.COLOR_BGR2RGB)
-    return Image.fromarray(enhanced_rgb)
+    seconds = round(time.monotonic() - started, 3)
+    logger.info(f"🔎 Pre-pass: rotation {rotation}°, scripts {script_counts} ({seconds}s)")
+    return {"rotation": rotation, "scripts": script_counts, "prepass_seconds": seconds}
 
-def sharpen_for_ocr(image):
-    """Sharpen image for better text clarity"""
-    import numpy as np
-    img_array = np.array(image)
-    img_cv = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
+def detect_page_rotation(gray: np.ndarray) -> int:
+    """Clockwise rotation (0/90/180/270) that makes the page upright, from Tesseract OSD"""
+    try:
+        osd = pytesseract.image_to_osd(gray, config='--psm 0')
+        rotation = int(re.search(r'Rotate:\s*(\d+)', osd).group(1))
+        confidence = float(re.search(r'Orientation confidence:\s*([\d.]+)', osd).group(1))
+        # Low-confidence guesses on sparse pages do more harm than good
+        return rotation % 360 if confidence >= 2.0 else 0
+    except Exception as e:
+        logger.info(f"Orientation detection skipped: {e}")
+        return 0
+
+def rotate_image(image: np.ndarray, rotation: int) -> np.ndarray:
+    """Rotate an image clockwise by a multiple of 90 degrees"""
+    return np.ascontiguousarray(np.rot90(image, k=-(rotation // 90)))
+
+def select_ocr_configs(script_counts: dict) -> list:
+    """Drop OCR configs for scripts the pre-pass did not find on the page.
     
-    # Create sharpening kernel
-    kernel = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]])
-    sharpened = cv2.filter2D(img_cv, -1, kernel)
+    Pages where every line is Latin only need the English model, pure
+    Devanagari pages only the Hindi ones. Mixed or unclear pages keep them all.
+    The primary hin+eng config always stays, so a pre-pass that missed a few
+    lines of the other script cannot take the combined model away.
+    """
+    scripts = {script for script, count in script_counts.items() if count}
+    if scripts == {"latin"}:
+        languages = {"eng"}
+    elif scripts == {"devanagari"}:
+        languages = {"hin"}
+    else:
+        return OCR_CONFIGS
     
-    # Convert back to PIL
-    sharpened_rgb = cv2.cvtColor(sharpened, cv2.COLOR_BGR2RGB)
-    return Image.fromarray(sharpened_rgb)
+    mixed_config = next(candidate for candidate in OCR_CONFIGS if candidate[1] == "hin+eng")
+    configs = [candidate for candidate in OCR_CONFIGS if candidate[1] in languages or candidate is mixed_config]
+    logger.info(f"✂️ Pre-pass kept {len(configs)} of {len(OCR_CONFIGS)} OCR configs")
+    return configs
 
-def denoise_for_ocr(image):
-    """Remove noise while preserving text"""
-    import numpy as np
-    img_array = np.array(image)
-    img_cv = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
+def run_ocr_candidate(processed_image, lang: str, config: str) -> str:
+    """Run a single Tesseract pass for one strategy/config candidate"""
+    if OCR_ENGINE == "tesserocr":
+        return run_tesserocr_candidate(processed_image, lang, config)
+    # pytesseract accepts ndarrays and PIL images alike
+    return pytesseract.image_to_string(processed_image, lang=lang, config=config)
+
+def run_ocr_candidate_lines(processed_image, lang: str, config: str) -> list:
+    """Run a single Tesseract pass and return its lines with confidences.
+    
+    Each line is {"text", "confidence" (0-100), "y", "height"}, with y (line
+    centre) and height relative to the image height so lines from upscaled
+    and original strategies can be aligned.
+    """
+    if OCR_ENGINE == "tesserocr":
+        lines, image_height = run_tesserocr_candidate_lines(processed_image, lang, config)
+    else:
+        data = pytesseract.image_to_data(processed_image, lang=lang, config=config, output_type=pytesseract.Output.DICT)
+        image_height = processed_image.shape[0] if isinstance(processed_image, np.ndarray) else processed_image.size[1]
+        
+        # Group words into lines; non-word rows (pages, blocks, empty boxes) have confidence -1
+        words_by_line = {}
+        for index, word in enumerate(data["text"]):
+            confidence = float(data["conf"][index])
+            if not word.strip() or confidence < 0:
+                continue
+            key = (data["block_num"][index], data["par_num"][index], data["line_num"][index])
+            words_by_line.setdefault(key, []).append(
+                (word.strip(), confidence, data["top"][index], data["top"][index] + data["height"][index])
+            )
+        
+        lines = []
+        for words in words_by_line.values():
+            top = min(word[2] for word in words)
+            bottom = max(word[3] for word in words)
+            lines.append({
+                "text": " ".join(word[0] for word in words),
+                "confidence": sum(word[1] for word in words) / len(words),
+                "top": top,
+                "bottom": bottom,
+            })
+    
+    for line in lines:
+        top, bottom = line.pop("top"), line.pop("bottom")
+        line["y"] = (top + bottom) / 2 / image_height
+        line["height"] = (bottom - top) / image_height
+    return lines
+
+def ocr_candidate_output(processed_image, lang: str, config: str):
+    """OCR one candidate: plain text, or its lines when selection merges by confidence"""
+    if OCR_SELECTION == "confidence":
+        return run_ocr_candidate_lines(processed_image, lang, config)
+    return run_ocr_candidate(processed_image, lang, config)
+
+# Most recently used initialized tesserocr APIs per (lang, oem, variables), per worker thread
+_tesserocr_handles = threading.local()
+
+def parse_tesseract_config(config: str) -> tuple:
+    """Split a pytesseract config string into (oem, psm, {variable: value})"""
+    oem_match = re.search(r'--oem\s+(\d+)', config)
+    psm_match = re.search(r'--psm\s+(\d+)', config)
+    variables = dict(re.findall(r'-c\s+(\w+)=(\S+)', config))
+    oem = int(oem_match.group(1)) if oem_match else 3
+    psm = int(psm_match.group(1)) if psm_match else 3
+    return oem, psm, variables
+
+def get_tesserocr_api(lang: str, oem: int, variables: dict):
+    """Return this thread's API handle for lang/oem/variables, initializing it on first use"""
+    apis = getattr(_tesserocr_handles, "apis", None)
+    if apis is None:
+        apis = _tesserocr_handles.apis = OrderedDict()
+    
+    key = (lang, oem, tuple(sorted(variables.items())))
+    api = apis.get(key)
+    if api is not None:
+        apis.move_to_end(key)
+    else:
+        # Release the least recently used handle's model memory before loading another
+        while len(apis) >= TESSEROCR_MAX_HANDLES:
+            evicted_key, evicted_api = apis.popitem(last=False)
+            evicted_api.End()
+            logger.info(f"🧹 Released in-process Tesseract handle for {evicted_key[0]} (oem {evicted_key[1]}) in {threading.current_thread().name}")
+        kwargs = {"lang": lang, "oem": oem}
+        if TESSDATA_PATH:
+            kwargs["path"] = TESSDATA_PATH
+        api = tesserocr.PyTessBaseAPI(**kwargs)
+        for name, value in variables.items():
+            api.SetVariable(name, value)
+        apis[key] = api
+        logger.info(f"🔧 Initialized in-process Tesseract handle for {lang} (oem {oem}) in {threading.current_thread().name}")
+    return api
+
+def run_tesserocr_candidate(processed_image, lang: str, config: str) -> str:
+    """OCR an in-memory image with a persistent tesserocr handle"""
+    oem, psm, variables = parse_tesseract_config(config)
+    api = get_tesserocr_api(lang, oem, variables)
+    try:
+        api.SetPageSegMode(psm)
+        set_tesserocr_image(api, processed_image)
+        return api.GetUTF8Text()
+    finally:
+        api.Clear()
+
+def set_tesserocr_image(api, processed_image):
+    """Load an ndarray or PIL image into a tesserocr handle"""
+    if isinstance(processed_image, np.ndarray):
+        # Hand the raw pixels over directly, no PIL conversion
+        height, width = processed_image.shape[:2]
+        channels = 1 if processed_image.ndim == 2 else processed_image.shape[2]
+        api.SetImageBytes(np.ascontiguousarray(processed_image).tobytes(), width, height, channels, width * channels)
+        return height
+    api.SetImage(processed_image)
+    return processed_image.size[1]
+
+def run_tesserocr_candidate_lines(processed_image, lang: str, config: str) -> tuple:
+    """Recognize with a persistent tesserocr handle and walk the result line by line"""
+    oem, psm, variables = parse_tesseract_config(config)
+    api = get_tesserocr_api(lang, oem, variables)
+    try:
+        api.SetPageSegMode(psm)
+        image_height = set_tesserocr_image(api, processed_image)
+        api.Recognize()
+        
+        lines = []
+        iterator = api.GetIterator()
+        level = tesserocr.RIL.TEXTLINE
+        if iterator is not None:
+            for line in tesserocr.iterate_level(iterator, level):
+                text = (line.GetUTF8Text(level) or "").strip()
+                if not text:
+                    continue
+                _, top, _, bottom = line.BoundingBox(level)
+                lines.append({"text": text, "confidence": line.Confidence(level), "top": top, "bottom": bottom})
+        return lines, image_height
+    finally:
+        api.Clear()
+
+def collect_candidate_result(all_results: list, strategy_name: str, config_name: str, output):
+    """Score an OCR candidate and keep it if it produced usable text.
+    
+    output is the candidate's text, or its line list under confidence
+    selection; lines are kept as a fourth element for merging.
+    """
+    lines = None
+    if isinstance(output, list):
+        lines = output
+        output = "\n".join(line["text"] for line in lines)
+    text = output
+    if text and text.strip() and len(text.strip()) > 10:
+        # Calculate quality score
+        with stage_timer("score"):
+            score = evaluate_advanced_text_quality(text)
+        result = (f"{strategy_name}_{config_name}", text.strip(), score)
+        all_results.append(result if lines is None else result + (lines,))
+        logger.info(f"  {config_name}: {len(text.strip())} chars, score: {score:.2f}")
+
+def merge_candidate_lines(all_results: list):
+    """Build a page from the most confident reading of each line across candidates.
+    
+    Lines are aligned by their relative vertical position: readings whose
+    centres lie within half a line height of each other are the same line.
+    Returns (text, selection details), or None when no candidate has lines.
+    """
+    readings = [
+        (line, result[0])
+        for result in all_results if len(result) > 3
+        for line in result[3]
+        if line["confidence"] >= OCR_MIN_LINE_CONFIDENCE
+    ]
+    if not readings:
+        return None
+    
+    readings.sort(key=lambda reading: reading[0]["y"])
+    tolerance = 0.5 * float(np.median([line["height"] for line, _ in readings]))
+    
+    clusters = []
+    for line, candidate in readings:
+        # Compare against the cluster's first line so long runs of lines cannot drift together
+        if clusters and line["y"] - clusters[-1][0][0]["y"] <= tolerance:
+            clusters[-1].append((line, candidate))
+        else:
+            clusters.append([(line, candidate)])
+    
+    merged_lines = []
+    sources = {}
+    for cluster in clusters:
+        line, candidate = max(cluster, key=lambda reading: (reading[0]["confidence"], len(reading[0]["text"])))
+        merged_lines.append(line)
+        sources[candidate] = sources.get(candidate, 0) + 1
+    
+    mean_confidence = sum(line["confidence"] for line in merged_lines) / len(merged_lines)
+    logger.info(f"🧩 Merged {len(merged_lines)} lines from {len(sources)} candidates (mean confidence {mean_confidence:.1f})")
+    return "\n".join(line["text"] for line in merged_lines), {
+        "lines": len(merged_lines),
+        "mean_confidence": round(mean_confidence, 1),
+        "sources": sources,
+    }
+
+def run_candidate_grid_serial(graph, timings: dict = None, configs: list = None) -> list:
+    """Run every strategy/config candidate one after another"""
+    all_results = []
+    strategies = get_preprocessing_strategies(graph)
+    
+    for index, (strategy_name, stage_name) in enumerate(strategies):
+        logger.info(f"📸 Testing preprocessing strategy: {strategy_name}")
+        processed_image = graph.stage(stage_name)
+        
+        for config_name, lang, config in configs or OCR_CONFIGS:
+            started = time.monotonic()
+            try:
+                output = ocr_candidate_output(processed_image, lang, config)
+                collect_candidate_result(all_results, strategy_name, config_name, output)
+            except Exception as e:
+                logger.warning(f"  {config_name} failed: {e}")
+            record_stage(f"ocr.{config_name}", time.monotonic() - started)
+            if timings is not None:
+                timings[f"{strategy_name}/{config_name}"] = time.monotonic() - started
+        
+        # Keep peak memory down: drop stages no remaining strategy is built from
+        del processed_image
+        graph.release_unneeded([stage for _, stage in strategies[index + 1:]])
+    
+    return all_results
+
+def run_candidate_grid_cascade(graph, timings: dict, configs: list = None) -> list:
+    """Run candidates in learned order and stop once one is good enough.
+    
+    The cascade stops as soon as a candidate reaches OCR_CASCADE_SCORE_THRESHOLD,
+    OCR_CASCADE_PATIENCE candidates in a row bring no improvement, or the
+    OCR_CASCADE_TIME_BUDGET (seconds) is spent, so a typical upload pays for a
+    few Tesseract passes instead of the full grid.
+    """
+    stage_names = dict(get_preprocessing_strategies(graph))
+    tested_strategies = set()
+    all_results = []
+    started = time.monotonic()
+    best_score = 0.0
+    stale_candidates = 0
+    
+    for strategy_name, config_name, lang, config in get_cascade_candidate_order(configs, list(stage_names)):
+        if strategy_name not in tested_strategies:
+            logger.info(f"📸 Testing preprocessing strategy: {strategy_name}")
+            tested_strategies.add(strategy_name)
+        
+        candidate_started = time.monotonic()
+        try:
+            # Stages are built lazily, only for strategies the cascade reaches
+            output = ocr_candidate_output(graph.stage(stage_names[strategy_name]), lang, config)
+            collect_candidate_result(all_results, strategy_name, config_name, output)
+        except Exception as e:
+            logger.warning(f"  {config_name} failed: {e}")
+        timings[f"{strategy_name}/{config_name}"] = time.monotonic() - candidate_started
+        record_stage(f"ocr.{config_name}", timings[f"{strategy_name}/{config_name}"])
+        
+        candidate_score = max((result[2] for result in all_results), default=0.0)
+        if candidate_score >= best_score + OCR_CASCADE_MIN_GAIN or not best_score:
+            stale_candidates = 0
+        else:
+            stale_candidates += 1
+        best_score = max(best_score, candidate_score)
+        
+        if best_score >= OCR_CASCADE_SCORE_THRESHOLD:
+            logger.info(f"⚡ Cascade early exit after {len(timings)} candidates (score {best_score:.2f})")
+            break
+        if best_score and OCR_CASCADE_PATIENCE > 0 and stale_candidates >= OCR_CASCADE_PATIENCE:
+            logger.info(f"⚡ Cascade stopped after {len(timings)} candidates, no gain in the last {stale_candidates} (score {best_score:.2f})")
+            break
+        if time.monotonic() - started >= OCR_CASCADE_TIME_BUDGET:
+            logger.info(f"⏱️ Cascade time budget spent after {len(timings)} candidates (best score {best_score:.2f})")
+            break
+    
+    return all_results
+
+def get_ocr_strategy_stats_db():
+    """Open the statistics database on first use (caller holds the stats lock)"""
+    global _ocr_strategy_stats_db
+    if _ocr_strategy_stats_db is None:
+        db = sqlite3.connect(OCR_STRATEGY_STATS_PATH, check_same_thread=False, timeout=5)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS strategy_stats ("
+            "pair TEXT PRIMARY KEY, runs INTEGER NOT NULL, wins INTEGER NOT NULL, "
+            "seconds REAL NOT NULL, timed_runs INTEGER NOT NULL)"
+        )
+        db.commit()
+        _ocr_strategy_stats_db = db
+    return _ocr_strategy_stats_db
+
+def load_ocr_strategy_stats() -> dict:
+    """Current per-pair win statistics across all workers (caller holds the stats lock)"""
+    try:
+        rows = get_ocr_strategy_stats_db().execute("SELECT pair, runs, wins, seconds, timed_runs FROM strategy_stats")
+        return {
+            pair: {"runs": runs, "wins": wins, "seconds": seconds, "timed_runs": timed_runs}
+            for pair, runs, wins, seconds, timed_runs in rows
+        }
+    except Exception as e:
+        logger.warning(f"Could not read OCR strategy stats, using grid order: {e}")
+        return {}
+
+def get_cascade_candidate_order(configs: list = None, strategy_names: list = None) -> list:
+    """Order (strategy, config) pairs by smoothed win rate per second of OCR time.
+    
+    Pairs without history fall back to the grid order, which puts the cheap
+    original/hin+eng_psm6 candidate first.
+    """
+    with _ocr_strategy_stats_lock:
+        stats = load_ocr_strategy_stats()
+        
+        grid = []
+        for strategy_name in strategy_names or [name for name, _ in get_preprocessing_strategies()]:
+            for config_name, lang, config in configs or OCR_CONFIGS:
+                pair_stats = stats.get(f"{strategy_name}/{config_name}", {})
+                runs = pair_stats.get("runs", 0)
+                wins = pair_stats.get("wins", 0)
+                timed_runs = pair_stats.get("timed_runs", 0)
+                mean_seconds = pair_stats.get("seconds", 0.0) / timed_runs if timed_runs else 1.0
+                value = ((wins + 1) / (runs + 2)) / max(mean_seconds, 0.01)
+                grid.append((value, len(grid), strategy_name, config_name, lang, config))
+    
+    grid.sort(key=lambda x: (-x[0], x[1]))
+    if OCR_MAX_CANDIDATES > 0:
+        grid = grid[:OCR_MAX_CANDIDATES]
+    return [candidate[2:] for candidate in grid]
+
+def record_ocr_strategy_outcome(sorted_results: list, timings: dict):
+    """Update and persist win statistics for the pairs that ran in this request"""
+    if not sorted_results:
+        return
+    
+    pair_names = {
+        f"{strategy_name}_{config_name}": f"{strategy_name}/{config_name}"
+        for strategy_name, _ in get_preprocessing_strategies()
+        for config_name, _, _ in OCR_CONFIGS
+    }
+    winner = pair_names.get(sorted_results[0][0])
+    ran_pairs = set(timings) | {pair_names[result[0]] for result in sorted_results if result[0] in pair_names}
+    
+    rows = [
+        (pair, int(pair == winner), timings.get(pair, 0.0), int(pair in timings))
+        for pair in ran_pairs
+    ]
+    try:
+        with _ocr_strategy_stats_lock:
+            db = get_ocr_strategy_stats_db()
+            # Increments are applied by SQLite, so concurrent workers add to each other's counts
+            db.executemany(
+                "INSERT INTO strategy_stats (pair, runs, wins, seconds, timed_runs) VALUES (?, 1, ?, ?, ?) "
+                "ON CONFLICT(pair) DO UPDATE SET runs = runs + 1, wins = wins + excluded.wins, "
+                "seconds = seconds + excluded.seconds, timed_runs = timed_runs + excluded.timed_runs",
+                rows
+            )
+            db.commit()
+    except Exception as e:
+        logger.warning(f"Could not save OCR strategy stats: {e}")
+
+def get_ocr_process_pool() -> ProcessPoolExecutor:
+    """Lazily create the shared worker pool for pooled OCR"""
+    global _ocr_process_pool
+    with _ocr_process_pool_lock:
+        if _ocr_process_pool is None:
+            # spawn keeps workers independent of the threads running in the server process
+            _ocr_process_pool = ProcessPoolExecutor(
+                max_workers=OCR_POOL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"🧵 Started OCR process pool with {OCR_POOL_WORKERS} workers")
+        return _ocr_process_pool
+
+def ocr_candidate_from_shared_memory(shm_name: str, shape: tuple, dtype: str, lang: str, config: str):
+    """Pool worker: OCR an image array that the parent placed in shared memory"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        image_array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        output = ocr_candidate_output(image_array, lang, config)
+        del image_array
+        return output
+    finally:
+        shm.close()
+
+def run_candidate_grid_pooled(graph, configs: list = None) -> list:
+    """Fan the strategy/config grid out to the process pool.
+    
+    Each preprocessed image is copied once into a shared memory segment and every
+    config for that strategy reads it from there. Results are collected in grid
+    order, so scoring and ranking are identical to the serial path.
+    """
+    pool = get_ocr_process_pool()
+    strategies = get_preprocessing_strategies(graph)
+    segments = []
+    futures = []
+    
+    try:
+        for index, (strategy_name, stage_name) in enumerate(strategies):
+            logger.info(f"📸 Dispatching preprocessing strategy: {strategy_name}")
+            
+            image_array = graph.stage(stage_name)
+            shm = shared_memory.SharedMemory(create=True, size=image_array.nbytes)
+            segments.append(shm)
+            shared_array = np.ndarray(image_array.shape, dtype=image_array.dtype, buffer=shm.buf)
+            np.copyto(shared_array, image_array)
+            del shared_array
+            graph.release_unneeded([stage for _, stage in strategies[index + 1:]])
+            
+            for config_name, lang, config in configs or OCR_CONFIGS:
+                future = pool.submit(ocr_candidate_from_shared_memory, shm.name,
+                                     image_array.shape, image_array.dtype.str, lang, config)
+                futures.append((strategy_name, config_name, future))
+        
+        all_results = []
+        for strategy_name, config_name, future in futures:
+            try:
+                output = future.result()
+                collect_candidate_result(all_results, strategy_name, config_name, output)
+            except Exception as e:
+                logger.warning(f"  {strategy_name}/{config_name} failed: {e}")
+        
+        return all_results
+        
+    finally:
+        for shm in segments:
+            shm.close()
+            shm.unlink()
+
+# Layout-aware OCR: find text lines once, classify each line's script from its pixels and
+# OCR it only with the matching language model, instead of several full-page passes
+def binarize_for_layout(gray: np.ndarray) -> np.ndarray:
+    """Otsu binarization with ink as non-zero pixels"""
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    # Light text on a dark background: flip so ink stays the minority
+    if np.count_nonzero(binary) > binary.size / 2:
+        binary = cv2.bitwise_not(binary)
+    return binary
+
+def detect_text_lines(binary: np.ndarray) -> list:
+    """Find text lines with a horizontal projection profile.
+    
+    Returns (x, y, w, h) boxes from top to bottom. Row runs separated by small
+    gaps are merged so matras above the headline and below the baseline stay
+    with their line.
+    """
+    height, width = binary.shape
+    ink_per_row = np.count_nonzero(binary, axis=1)
+    rows = ink_per_row >= max(2, int(width * 0.005))
+    
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], rows.astype(np.int8), [0]))))
+    runs = [[int(start), int(end)] for start, end in zip(edges[::2], edges[1::2])]
+    if not runs:
+        return []
+    
+    median_height = float(np.median([end - start for start, end in runs]))
+    merge_gap = max(2, int(median_height * 0.35))
+    merged = [runs[0]]
+    for start, end in runs[1:]:
+        if start - merged[-1][1] <= merge_gap:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    
+    median_height = float(np.median([end - start for start, end in merged]))
+    pad = max(2, int(median_height * 0.15))
+    lines = []
+    for start, end in merged:
+        # Drop specks, rules and other runs far too thin to be text
+        if end - start < max(4, median_height * 0.3):
+            continue
+        columns = np.flatnonzero(np.count_nonzero(binary[start:end], axis=0))
+        if len(columns) == 0:
+            continue
+        x0 = max(0, int(columns[0]) - pad)
+        x1 = min(width, int(columns[-1]) + 1 + pad)
+        y0 = max(0, start - pad)
+        y1 = min(height, end + pad)
+        lines.append((x0, y0, x1 - x0, y1 - y0))
+    return lines
+
+def classify_line_script(binary_line: np.ndarray) -> str:
+    """Guess a line's script from the Devanagari headline (shirorekha).
+    
+    Devanagari words hang from a continuous horizontal stroke, so one row of
+    the line is inked across most of its width. Latin text (English or IAST)
+    has no such row.
+    """
+    columns = np.flatnonzero(np.count_nonzero(binary_line, axis=0))
+    if len(columns) == 0:
+        return "mixed"
+    
+    density = np.count_nonzero(binary_line, axis=1) / (columns[-1] - columns[0] + 1)
+    peak = float(density.max())
+    typical = float(np.median(density[density > 0]))
+    
+    # Latin rows top out around half the width (x-height tops, capital bars)
+    if peak >= 0.68 and peak >= 2.5 * typical:
+        return "devanagari"
+    if peak < 0.62:
+        return "latin"
+    return "mixed"
+
+def get_ocr_layout_executor() -> ThreadPoolExecutor:
+    """Lazily create the thread pool that OCRs layout regions in parallel"""
+    global _ocr_layout_executor
+    with _ocr_process_pool_lock:
+        if _ocr_layout_executor is None:
+            _ocr_layout_executor = ThreadPoolExecutor(max_workers=OCR_LAYOUT_WORKERS, thread_name_prefix="ocr-region")
+        return _ocr_layout_executor
+
+def ocr_text_region(region: np.ndarray, lang: str) -> str:
+    """OCR a single text line"""
+    # Tesseract wants text at least ~30px tall
+    if region.shape[0] < 32:
+        region = cv2.resize(region, None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC)
+    return run_ocr_candidate(region, lang, '--oem 3 --psm 7').strip()
+
+def run_layout_ocr(graph) -> list:
+    """OCR each detected line once, with the language model for its script"""
+    binary = binarize_for_layout(graph.stage("gray"))
+    lines = detect_text_lines(binary)
+    if not lines:
+        return []
+    
+    rgb = graph.stage("rgb")
+    executor = get_ocr_layout_executor()
+    futures = []
+    script_counts = {}
+    for x, y, w, h in lines:
+        script = classify_line_script(binary[y:y + h, x:x + w])
+        script_counts[script] = script_counts.get(script, 0) + 1
+        futures.append(executor.submit(ocr_text_region, rgb[y:y + h, x:x + w], OCR_LAYOUT_LANGUAGES[script]))
+    logger.info(f"🧭 Layout OCR: {len(lines)} lines ({script_counts})")
+    
+    line_texts = []
+    for index, future in enumerate(futures):
+        try:
+            text = future.result()
+        except Exception as e:
+            logger.warning(f"  Line {index + 1} failed: {e}")
+            continue
+        if text:
+            line_texts.append(text)
+    
+    all_results = []
+    collect_candidate_result(all_results, "layout", "regions", "\n".join(line_texts))
+    return all_results
+
+def normalize_page_resolution(rgb: np.ndarray) -> tuple:
+    """Crop to the text bounding box and rescale so the x-height suits Tesseract.
+    
+    Returns (rgb, details); details is empty when no text was found and the
+    image is returned untouched.
+    """
+    binary = binarize_for_layout(cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY))
+    lines = detect_text_lines(binary)
+    if not lines:
+        return rgb, {}
+    
+    height, width = binary.shape
+    margin = max(8, int(0.01 * max(height, width)))
+    x0 = max(0, min(x for x, _, _, _ in lines) - margin)
+    y0 = max(0, min(y for _, y, _, _ in lines) - margin)
+    x1 = min(width, max(x + w for x, _, w, _ in lines) + margin)
+    y1 = min(height, max(y + h for _, y, _, h in lines) + margin)
+    rgb = rgb[y0:y1, x0:x1]
+    
+    x_height = estimate_x_height(binary[y0:y1, x0:x1], lines)
+    details = {"crop": [x0, y0, x1 - x0, y1 - y0], "x_height": round(x_height, 1)}
+    
+    if x_height:
+        scale = min(4.0, max(0.25, OCR_TARGET_X_HEIGHT / x_height))
+        # Close enough already: resampling would cost more than it gains
+        if not 0.8 <= scale <= 1.25:
+            interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC
+            rgb = cv2.resize(rgb, None, fx=scale, fy=scale, interpolation=interpolation)
+            details["scale"] = round(scale, 3)
+    
+    rgb = np.ascontiguousarray(rgb)
+    details["size"] = [rgb.shape[1], rgb.shape[0]]
+    logger.info(f"📐 Normalized page: {details}")
+    return rgb, details
+
+def estimate_x_height(binary: np.ndarray, lines: list) -> float:
+    """Median glyph height: letters for Latin text, headline-to-baseline word bodies for Devanagari"""
+    median_line_height = float(np.median([h for _, _, _, h in lines]))
+    _, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    heights = stats[1:, cv2.CC_STAT_HEIGHT]
+    areas = stats[1:, cv2.CC_STAT_AREA]
+    # Skip specks, dots and matras, and blobs taller than a line (rules, merged lines)
+    glyphs = heights[(areas >= 4) & (heights >= 0.25 * median_line_height) & (heights <= median_line_height)]
+    return float(np.median(glyphs)) if len(glyphs) else 0.0
+
+# Preprocessing graph: every strategy is built from named stages over one RGB ndarray,
+# and stages shared between strategies (LAB split, CLAHE output, ...) are computed once per image
+PREPROCESSING_STAGE_DEPENDENCIES = {
+    "rgb": (),
+    "gray": ("rgb",),
+    "upscaled": ("rgb",),
+    "lab_channels": ("rgb",),
+    "clahe_l": ("lab_channels",),
+    "enhanced_contrast": ("lab_channels", "clahe_l"),
+    "sharpened": ("enhanced_contrast",),
+    "combined": ("sharpened",),
+}
+
+SHARPEN_KERNEL = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]])
+
+class PreprocessingGraph:
+    """Memoized preprocessing stages for one RGB image held as an ndarray"""
+    
+    def __init__(self, rgb: np.ndarray, normalized: bool = False):
+        self._stages = {"rgb": rgb}
+        self.normalized = normalized
+    
+    def stage(self, name: str) -> np.ndarray:
+        """Return a stage's output, building it (and its inputs) on first use"""
+        result = self._stages.get(name)
+        if result is None:
+            # Includes the time to build any inputs that were not memoized yet
+            with stage_timer(f"preprocess.{name}"):
+                result = self._stages[name] = getattr(self, f"_build_{name}")()
+        return result
+    
+    def release_unneeded(self, upcoming_stages: list):
+        """Drop memoized stages that none of the upcoming stages are built from"""
+        keep = {"rgb"}
+        pending = list(upcoming_stages)
+        while pending:
+            name = pending.pop()
+            if name not in keep:
+                keep.add(name)
+                pending.extend(PREPROCESSING_STAGE_DEPENDENCIES[name])
+        for name in list(self._stages):
+            if name not in keep:
+                del self._stages[name]
+    
+    def _build_gray(self):
+        return cv2.cvtColor(self.stage("rgb"), cv2.COLOR_RGB2GRAY)
     
-    # Apply bilateral filter for noise reduction
-    denoised = cv2.bilateralFilter(img_cv, 9, 75, 75)
+    def _build_upscaled(self):
+        """Smart upscaling for better OCR"""
+        rgb = self.stage("rgb")
+        height, width = rgb.shape[:2]
+        if width < 1500 or height < 1000:
+            scale_factor = max(1500/width, 1000/height, 2.0)
+            new_width = int(width * scale_factor)
+            new_height = int(height * scale_factor)
+            # PIL's LANCZOS, not cv2.INTER_LANCZOS4: the two kernels differ by up to 23 levels per pixel
+            # and OCR accuracy was only ever measured on PIL's output
+            return np.asarray(Image.fromarray(rgb).resize((new_width, new_height), Image.Resampling.LANCZOS))
+        return rgb
+    
+    def _build_lab_channels(self):
+        return cv2.split(cv2.cvtColor(self.stage("rgb"), cv2.COLOR_RGB2LAB))
+    
+    def _build_clahe_l(self):
+        # Apply CLAHE to L channel
+        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
+        return clahe.apply(self.stage("lab_channels")[0])
+    
+    def _build_enhanced_contrast(self):
+        """Enhance contrast for better text recognition"""
+        _, a, b = self.stage("lab_channels")
+        return cv2.cvtColor(cv2.merge([self.stage("clahe_l"), a, b]), cv2.COLOR_LAB2RGB)
     
-    # Convert back to PIL
-    denoised_rgb = cv2.cvtColor(denoised, cv2.COLOR_BGR2RGB)
-    return Image.fromarray(denoised_rgb)
+    def _build_sharpened(self):
+        """Sharpen image for better text clarity"""
+        return cv2.filter2D(self.stage("enhanced_contrast"), -1, SHARPEN_KERNEL)
+    
+    def _build_combined(self):
+        """Contrast enhancement, sharpening and noise removal in sequence"""
+        # Apply bilateral filter for noise reduction while preserving text
+        return cv2.bilateralFilter(self.stage("sharpened"), 9, 75, 75)
 
 def adaptive_threshold_for_ocr(image):
     """Apply adaptive thresholding for better text separation"""
@@ -210,19 +1246,128 @@ def morphological_processing_for_ocr(image):
     processed_rgb = cv2.cvtColor(processed_3ch, cv2.COLOR_BGR2RGB)
     return Image.fromarray(processed_rgb)
 
-def combined_preprocessing_for_ocr(image):
-    """Combine multiple preprocessing techniques"""
-    # Apply multiple techniques in sequence
-    enhanced = enhance_contrast_for_ocr(image)
-    enhanced = sharpen_for_ocr(enhanced)
-    enhanced = denoise_for_ocr(enhanced)
-    return enhanced
+# Text features shared by the quality scorers and the transliteration line/word classifiers.
+# Characters are tallied in one pass and each distinct character is classified once into a
+# bit set (memoized across texts); the class counts are then summed per distinct character.
+CHAR_HINDI = 1
+CHAR_ENGLISH = 2
+CHAR_DIGIT = 4
+CHAR_DIACRITIC = 8
+CHAR_TRANSLITERATION_MARK = 16
+CHAR_BRACKET_SPECIAL = 32
+CHAR_ARTIFACT_SPECIAL = 64
+CHAR_SENTENCE_PUNCTUATION = 128
+CHARACTER_CLASSES = (
+    ("hindi", CHAR_HINDI),
+    ("english", CHAR_ENGLISH),
+    ("digits", CHAR_DIGIT),
+    ("diacritics", CHAR_DIACRITIC),
+    ("transliteration_marks", CHAR_TRANSLITERATION_MARK),
+    ("bracket_specials", CHAR_BRACKET_SPECIAL),
+    ("artifact_specials", CHAR_ARTIFACT_SPECIAL),
+    ("sentence_punctuation", CHAR_SENTENCE_PUNCTUATION),
+)
+SCORING_DIACRITICS = frozenset('āīūṃḥṛ')
+TRANSLITERATION_MARKS = frozenset('āīūṛṃḥśṣñṭḍ')
+BRACKET_SPECIALS = frozenset('[]{}()@#$%^&*+=|\\/~`')
+ARTIFACT_EXEMPT_PUNCTUATION = frozenset('.,;:!?()[]{}"\'।॥')
+SENTENCE_PUNCTUATION = frozenset('।॥.?!')
+character_flags = {}
+# Texts at least this long are tallied with NumPy over their code points; below it the
+# array setup costs more than collections.Counter
+CHARACTER_TALLY_NUMPY_MIN = 256
+
+# Keywords are matched as substrings of the lowercased text. CPython's substring search beats a
+# compiled alternation regex at this list size, so hits are found once per text and shared.
+SPIRITUAL_KEYWORDS = (
+    'siddhant', 'madhuri', 'hari', 'krishna', 'guru', 'divine', 'blessed', 'eternal', 'residence', 'abode',
+    'shri', 'kripalu', 'braj', 'vas', 'narak', 'svarg', 'apavarg', 'mamgat', 'nahim', 'baikumth', 'vilas',
+    'bhikh', 'manamohan', 'govind', 'rain', 'din', 'jag', 'pas', 'madamatta', 'ras', 'krpalu', 'das',
+    'maharaj', 'prem', 'radhe', 'shyam', 'sundar', 'deva', 'bhagwan', 'ishwar', 'paramatma',
+)
+# The subset `evaluate_text_quality` rewards
+BASIC_SPIRITUAL_KEYWORDS = frozenset(SPIRITUAL_KEYWORDS[:12])
+
+def tally_characters(text: str):
+    """(character, count) pairs for the distinct characters of a text"""
+    if len(text) < CHARACTER_TALLY_NUMPY_MIN:
+        return CharacterCounter(text).items()
+    
+    codepoints = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    distinct, counts = np.unique(codepoints, return_counts=True)
+    return zip(map(chr, distinct.tolist()), counts.tolist())
+
+def classify_character(char: str) -> int:
+    """Bit set of the CHAR_* classes a character belongs to"""
+    flags = character_flags.get(char)
+    if flags is not None:
+        return flags
+    
+    hindi = '\u0900' <= char <= '\u097F'
+    flags = CHAR_HINDI if hindi else 0
+    if char.isalpha() and ord(char) < 128:
+        flags |= CHAR_ENGLISH
+    if char.isdigit():
+        flags |= CHAR_DIGIT
+    if char in SCORING_DIACRITICS:
+        flags |= CHAR_DIACRITIC
+    if char in TRANSLITERATION_MARKS:
+        flags |= CHAR_TRANSLITERATION_MARK
+    if char in BRACKET_SPECIALS:
+        flags |= CHAR_BRACKET_SPECIAL
+    if not char.isalnum() and not char.isspace() and not hindi and char not in ARTIFACT_EXEMPT_PUNCTUATION:
+        flags |= CHAR_ARTIFACT_SPECIAL
+    if char in SENTENCE_PUNCTUATION:
+        flags |= CHAR_SENTENCE_PUNCTUATION
+    
+    character_flags[char] = flags
+    return flags
+
+class TextFeatures:
+    """Script counts, lines, words and keyword hits of one text; lines, words and keywords are computed on first use"""
+    
+    def __init__(self, text: str):
+        self.text = text
+        self.length = len(text)
+        
+        # Character tally in one pass, then fold distinct characters into their class combinations
+        by_flags = {}
+        for char, count in tally_characters(text):
+            flags = classify_character(char)
+            if flags:
+                by_flags[flags] = by_flags.get(flags, 0) + count
+        
+        self.flags = 0
+        for flags in by_flags:
+            self.flags |= flags
+        for name, bit in CHARACTER_CLASSES:
+            setattr(self, name, sum(count for flags, count in by_flags.items() if flags & bit))
+    
+    @cached_property
+    def lower(self) -> str:
+        return self.text.lower()
+    
+    @cached_property
+    def lines(self) -> list:
+        """Non-empty lines, stripped"""
+        return [line for line in (line.strip() for line in self.text.split('\n')) if line]
+    
+    @cached_property
+    def words(self) -> list:
+        return self.text.split()
+    
+    @cached_property
+    def keyword_hits(self) -> frozenset:
+        """SPIRITUAL_KEYWORDS that occur anywhere in the lowercased text"""
+        lower = self.lower
+        return frozenset(word for word in SPIRITUAL_KEYWORDS if word in lower)
 
 def evaluate_advanced_text_quality(text: str) -> float:
     """Advanced text quality evaluation for mixed Hindi-English content"""
     if not text or len(text.strip()) < 5:
         return 0.0
     
+    features = TextFeatures(text)
     score = 0.5  # Base score
     
     # Length assessment (more generous)
@@ -238,9 +1383,9 @@ def evaluate_advanced_text_quality(text: str) -> float:
         score += 0.2
     
     # Character analysis
-    hindi_chars = len([c for c in text if '\u0900' <= c <= '\u097F'])
-    english_chars = len([c for c in text if c.isalpha() and ord(c) < 128])
-    total_chars = len(text)
+    hindi_chars = features.hindi
+    english_chars = features.english
+    total_chars = features.length
     
     # Strong bonus for mixed Hindi-English content
     if hindi_chars > 0 and english_chars > 0:
@@ -252,8 +1397,7 @@ def evaluate_advanced_text_quality(text: str) -> float:
             score += 0.3
     
     # Line structure analysis
-    lines = [line.strip() for line in text.split('\n') if line.strip()]
-    line_count = len(lines)
+    line_count = len(features.lines)
     
     if line_count > 15:  # Multiple verses
         score += 0.4
@@ -266,29 +1410,27 @@ def evaluate_advanced_text_quality(text: str) -> float:
     
     # Quality indicators
     # Bonus for proper punctuation
-    if any(p in text for p in ['।', '॥', '.', '?', '!']):
+    if features.sentence_punctuation:
         score += 0.15
     
     # Bonus for common spiritual/religious words
-    spiritual_words = ['siddhant', 'madhuri', 'hari', 'krishna', 'guru', 'divine', 'blessed', 'eternal', 'residence', 'abode', 'shri', 'kripalu', 'braj', 'vas', 'narak', 'svarg', 'apavarg', 'mamgat', 'nahim', 'baikumth', 'vilas', 'bhikh', 'manamohan', 'govind', 'rain', 'din', 'jag', 'pas', 'madamatta', 'ras', 'krpalu', 'das', 'maharaj', 'prem', 'radhe', 'shyam', 'sundar', 'deva', 'bhagwan', 'ishwar', 'paramatma']
-    text_lower = text.lower()
-    spiritual_word_count = sum(1 for word in spiritual_words if word in text_lower)
+    spiritual_word_count = len(features.keyword_hits)
     if spiritual_word_count > 0:
         score += min(0.3, spiritual_word_count * 0.05)
     
     # Bonus for proper diacritics
-    diacritic_chars = len([c for c in text if c in 'āīūṃḥṛ'])
+    diacritic_chars = features.diacritics
     if diacritic_chars > 0:
         score += min(0.2, diacritic_chars * 0.01)
     
     # Penalty for excessive special characters (OCR artifacts)
-    special_chars = len([c for c in text if c in '[]{}()@#$%^&*+=|\\/~`'])
-    if special_chars > len(text) * 0.1:  # More than 10% special chars
+    special_chars = features.bracket_specials
+    if special_chars > total_chars * 0.1:  # More than 10% special chars
         score -= 0.2
     
     # Penalty for excessive numbers (likely OCR artifacts)
-    numbers = len([c for c in text if c.isdigit()])
-    if numbers > len(text) * 0.2:  # More than 20% numbers
+    numbers = features.digits
+    if numbers > total_chars * 0.2:  # More than 20% numbers
         score -= 0.1
     
     return min(10.0, max(0.0, score))
@@ -585,221 +1727,456 @@ def apply_minimal_processing(img_cv):
     
     return img_cv
 
-def ai_transliterate_to_hindi(transliteration_text: str) -> str:
-    """AI-powered transliteration using Google Translate API"""
-    try:
-        # Use Google Translate API for transliteration
-        # This is a free API endpoint that works without authentication
-        url = "https://translate.googleapis.com/translate_a/single"
-        
-        params = {
-            'client': 'gtx',
-            'sl': 'en',  # source language (English)
-            'tl': 'hi',  # target language (Hindi)
-            'dt': 't',   # transliteration
-            'q': transliteration_text
-        }
-        
-        response = requests.get(url, params=params, timeout=2)
+# Remote transliteration: one pooled async HTTP client on its own event loop thread, shared by
+# every caller. Lines are packed into as few upstream requests as possible, a token bucket caps
+# the request rate, and a circuit breaker sends traffic to the local transliterate_to_hindi
+# after repeated failures.
+REMOTE_TRANSLITERATE_URL = os.getenv("REMOTE_TRANSLITERATE_URL", "https://translate.googleapis.com/translate_a/single")
+REMOTE_TRANSLITERATE_TIMEOUT = float(os.getenv("REMOTE_TRANSLITERATE_TIMEOUT", "2"))
+REMOTE_TRANSLITERATE_CONCURRENCY = int(os.getenv("REMOTE_TRANSLITERATE_CONCURRENCY", "4"))
+# Characters of input packed into one upstream request (the text travels in the query string)
+REMOTE_TRANSLITERATE_BATCH_CHARS = int(os.getenv("REMOTE_TRANSLITERATE_BATCH_CHARS", "1500"))
+REMOTE_TRANSLITERATE_RATE = float(os.getenv("REMOTE_TRANSLITERATE_RATE", "5"))
+REMOTE_TRANSLITERATE_BURST = int(os.getenv("REMOTE_TRANSLITERATE_BURST", "10"))
+REMOTE_TRANSLITERATE_BREAKER_FAILURES = int(os.getenv("REMOTE_TRANSLITERATE_BREAKER_FAILURES", "3"))
+REMOTE_TRANSLITERATE_BREAKER_SECONDS = float(os.getenv("REMOTE_TRANSLITERATE_BREAKER_SECONDS", "30"))
+
+remote_transliteration_requests_total = Counter(
+    "remote_transliteration_requests_total", "Packed remote transliteration requests by outcome", ("outcome",)
+)
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `burst`; used from a single event loop"""
+    
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+    
+    async def acquire(self, max_wait: float) -> bool:
+        """Take a token, waiting for a refill if that takes at most max_wait seconds"""
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        wait = (1 - self.tokens) / self.rate
+        if wait > max_wait:
+            return False
+        # Reserve the token now so concurrent waiters queue behind it
+        self.tokens -= 1
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return True
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failures; after `reset_seconds` one trial call goes through"""
+    
+    def __init__(self, threshold: int, reset_seconds: float):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+    
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+    
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        return False
+    
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info("✅ Remote transliteration recovered, circuit closed")
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+    
+    def record_failure(self):
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.threshold:
+            if self.opened_at is None:
+                logger.warning(f"⚠️ Remote transliteration failed {self.failures} times, using local fallback for {self.reset_seconds:g}s")
+            self.opened_at = time.monotonic()
+
+def pack_transliteration_texts(texts: list, max_chars: int) -> list:
+    """Group texts into packs sent as one newline-joined request each"""
+    packs = []
+    current = []
+    size = 0
+    for text in texts:
+        if current and size + len(text) + 1 > max_chars:
+            packs.append(current)
+            current = []
+            size = 0
+        current.append(text)
+        size += len(text) + 1
+    if current:
+        packs.append(current)
+    return packs
+
+def parse_remote_transliteration(result, pack: list):
+    """Split a translate_a/single response back into one output per text in the pack, or None"""
+    if not result or not result[0]:
+        return None
+    joined = ''.join(item[0] for item in result[0] if item and item[0])
+    lines = joined.split('\n')
+    if len(lines) != sum(text.count('\n') + 1 for text in pack):
+        return None
+    outputs = []
+    for text in pack:
+        count = text.count('\n') + 1
+        outputs.append('\n'.join(line.strip() for line in lines[:count]).strip())
+        lines = lines[count:]
+    return outputs
+
+class RemoteTransliterator:
+    """Async pooled client for the remote transliteration API, callable from any thread"""
+    
+    def __init__(self):
+        self.bucket = TokenBucket(REMOTE_TRANSLITERATE_RATE, REMOTE_TRANSLITERATE_BURST)
+        self.breaker = CircuitBreaker(REMOTE_TRANSLITERATE_BREAKER_FAILURES, REMOTE_TRANSLITERATE_BREAKER_SECONDS)
+        self._loop = None
+        self._client = None
+        self._semaphore = None
+        self._lock = threading.Lock()
+    
+    def submit(self, texts: list) -> Future:
+        """Schedule a transliteration on the client's event loop; returns a concurrent Future"""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="remote-transliteration", daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(self.transliterate(texts), self._loop)
+    
+    async def transliterate(self, texts: list) -> list:
+        """[(output, "remote" or "local")] in input order"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=REMOTE_TRANSLITERATE_TIMEOUT,
+                limits=httpx.Limits(max_connections=REMOTE_TRANSLITERATE_CONCURRENCY,
+                                    max_keepalive_connections=REMOTE_TRANSLITERATE_CONCURRENCY)
+            )
+            self._semaphore = asyncio.Semaphore(REMOTE_TRANSLITERATE_CONCURRENCY)
         
-        if response.status_code == 200:
-            result = response.json()
-            if result and len(result) > 0 and result[0]:
-                # Extract the transliterated text
-                transliterated_parts = []
-                for item in result[0]:
-                    if item and len(item) > 0:
-                        transliterated_parts.append(item[0])
-                
-                transliterated_text = ''.join(transliterated_parts)
-                
-                # Clean up the result
-                transliterated_text = transliterated_text.strip()
-                
-                if transliterated_text and transliterated_text != transliteration_text:
-                    logger.info(f"AI transliteration: '{transliteration_text}' -> '{transliterated_text}'")
-                    return transliterated_text
-                else:
-                    # Fallback to dictionary-based transliteration
-                    return transliterate_to_hindi(transliteration_text)
-            else:
-                return transliterate_to_hindi(transliteration_text)
+        packs = pack_transliteration_texts(texts, REMOTE_TRANSLITERATE_BATCH_CHARS)
+        results = await asyncio.gather(*(self._transliterate_pack(pack) for pack in packs))
+        return [output for pack_outputs in results for output in pack_outputs]
+    
+    async def _transliterate_pack(self, pack: list) -> list:
+        outputs = None
+        if self.breaker.state == "open":
+            outcome = "circuit_open"
+        elif not await self.bucket.acquire(REMOTE_TRANSLITERATE_TIMEOUT):
+            outcome = "rate_limited"
+        elif not self.breaker.allow():
+            outcome = "circuit_open"
         else:
-            logger.warning(f"Google Translate API failed with status {response.status_code}, using fallback")
-            return transliterate_to_hindi(transliteration_text)
-            
-    except Exception as e:
-        logger.error(f"AI transliteration error: {e}, using fallback")
-        return transliterate_to_hindi(transliteration_text)
+            async with self._semaphore:
+                try:
+                    response = await self._client.get(REMOTE_TRANSLITERATE_URL, params={
+                        'client': 'gtx',
+                        'sl': 'en',  # source language (English)
+                        'tl': 'hi',  # target language (Hindi)
+                        'dt': 't',   # transliteration
+                        'q': '\n'.join(pack)
+                    })
+                    response.raise_for_status()
+                    outputs = parse_remote_transliteration(response.json(), pack)
+                    self.breaker.record_success()
+                    outcome = "ok" if outputs is not None else "unparsed"
+                except Exception as e:
+                    self.breaker.record_failure()
+                    logger.warning(f"Remote transliteration failed for {len(pack)} texts: {type(e).__name__} {e}, using fallback")
+                    outcome = "error"
+        remote_transliteration_requests_total.inc(outcome)
+        
+        if outputs is None:
+            outputs = [None] * len(pack)
+        # Empty or unchanged answers fall back to dictionary-based transliteration
+        return [
+            (output, "remote") if output and output != text else (transliterate_to_hindi(text), "local")
+            for text, output in zip(pack, outputs)
+        ]
 
-def transliterate_to_hindi(transliteration_text: str) -> str:
-    """Convert transliteration to Hindi Devanagari script"""
-    try:
-        # Comprehensive transliteration mapping
-        transliteration_map = {
-            # Vowels
-            'a': 'अ', 'aa': 'आ', 'ā': 'आ', 'i': 'इ', 'ii': 'ई', 'ī': 'ई',
-            'u': 'उ', 'uu': 'ऊ', 'ū': 'ऊ', 'e': 'ए', 'ee': 'ई', 'o': 'ओ', 'oo': 'ऊ',
-            'ai': 'ऐ', 'au': 'औ', 'ri': 'ऋ', 'rī': 'ॠ', 'lri': 'ऌ', 'lrii': 'ॡ',
-            
-            # Consonants
-            'k': 'क', 'kh': 'ख', 'g': 'ग', 'gh': 'घ', 'ng': 'ङ', 'ch': 'च', 'chh': 'छ',
-            'j': 'ज', 'jh': 'झ', 'ny': 'ञ', 't': 'त', 'th': 'थ', 'd': 'द', 'dh': 'ध',
-            'n': 'न', 'p': 'प', 'ph': 'फ', 'b': 'ब', 'bh': 'भ', 'm': 'म', 'y': 'य',
-            'r': 'र', 'l': 'ल', 'v': 'व', 'sh': 'श', 'shh': 'ष', 's': 'स', 'h': 'ह',
-            
-            # Retroflex consonants
-            't.': 'ट', 'th.': 'ठ', 'd.': 'ड', 'dh.': 'ढ', 'n.': 'ण',
-            
-            # Special characters
-            '.': '।', '..': '॥', ',': ',', ';': ';', ':': ':', '!': '!', '?': '?',
-            
-            # Common spiritual words
-            'hari': 'हरि', 'krishna': 'कृष्ण', 'ram': 'राम', 'shiva': 'शिव', 'guru': 'गुरु',
-            'dev': 'देव', 'devi': 'देवी', 'bhagavan': 'भगवान', 'ishwar': 'ईश्वर',
-            'brahma': 'ब्रह्म', 'vishnu': 'विष्णु', 'mahesh': 'महेश', 'ganesh': 'गणेश',
-            'lakshmi': 'लक्ष्मी', 'saraswati': 'सरस्वती', 'durga': 'दुर्गा', 'kali': 'काली',
-            'shri': 'श्री', 'om': 'ॐ', 'namah': 'नमः', 'shivaya': 'शिवाय',
-            
-            # Common words from your spiritual texts
-            'siddhant': 'सिद्धांत', 'madhuri': 'माधुरी', 'kripalu': 'कृपालु',
-            'shyamsundar': 'श्यामसुंदर', 'braj': 'ब्रज', 'vraja': 'व्रज',
-            'gokul': 'गोकुल', 'vrindavan': 'वृंदावन', 'mathura': 'मथुरा',
-            'radha': 'राधा', 'gopi': 'गोपी', 'gopala': 'गोपाल',
-            'nand': 'नंद', 'yashoda': 'यशोदा', 'balram': 'बलराम',
-            
-            # Kripalu Ji Maharaj specific vocabulary
-            'kripaluji': 'कृपालुजी', 'kripalu ji': 'कृपालु जी', 'maharaj': 'महाराज',
-            'maharajji': 'महाराजजी', 'maharaj ji': 'महाराज जी', 'kripaluji maharaj': 'कृपालुजी महाराज',
-            'kripaluji maharajji': 'कृपालुजी महाराजजी', 'maharajji kripaluji': 'महाराजजी कृपालुजी',
-            
-            # Kripalu Ji's unique spiritual concepts
-            'premras': 'प्रेमरस', 'prem ras': 'प्रेम रस', 'rasleela': 'रसलीला',
-            'ras leela': 'रस लीला', 'raslila': 'रसलीला', 'ras lila': 'रस लीला',
-            'prembhakti': 'प्रेमभक्ति', 'prem bhakti': 'प्रेम भक्ति', 'bhaktiras': 'भक्तिरस',
-            'bhakti ras': 'भक्ति रस', 'premrasa': 'प्रेमरस', 'prem rasa': 'प्रेम रस',
-            
-            # Kripalu Ji's devotional terminology
-            'krishnaprem': 'कृष्णप्रेम', 'krishna prem': 'कृष्ण प्रेम', 'radhaprem': 'राधाप्रेम',
-            'radha prem': 'राधा प्रेम', 'radhakrishna': 'राधाकृष्ण', 'radha krishna': 'राधा कृष्ण',
-            'radheshyam': 'राधेश्याम', 'radhe shyam': 'राधे श्याम', 'radheshyamji': 'राधेश्यामजी',
-            'radheshyam ji': 'राधेश्याम जी', 'shyamsundarji': 'श्यामसुंदरजी', 'shyamsundar ji': 'श्यामसुंदर जी',
-            
-            # Kripalu Ji's philosophical terms
-            'sarvadarshan': 'सर्वदर्शन', 'sarva darshan': 'सर्व दर्शन', 'sarvadarshanasangraha': 'सर्वदर्शनसंग्रह',
-            'sarva darshan sangraha': 'सर्व दर्शन संग्रह', 'vedanta': 'वेदांत', 'vedanta darshan': 'वेदांत दर्शन',
-            'advaita': 'अद्वैत', 'dvaita': 'द्वैत', 'vishishtadvaita': 'विशिष्टाद्वैत', 'vishisht advaita': 'विशिष्ट अद्वैत',
-            
-            # Kripalu Ji's specific divine names
-            'krishnaji': 'कृष्णजी', 'krishna ji': 'कृष्ण जी', 'radhaji': 'राधाजी', 'radha ji': 'राधा जी',
-            'ramji': 'रामजी', 'ram ji': 'राम जी', 'sitaramji': 'सीतारामजी', 'sita ram ji': 'सीता राम जी',
-            'hanumanji': 'हनुमानजी', 'hanuman ji': 'हनुमान जी', 'ganeshji': 'गणेशजी', 'ganesh ji': 'गणेश जी',
-            
-            # Kripalu Ji's ashram and place names
-            'barsana': 'बरसाना', 'gokuldham': 'गोकुलधाम', 'gokul dham': 'गोकुल धाम',
-            'vrindavan dham': 'वृंदावन धाम', 'vrindavandham': 'वृंदावनधाम', 'premdham': 'प्रेमधाम',
-            'prem dham': 'प्रेम धाम', 'rasdham': 'रसधाम', 'ras dham': 'रस धाम',
-            
-            # Kripalu Ji's unique phrases and expressions
-            'jai jai': 'जय जय', 'jai sri': 'जय श्री', 'jai shri': 'जय श्री', 'jai radhe': 'जय राधे',
-            'jai krishna': 'जय कृष्ण', 'jai ram': 'जय राम', 'hari bol': 'हरि बोल', 'hari om': 'हरि ॐ',
-            'radhe radhe': 'राधे राधे', 'sita ram': 'सीता राम', 'ram ram': 'राम राम',
-            
-            # Kripalu Ji's spiritual practices
-            'kirtan': 'कीर्तन', 'bhajan': 'भजन', 'satsang': 'सत्संग', 'sat sang': 'सत संग',
-            'sadhana': 'साधना', 'tapasya': 'तपस्या', 'dhyan': 'ध्यान', 'samadhi': 'समाधि',
-            'moksha': 'मोक्ष', 'mukti': 'मुक्ति', 'nirvana': 'निर्वाण', 'kaivalya': 'कैवल्य',
-            
-            # Kripalu Ji's divine attributes
-            'krishna prem': 'कृष्ण प्रेम', 'krishna bhakti': 'कृष्ण भक्ति', 'krishna seva': 'कृष्ण सेवा',
-            'radha prem': 'राधा प्रेम', 'radha bhakti': 'राधा भक्ति', 'radha seva': 'राधा सेवा',
-            'guru prem': 'गुरु प्रेम', 'guru bhakti': 'गुरु भक्ति', 'guru seva': 'गुरु सेवा',
-            
-            # More specific transliteration patterns
-            'kabai': 'कबै', 'paīhaum': 'पैहौं', 'paihaum': 'पैहौं', 'vās': 'वास',
-            'haum': 'हौं', 'brajvās': 'ब्रजवास', 'braj': 'ब्रज', 'vas': 'वास',
-            'narak': 'नरक', 'svarg': 'स्वर्ग', 'apavarg': 'अपवर्ग',
-            'māmgat': 'माँगत', 'mamgat': 'माँगत', 'nahim': 'नहिं', 'baikumth': 'बैकुण्ठ',
-            'vilās': 'विलास', 'vilas': 'विलास', 'bhīkh': 'भीख', 'bhikh': 'भीख',
-            'ek': 'एक', 'manamohan': 'मनमोहन', 'puravahu': 'पुरवहु',
-            'mām': 'माम्', 'mam': 'माम्', 'abhilās': 'अभिलास', 'abhilas': 'अभिलास', 'gāūm': 'गाऊं', 'gaum': 'गाऊं',
-            'guna': 'गुण', 'govind': 'गोविंद', 'rain-din': 'रैन-दिन', 'rain': 'रैन', 'din': 'दिन',
-            'jāūm': 'जाऊं', 'jam': 'जाऊं', 'jag': 'जग', 'pas': 'पास',
-            'hvai': 'ह्वै', 'madamatta': 'मदमत्त', 'nikuñjani': 'निकुंजनि', 'nikufijani': 'निकुंजनि',
-            'puñjani': 'पुंजनि', 'pufijani': 'पुंजनि', 'lakhūm': 'लखूँ', 'lakhim': 'लखूँ', 'mañju': 'मंजु', 'mafiju': 'मंजु',
-            'ras-rās': 'रस-रास', 'ras-ras': 'रस-रास', 'haum': 'हौं', 'krīpālu': 'कृपालु', 'krpalu': 'कृपालु',
-            'asa': 'अस', 'dās': 'दास', 'das': 'दास', 'kahāūm': 'कहाऊँ', 'kahatim': 'कहाऊँ', 'bani': 'बनि',
-            'dāsan': 'दासन', 'dasan': 'दासन', 'ko': 'को',
-            'arjun': 'अर्जुन', 'bhima': 'भीम', 'yudhishthir': 'युधिष्ठिर',
-            'nakul': 'नकुल', 'sahadev': 'सहदेव', 'duryodhan': 'दुर्योधन',
-            'karna': 'कर्ण', 'dron': 'द्रोण', 'bhishma': 'भीष्म',
-            
-            # Common phrases
-            'jai': 'जय', 'jai jai': 'जय जय', 'hari bol': 'हरि बोल',
-            'radhe radhe': 'राधे राधे', 'shri krishna': 'श्री कृष्ण',
-            'hare krishna': 'हरे कृष्ण', 'hare ram': 'हरे राम',
-            'om namah': 'ॐ नमः', 'om shivaya': 'ॐ शिवाय',
-            
-            # Spiritual concepts
-            'dharma': 'धर्म', 'karma': 'कर्म', 'moksha': 'मोक्ष', 'maya': 'माया',
-            'bhakti': 'भक्ति', 'prem': 'प्रेम', 'ras': 'रस', 'leela': 'लीला',
-            'bhajan': 'भजन', 'kirtan': 'कीर्तन', 'stotra': 'स्तोत्र',
-            'mantra': 'मंत्र', 'shloka': 'श्लोक', 'geeta': 'गीता',
-            'ramayana': 'रामायण', 'mahabharat': 'महाभारत', 'puran': 'पुराण',
-            
-            # Common verbs and words
-            'kar': 'कर', 'karu': 'करूं', 'karta': 'कर्ता', 'karte': 'करते',
-            'ho': 'हो', 'hai': 'है', 'hain': 'हैं', 'tha': 'था', 'the': 'थे',
-            'main': 'मैं', 'tum': 'तुम', 'aap': 'आप', 'hum': 'हम',
-            'ye': 'ये', 'vo': 'वो', 'is': 'इस', 'us': 'उस',
-            'ka': 'का', 'ke': 'के', 'ki': 'की', 'ko': 'को', 'se': 'से',
-            'mein': 'में', 'par': 'पर', 'tak': 'तक', 'liye': 'लिए',
-            
-            # Numbers
-            'ek': 'एक', 'do': 'दो', 'teen': 'तीन', 'char': 'चार', 'paanch': 'पांच',
-            'chhe': 'छह', 'saat': 'सात', 'aath': 'आठ', 'nau': 'नौ', 'das': 'दस'
-        }
-        
-        # Split into words and convert each
+remote_transliterator = RemoteTransliterator()
+
+def transliterate_remote(texts: list) -> list:
+    """Transliterate texts in order through the memo cache and remote client, from synchronous code"""
+    results, misses = lookup_cached_transliterations(texts)
+    if misses:
+        with stage_timer("transliterate.remote"):
+            try:
+                outputs = remote_transliterator.submit(misses).result()
+            except Exception as e:
+                logger.error(f"AI transliteration error: {e}, using fallback")
+                outputs = [(transliterate_to_hindi(text), "local") for text in misses]
+        store_cached_transliterations(misses, outputs, results)
+    return [results[text] for text in texts]
+
+async def transliterate_remote_async(texts: list) -> list:
+    """Transliterate texts in order through the memo cache and remote client without blocking the event loop"""
+    results, misses = await asyncio.to_thread(lookup_cached_transliterations, texts)
+    if misses:
+        with stage_timer("transliterate.remote"):
+            try:
+                outputs = await asyncio.wrap_future(remote_transliterator.submit(misses))
+            except Exception as e:
+                logger.error(f"AI transliteration error: {e}, using fallback")
+                outputs = [(transliterate_to_hindi(text), "local") for text in misses]
+        await asyncio.to_thread(store_cached_transliterations, misses, outputs, results)
+    return [results[text] for text in texts]
+
+def ai_transliterate_to_hindi(transliteration_text: str) -> str:
+    """AI-powered transliteration using Google Translate API"""
+    return transliterate_remote([transliteration_text])[0]
+
+# Romanized -> Devanagari table, compiled once into TRANSLITERATION_TRIE. Keys containing a
+# space are phrases and match across word boundaries.
+TRANSLITERATION_MAP = {
+    # Vowels
+    'a': 'अ', 'aa': 'आ', 'ā': 'आ', 'i': 'इ', 'ii': 'ई', 'ī': 'ई',
+    'u': 'उ', 'uu': 'ऊ', 'ū': 'ऊ', 'e': 'ए', 'ee': 'ई', 'o': 'ओ', 'oo': 'ऊ',
+    'ai': 'ऐ', 'au': 'औ', 'ri': 'ऋ', 'rī': 'ॠ', 'lri': 'ऌ', 'lrii': 'ॡ',
+    
+    # Consonants
+    'k': 'क', 'kh': 'ख', 'g': 'ग', 'gh': 'घ', 'ng': 'ङ', 'ch': 'च', 'chh': 'छ',
+    'j': 'ज', 'jh': 'झ', 'ny': 'ञ', 't': 'त', 'th': 'थ', 'd': 'द', 'dh': 'ध',
+    'n': 'न', 'p': 'प', 'ph': 'फ', 'b': 'ब', 'bh': 'भ', 'm': 'म', 'y': 'य',
+    'r': 'र', 'l': 'ल', 'v': 'व', 'sh': 'श', 'shh': 'ष', 's': 'स', 'h': 'ह',
+    
+    # Retroflex consonants
+    't.': 'ट', 'th.': 'ठ', 'd.': 'ड', 'dh.': 'ढ', 'n.': 'ण',
+    
+    # Special characters
+    '.': '।', '..': '॥', ',': ',', ';': ';', ':': ':', '!': '!', '?': '?',
+    
+    # Common spiritual words
+    'hari': 'हरि', 'krishna': 'कृष्ण', 'ram': 'राम', 'shiva': 'शिव', 'guru': 'गुरु',
+    'dev': 'देव', 'devi': 'देवी', 'bhagavan': 'भगवान', 'ishwar': 'ईश्वर',
+    'brahma': 'ब्रह्म', 'vishnu': 'विष्णु', 'mahesh': 'महेश', 'ganesh': 'गणेश',
+    'lakshmi': 'लक्ष्मी', 'saraswati': 'सरस्वती', 'durga': 'दुर्गा', 'kali': 'काली',
+    'shri': 'श्री', 'om': 'ॐ', 'namah': 'नमः', 'shivaya': 'शिवाय',
+    
+    # Common words from your spiritual texts
+    'siddhant': 'सिद्धांत', 'madhuri': 'माधुरी', 'kripalu': 'कृपालु',
+    'shyamsundar': 'श्यामसुंदर', 'braj': 'ब्रज', 'vraja': 'व्रज',
+    'gokul': 'गोकुल', 'vrindavan': 'वृंदावन', 'mathura': 'मथुरा',
+    'radha': 'राधा', 'gopi': 'गोपी', 'gopala': 'गोपाल',
+    'nand': 'नंद', 'yashoda': 'यशोदा', 'balram': 'बलराम',
+    
+    # Kripalu Ji Maharaj specific vocabulary
+    'kripaluji': 'कृपालुजी', 'kripalu ji': 'कृपालु जी', 'maharaj': 'महाराज',
+    'maharajji': 'महाराजजी', 'maharaj ji': 'महाराज जी', 'kripaluji maharaj': 'कृपालुजी महाराज',
+    'kripaluji maharajji': 'कृपालुजी महाराजजी', 'maharajji kripaluji': 'महाराजजी कृपालुजी',
+    
+    # Kripalu Ji's unique spiritual concepts
+    'premras': 'प्रेमरस', 'prem ras': 'प्रेम रस', 'rasleela': 'रसलीला',
+    'ras leela': 'रस लीला', 'raslila': 'रसलीला', 'ras lila': 'रस लीला',
+    'prembhakti': 'प्रेमभक्ति', 'prem bhakti': 'प्रेम भक्ति', 'bhaktiras': 'भक्तिरस',
+    'bhakti ras': 'भक्ति रस', 'premrasa': 'प्रेमरस', 'prem rasa': 'प्रेम रस',
+    
+    # Kripalu Ji's devotional terminology
+    'krishnaprem': 'कृष्णप्रेम', 'krishna prem': 'कृष्ण प्रेम', 'radhaprem': 'राधाप्रेम',
+    'radha prem': 'राधा प्रेम', 'radhakrishna': 'राधाकृष्ण', 'radha krishna': 'राधा कृष्ण',
+    'radheshyam': 'राधेश्याम', 'radhe shyam': 'राधे श्याम', 'radheshyamji': 'राधेश्यामजी',
+    'radheshyam ji': 'राधेश्याम जी', 'shyamsundarji': 'श्यामसुंदरजी', 'shyamsundar ji': 'श्यामसुंदर जी',
+    
+    # Kripalu Ji's philosophical terms
+    'sarvadarshan': 'सर्वदर्शन', 'sarva darshan': 'सर्व दर्शन', 'sarvadarshanasangraha': 'सर्वदर्शनसंग्रह',
+    'sarva darshan sangraha': 'सर्व दर्शन संग्रह', 'vedanta': 'वेदांत', 'vedanta darshan': 'वेदांत दर्शन',
+    'advaita': 'अद्वैत', 'dvaita': 'द्वैत', 'vishishtadvaita': 'विशिष्टाद्वैत', 'vishisht advaita': 'विशिष्ट अद्वैत',
+    
+    # Kripalu Ji's specific divine names
+    'krishnaji': 'कृष्णजी', 'krishna ji': 'कृष्ण जी', 'radhaji': 'राधाजी', 'radha ji': 'राधा जी',
+    'ramji': 'रामजी', 'ram ji': 'राम जी', 'sitaramji': 'सीतारामजी', 'sita ram ji': 'सीता राम जी',
+    'hanumanji': 'हनुमानजी', 'hanuman ji': 'हनुमान जी', 'ganeshji': 'गणेशजी', 'ganesh ji': 'गणेश जी',
+    
+    # Kripalu Ji's ashram and place names
+    'barsana': 'बरसाना', 'gokuldham': 'गोकुलधाम', 'gokul dham': 'गोकुल धाम',
+    'vrindavan dham': 'वृंदावन धाम', 'vrindavandham': 'वृंदावनधाम', 'premdham': 'प्रेमधाम',
+    'prem dham': 'प्रेम धाम', 'rasdham': 'रसधाम', 'ras dham': 'रस धाम',
+    
+    # Kripalu Ji's unique phrases and expressions
+    'jai jai': 'जय जय', 'jai sri': 'जय श्री', 'jai shri': 'जय श्री', 'jai radhe': 'जय राधे',
+    'jai krishna': 'जय कृष्ण', 'jai ram': 'जय राम', 'hari bol': 'हरि बोल', 'hari om': 'हरि ॐ',
+    'radhe radhe': 'राधे राधे', 'sita ram': 'सीता राम', 'ram ram': 'राम राम',
+    
+    # Kripalu Ji's spiritual practices
+    'kirtan': 'कीर्तन', 'bhajan': 'भजन', 'satsang': 'सत्संग', 'sat sang': 'सत संग',
+    'sadhana': 'साधना', 'tapasya': 'तपस्या', 'dhyan': 'ध्यान', 'samadhi': 'समाधि',
+    'moksha': 'मोक्ष', 'mukti': 'मुक्ति', 'nirvana': 'निर्वाण', 'kaivalya': 'कैवल्य',
+    
+    # Kripalu Ji's divine attributes
+    'krishna prem': 'कृष्ण प्रेम', 'krishna bhakti': 'कृष्ण भक्ति', 'krishna seva': 'कृष्ण सेवा',
+    'radha prem': 'राधा प्रेम', 'radha bhakti': 'राधा भक्ति', 'radha seva': 'राधा सेवा',
+    'guru prem': 'गुरु प्रेम', 'guru bhakti': 'गुरु भक्ति', 'guru seva': 'गुरु सेवा',
+    
+    # More specific transliteration patterns
+    'kabai': 'कबै', 'paīhaum': 'पैहौं', 'paihaum': 'पैहौं', 'vās': 'वास',
+    'haum': 'हौं', 'brajvās': 'ब्रजवास', 'braj': 'ब्रज', 'vas': 'वास',
+    'narak': 'नरक', 'svarg': 'स्वर्ग', 'apavarg': 'अपवर्ग',
+    'māmgat': 'माँगत', 'mamgat': 'माँगत', 'nahim': 'नहिं', 'baikumth': 'बैकुण्ठ',
+    'vilās': 'विलास', 'vilas': 'विलास', 'bhīkh': 'भीख', 'bhikh': 'भीख',
+    'ek': 'एक', 'manamohan': 'मनमोहन', 'puravahu': 'पुरवहु',
+    'mām': 'माम्', 'mam': 'माम्', 'abhilās': 'अभिलास', 'abhilas': 'अभिलास', 'gāūm': 'गाऊं', 'gaum': 'गाऊं',
+    'guna': 'गुण', 'govind': 'गोविंद', 'rain-din': 'रैन-दिन', 'rain': 'रैन', 'din': 'दिन',
+    'jāūm': 'जाऊं', 'jam': 'जाऊं', 'jag': 'जग', 'pas': 'पास',
+    'hvai': 'ह्वै', 'madamatta': 'मदमत्त', 'nikuñjani': 'निकुंजनि', 'nikufijani': 'निकुंजनि',
+    'puñjani': 'पुंजनि', 'pufijani': 'पुंजनि', 'lakhūm': 'लखूँ', 'lakhim': 'लखूँ', 'mañju': 'मंजु', 'mafiju': 'मंजु',
+    'ras-rās': 'रस-रास', 'ras-ras': 'रस-रास', 'haum': 'हौं', 'krīpālu': 'कृपालु', 'krpalu': 'कृपालु',
+    'asa': 'अस', 'dās': 'दास', 'das': 'दास', 'kahāūm': 'कहाऊँ', 'kahatim': 'कहाऊँ', 'bani': 'बनि',
+    'dāsan': 'दासन', 'dasan': 'दासन', 'ko': 'को',
+    'arjun': 'अर्जुन', 'bhima': 'भीम', 'yudhishthir': 'युधिष्ठिर',
+    'nakul': 'नकुल', 'sahadev': 'सहदेव', 'duryodhan': 'दुर्योधन',
+    'karna': 'कर्ण', 'dron': 'द्रोण', 'bhishma': 'भीष्म',
+    
+    # Common phrases
+    'jai': 'जय', 'jai jai': 'जय जय', 'hari bol': 'हरि बोल',
+    'radhe radhe': 'राधे राधे', 'shri krishna': 'श्री कृष्ण',
+    'hare krishna': 'हरे कृष्ण', 'hare ram': 'हरे राम',
+    'om namah': 'ॐ नमः', 'om shivaya': 'ॐ शिवाय',
+    
+    # Spiritual concepts
+    'dharma': 'धर्म', 'karma': 'कर्म', 'moksha': 'मोक्ष', 'maya': 'माया',
+    'bhakti': 'भक्ति', 'prem': 'प्रेम', 'ras': 'रस', 'leela': 'लीला',
+    'bhajan': 'भजन', 'kirtan': 'कीर्तन', 'stotra': 'स्तोत्र',
+    'mantra': 'मंत्र', 'shloka': 'श्लोक', 'geeta': 'गीता',
+    'ramayana': 'रामायण', 'mahabharat': 'महाभारत', 'puran': 'पुराण',
+    
+    # Common verbs and words
+    'kar': 'कर', 'karu': 'करूं', 'karta': 'कर्ता', 'karte': 'करते',
+    'ho': 'हो', 'hai': 'है', 'hain': 'हैं', 'tha': 'था', 'the': 'थे',
+    'main': 'मैं', 'tum': 'तुम', 'aap': 'आप', 'hum': 'हम',
+    'ye': 'ये', 'vo': 'वो', 'is': 'इस', 'us': 'उस',
+    'ka': 'का', 'ke': 'के', 'ki': 'की', 'ko': 'को', 'se': 'से',
+    'mein': 'में', 'par': 'पर', 'tak': 'तक', 'liye': 'लिए',
+    
+    # Numbers
+    'ek': 'एक', 'do': 'दो', 'teen': 'तीन', 'char': 'चार', 'paanch': 'पांच',
+    'chhe': 'छह', 'saat': 'सात', 'aath': 'आठ', 'nau': 'नौ', 'das': 'दस'
+}
+
+# Punctuation peeled off both ends of a word before lookup and added back after
+TRANSLITERATION_PUNCTUATION = '.,;:!?'
+# Trie nodes are dicts keyed by word or character; the mapped output sits under this key
+TRIE_VALUE = None
+
+def build_transliteration_trie(paths: dict) -> dict:
+    """Compile {sequence of edges: output} into a trie of nested dicts"""
+    trie = {}
+    for path, value in paths.items():
+        node = trie
+        for edge in path:
+            node = node.setdefault(edge, {})
+        node[TRIE_VALUE] = value
+    return trie
+
+def trie_to_pattern(node: dict) -> str:
+    """Regex matching the longest key in a character trie: alternatives share prefixes and
+    a key that ends inside a longer one is the fallback once the longer path fails"""
+    alternatives = [re.escape(char) + trie_to_pattern(child) for char, child in node.items() if char is not TRIE_VALUE]
+    if not alternatives:
+        return ''
+    group = '(?:' + '|'.join(alternatives) + ')'
+    return group + '?' if TRIE_VALUE in node else group
+
+# Whole words and phrases, one trie edge per word, so 'jai radhe' spans the word boundary
+TRANSLITERATION_WORD_TRIE = build_transliteration_trie(
+    {tuple(key.split(' ')): value for key, value in TRANSLITERATION_MAP.items()}
+)
+TRANSLITERATION_PHRASE_STARTS = {key.split(' ')[0] for key in TRANSLITERATION_MAP if ' ' in key}
+# Longest-match character fallback for words not in the map (covers 4+ character keys like 'lrii');
+# any other character is its own token
+TRANSLITERATION_CHARACTER_PATTERN = re.compile(
+    trie_to_pattern(build_transliteration_trie({key: value for key, value in TRANSLITERATION_MAP.items() if ' ' not in key})) + '|.',
+    re.DOTALL
+)
+
+def split_transliteration_word(word: str) -> tuple:
+    """(leading punctuation, core, trailing punctuation)"""
+    core = word.strip(TRANSLITERATION_PUNCTUATION)
+    if core == word:
+        return '', word, ''
+    leading = word[:len(word) - len(word.lstrip(TRANSLITERATION_PUNCTUATION))]
+    return leading, core, word[len(leading) + len(core):]
+
+def match_transliteration_phrase(words: list, start: int, core_lower: str):
+    """Longest whole-word or phrase key from words[start], which starts a phrase key: (value, index
+    of the last word, its trailing punctuation) or None. A phrase only continues while no
+    punctuation separates the words."""
+    node = TRANSLITERATION_WORD_TRIE[core_lower]
+    best = (node[TRIE_VALUE], start, '') if TRIE_VALUE in node else None
+    index = start
+    trailing = ''
+    while not trailing and index + 1 < len(words):
+        leading, core, trailing = split_transliteration_word(words[index + 1])
+        if leading:
+            break
+        node = node.get(core.lower())
+        if node is None:
+            break
+        index += 1
+        if TRIE_VALUE in node:
+            best = (node[TRIE_VALUE], index, trailing)
+    return best
+
+def transliterate_word_characters(core: str) -> str:
+    """Greedy longest-match transliteration inside one word; unmapped characters are kept"""
+    core_lower = core.lower()
+    tokens = TRANSLITERATION_CHARACTER_PATTERN.findall(core_lower)
+    originals = tokens
+    if core_lower != core and len(core_lower) == len(core):
+        # Unmapped characters keep their original case
+        originals = []
+        offset = 0
+        for token in tokens:
+            originals.append(core[offset:offset + len(token)])
+            offset += len(token)
+    return ''.join(map(TRANSLITERATION_MAP.get, tokens, originals))
+
+def transliterate_to_hindi(transliteration_text: str) -> str:
+    """Convert transliteration to Hindi Devanagari script"""
+    try:
         words = transliteration_text.split()
         hindi_words = []
+        # Songs repeat most of their words; convert each distinct word once per call
+        converted = {}
+        i = 0
         
-        for word in words:
-            word_lower = word.lower().strip('.,;:!?')
-            
-            # Check if word is in mapping
-            if word_lower in transliteration_map:
-                hindi_word = transliteration_map[word_lower]
-                # Preserve original punctuation
-                if word != word_lower:
-                    hindi_word += word[len(word_lower):]
-                hindi_words.append(hindi_word)
-            else:
-                # Try to convert character by character
-                hindi_word = ""
-                i = 0
-                while i < len(word_lower):
-                    # Try 3-character combinations first
-                    if i + 2 < len(word_lower) and word_lower[i:i+3] in transliteration_map:
-                        hindi_word += transliteration_map[word_lower[i:i+3]]
-                        i += 3
-                    # Try 2-character combinations
-                    elif i + 1 < len(word_lower) and word_lower[i:i+2] in transliteration_map:
-                        hindi_word += transliteration_map[word_lower[i:i+2]]
-                        i += 2
-                    # Try single characters
-                    elif word_lower[i] in transliteration_map:
-                        hindi_word += transliteration_map[word_lower[i]]
-                        i += 1
-                    else:
-                        # Keep original character if no mapping found
-                        hindi_word += word[i]
-                        i += 1
-                
-                # Add punctuation back
-                if word != word_lower:
-                    hindi_word += word[len(word_lower):]
-                hindi_words.append(hindi_word)
+        # Phrases first (longest match wins), then learned words that outvote the map's spelling,
+        # whole words, otherwise convert character by character
+        while i < len(words):
+            word = words[i]
+            hindi_word = converted.get(word)
+            if hindi_word is None:
+                leading, core, trailing = split_transliteration_word(word)
+                core_lower = core.lower()
+                phrase = None
+                if core_lower in TRANSLITERATION_PHRASE_STARTS and not trailing:
+                    phrase = match_transliteration_phrase(words, i, core_lower)
+                if phrase and phrase[1] > i:
+                    hindi_word, i, trailing = phrase
+                    hindi_word = leading + hindi_word + trailing
+                else:
+                    mapped = TRANSLITERATION_MAP.get(core_lower)
+                    hindi_word = lexicon.get(core_lower, mapped) or mapped or transliterate_word_characters(core)
+                    hindi_word = converted[word] = leading + hindi_word + trailing
+            hindi_words.append(hindi_word)
+            i += 1
         
         return ' '.join(hindi_words)
         
@@ -807,11 +2184,406 @@ def transliterate_to_hindi(transliteration_text: str) -> str:
         logger.error(f"Transliteration error: {e}")
         return transliteration_text
 
+# Most texts accepted by one POST /transliterate/batch request
+TRANSLITERATE_BATCH_MAX_ITEMS = int(os.getenv("TRANSLITERATE_BATCH_MAX_ITEMS", "1000"))
+
+def transliterate_batch(texts: list) -> list:
+    """Transliterate texts in order; distinct texts go to the remote client once, packed together"""
+    unique_texts = [text for text in dict.fromkeys(texts) if text]
+    results = dict(zip(unique_texts, transliterate_remote(unique_texts))) if unique_texts else {}
+    return [results.get(text, "") for text in texts]
+
+# Learned lexicon: word pairs mined from the hand-corrected hindi/transliteration fields of
+# /generate-csv submissions, weighted by how often they were submitted. A spelling is used once
+# it was submitted LEXICON_MIN_COUNT times, and over the transliteration map's spelling of a word
+# only when submitted more often than that one. It is consulted before the remote API.
+LEXICON_ENABLED = os.getenv("LEXICON_ENABLED", "1") == "1"
+LEXICON_PATH = os.getenv(
+    "LEXICON_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "lexicon.sqlite3")
+)
+# How often a worker checks the SQLite file for pairs learned by other workers
+LEXICON_REFRESH_SECONDS = float(os.getenv("LEXICON_REFRESH_SECONDS", "30"))
+# Submissions a spelling needs before it is used, so a single typo is not learned
+LEXICON_MIN_COUNT = max(1, int(os.getenv("LEXICON_MIN_COUNT", "2")))
+# Peeled off words before they are paired: punctuation, dandas and digits in both scripts
+LEXICON_STRIP_CHARACTERS = '.,;:!?"\'()[]{}|/\\*।॥0123456789०१२३४५६७८९'
+DEVANAGARI_WORD_PATTERN = re.compile(r'^[\u0900-\u097F\u200c\u200d-]+$')
+ROMAN_WORD_PATTERN = re.compile(r"^[a-z\u00c0-\u024f\u1e00-\u1eff\u0300-\u036f'-]+$")
+
+lexicon_requests_total = Counter("lexicon_requests_total", "Texts looked up in the learned lexicon", ("result",))
+
+class Lexicon:
+    """Frequency-weighted Roman -> Devanagari word pairs in SQLite; the most frequent spelling
+    of every Roman word, and of its diacritic-free form, is kept in memory for lookups"""
+    
+    def __init__(self, db_path: str):
+        self._counts = {}  # roman -> {devanagari: count}
+        self._folded_counts = {}  # roman without diacritics -> {devanagari: count}
+        self._best = {}  # roman -> (most frequent devanagari, its count)
+        self._best_folded = {}  # roman without diacritics -> (most frequent devanagari, its count)
+        self._lock = threading.Lock()
+        self._db = None
+        self._data_version = None
+        self._checked_at = time.monotonic()
+        
+        if db_path:
+            try:
+                self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=5)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS lexicon ("
+                    "roman TEXT NOT NULL, devanagari TEXT NOT NULL, count INTEGER NOT NULL, updated_at REAL NOT NULL, "
+                    "PRIMARY KEY (roman, devanagari))"
+                )
+                self._db.commit()
+                self._load()
+                logger.info(f"✅ Lexicon loaded: {len(self._best)} words")
+            except Exception as e:
+                logger.warning(f"Lexicon unavailable, learning in memory only: {e}")
+                self._db = None
+    
+    def _load(self):
+        self._counts, self._folded_counts, self._best, self._best_folded = {}, {}, {}, {}
+        self._add_counts(self._db.execute("SELECT roman, devanagari, count FROM lexicon"))
+        self._data_version = self._db.execute("PRAGMA data_version").fetchone()[0]
+    
+    def _add_counts(self, rows):
+        """Add (roman, devanagari, count) rows to the in-memory counts and best spellings"""
+        for roman, devanagari, count in rows:
+            folded = fold_diacritics(roman)
+            for counts, best, key in ((self._counts, self._best, roman), (self._folded_counts, self._best_folded, folded)):
+                options = counts.setdefault(key, {})
+                options[devanagari] = options.get(devanagari, 0) + count
+                if key not in best or options[devanagari] > best[key][1] or best[key][0] == devanagari:
+                    best[key] = (devanagari, options[devanagari])
+    
+    def _refresh(self):
+        """Reload when another worker has committed since the last check"""
+        self._checked_at = time.monotonic()
+        if self._db is None:
+            return
+        with self._lock:
+            try:
+                if self._db.execute("PRAGMA data_version").fetchone()[0] != self._data_version:
+                    self._load()
+            except Exception as e:
+                logger.warning(f"Lexicon refresh failed: {e}")
+    
+    def get(self, roman: str, rival: str = None):
+        """Most frequent Devanagari spelling of a Roman word, or None until it was submitted
+        LEXICON_MIN_COUNT times. A word typed without its diacritics matches the words that
+        have them. A rival spelling (the transliteration map's) wins unless submitted less often."""
+        if time.monotonic() - self._checked_at >= LEXICON_REFRESH_SECONDS:
+            self._refresh()
+        if not self._counts:
+            return None
+        roman = roman.lower()
+        if not roman.isascii():
+            roman = unicodedata.normalize('NFC', roman)
+        if roman in self._counts:
+            counts, (devanagari, count) = self._counts[roman], self._best[roman]
+        else:
+            folded = fold_diacritics(roman) if not roman.isascii() else roman
+            if folded not in self._folded_counts:
+                return None
+            counts, (devanagari, count) = self._folded_counts[folded], self._best_folded[folded]
+        if count < LEXICON_MIN_COUNT:
+            return None
+        if rival is not None and counts.get(unicodedata.normalize('NFC', rival), 0) >= count:
+            return None
+        return devanagari
+    
+    def add_pairs(self, pairs: dict):
+        """Add {(roman, devanagari): count} to the lexicon"""
+        now = time.time()
+        normalized = {}
+        for (roman, devanagari), count in pairs.items():
+            key = (unicodedata.normalize('NFC', roman.lower()), unicodedata.normalize('NFC', devanagari))
+            normalized[key] = normalized.get(key, 0) + count
+        pairs = normalized
+        with self._lock:
+            self._add_counts((roman, devanagari, count) for (roman, devanagari), count in pairs.items())
+            
+            if self._db is None:
+                return
+            try:
+                self._db.executemany(
+                    "INSERT INTO lexicon (roman, devanagari, count, updated_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (roman, devanagari) DO UPDATE SET count = count + excluded.count, updated_at = excluded.updated_at",
+                    [(roman, devanagari, count, now) for (roman, devanagari), count in pairs.items()]
+                )
+                self._db.commit()
+            except Exception as e:
+                logger.warning(f"Lexicon write failed: {e}")
+    
+    def entries(self) -> list:
+        """[(roman, devanagari, count)], most frequent spelling of each word first"""
+        self._refresh()
+        with self._lock:
+            return [
+                (roman, devanagari, count)
+                for roman, options in sorted(self._counts.items())
+                for devanagari, count in sorted(options.items(), key=lambda option: -option[1])
+            ]
+    
+    def __len__(self) -> int:
+        return len(self._best)
+
+# Memory only until open_shared_stores() runs at startup
+lexicon = Lexicon("")
+
+def lexicon_words(text: str, roman: bool) -> list:
+    words = [unicodedata.normalize('NFC', word.strip(LEXICON_STRIP_CHARACTERS)) for word in text.split()]
+    return [word.lower() if roman else word for word in words if word]
+
+def align_lyric_words(hindi: str, transliteration: str) -> list:
+    """[(roman, devanagari)] from lines whose words pair up one to one; other lines are skipped"""
+    hindi_lines = [line for line in hindi.split('\n') if line.strip()]
+    roman_lines = [line for line in transliteration.split('\n') if line.strip()]
+    if len(hindi_lines) != len(roman_lines):
+        hindi_lines, roman_lines = [' '.join(hindi_lines)], [' '.join(roman_lines)]
+    
+    pairs = []
+    for hindi_line, roman_line in zip(hindi_lines, roman_lines):
+        hindi_words = lexicon_words(hindi_line, roman=False)
+        roman_words = lexicon_words(roman_line, roman=True)
+        if len(hindi_words) != len(roman_words):
+            continue
+        # A word in the wrong script means the line isn't aligned the way it looks
+        if all(ROMAN_WORD_PATTERN.match(roman) and DEVANAGARI_WORD_PATTERN.match(devanagari)
+               for roman, devanagari in zip(roman_words, hindi_words)):
+            pairs.extend(zip(roman_words, hindi_words))
+    return pairs
+
+def learn_lexicon_from_lyrics(lyrics: list) -> int:
+    """Add the word pairs of submitted lyric rows to the lexicon; returns how many were learned"""
+    pairs = {}
+    for lyric in lyrics:
+        if not isinstance(lyric, dict):
+            continue
+        for pair in align_lyric_words(str(lyric.get("hindi") or ""), str(lyric.get("transliteration") or "")):
+            pairs[pair] = pairs.get(pair, 0) + 1
+    if pairs:
+        lexicon.add_pairs(pairs)
+        logger.info(f"📖 Learned {sum(pairs.values())} word pairs ({len(pairs)} distinct) from submitted lyrics")
+    return sum(pairs.values())
+
+def read_lexicon_entries(stream) -> dict:
+    """{(roman, devanagari): count} from roman<TAB>devanagari<TAB>count lines, as written by export"""
+    pairs = {}
+    for line in io.TextIOWrapper(stream, encoding="utf-8"):
+        fields = line.rstrip('\n').split('\t')
+        if line.startswith('#') or len(fields) < 2:
+            continue
+        roman = unicodedata.normalize('NFC', fields[0].strip().lower())
+        devanagari = unicodedata.normalize('NFC', fields[1].strip())
+        if not ROMAN_WORD_PATTERN.match(roman) or not DEVANAGARI_WORD_PATTERN.match(devanagari):
+            continue
+        count = int(fields[2]) if len(fields) > 2 and fields[2].strip().isdigit() else 1
+        pairs[(roman, devanagari)] = pairs.get((roman, devanagari), 0) + count
+    return pairs
+
+def lexicon_transliterate(text: str):
+    """Text converted word by word from the lexicon, or None unless every word is in it"""
+    lines = []
+    for line in text.split('\n'):
+        words = []
+        for word in line.split():
+            leading, core, trailing = split_transliteration_word(word)
+            learned = lexicon.get(core)
+            if learned is None:
+                return None
+            words.append(leading + learned + trailing)
+        lines.append(' '.join(words))
+    return '\n'.join(lines).strip() or None
+
+# Prefix suggestions: every prefix of every known Roman word maps to its top-k Devanagari
+# candidates, ranked by frequency, so GET /suggest is a single dict lookup
+SUGGEST_TOP_K = int(os.getenv("SUGGEST_TOP_K", "5"))
+SUGGEST_CACHE_SECONDS = int(os.getenv("SUGGEST_CACHE_SECONDS", "3600"))
+# Optional word list with one "roman<TAB>devanagari<TAB>count" entry per line
+SUGGEST_WORDS_PATH = os.getenv("SUGGEST_WORDS_PATH", "")
+
+def fold_diacritics(text: str) -> str:
+    """'dās' -> 'das', so suggestions work when typing without diacritics"""
+    return ''.join(char for char in unicodedata.normalize('NFKD', text) if not unicodedata.combining(char))
+
+def load_suggestion_words(path: str) -> dict:
+    """{(roman, devanagari): count} from a tab-separated word list"""
+    counts = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) < 2 or not fields[0].strip() or line.startswith('#'):
+                continue
+            count = int(fields[2]) if len(fields) > 2 and fields[2].strip() else 1
+            key = (fields[0].strip().lower(), fields[1].strip())
+            counts[key] = counts.get(key, 0) + count
+    return counts
+
+def build_suggestion_index(counts: dict, top_k: int = SUGGEST_TOP_K) -> dict:
+    """{prefix: [devanagari, ...]} with the top_k most frequent candidates for every prefix"""
+    # Most frequent first; among equals the shortest completion, then alphabetical
+    ranked = sorted(counts.items(), key=lambda item: (-item[1], len(item[0][0]), item[0][0]))
+    index = {}
+    for (roman, devanagari), _ in ranked:
+        for key in {roman, fold_diacritics(roman)}:
+            for end in range(1, len(key) + 1):
+                candidates = index.setdefault(key[:end], [])
+                if len(candidates) < top_k and devanagari not in candidates:
+                    candidates.append(devanagari)
+    return index
+
+def load_suggestion_index() -> dict:
+    """Index the transliteration map's words and phrases, the learned lexicon and SUGGEST_WORDS_PATH, if set"""
+    counts = {(key, value): 1 for key, value in TRANSLITERATION_MAP.items() if len(key) > 1 and any(char.isalpha() for char in key)}
+    for roman, devanagari, count in lexicon.entries():
+        counts[(roman, devanagari)] = counts.get((roman, devanagari), 0) + count
+    if SUGGEST_WORDS_PATH:
+        try:
+            for key, count in load_suggestion_words(SUGGEST_WORDS_PATH).items():
+                counts[key] = counts.get(key, 0) + count
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load suggestion words from {SUGGEST_WORDS_PATH}: {e}")
+    index = build_suggestion_index(counts)
+    logger.info(f"✅ Suggestion index: {len(counts)} words, {len(index)} prefixes")
+    return index
+
+# Built by open_shared_stores() at startup
+suggestion_index = {}
+
+def suggest_transliterations(prefix: str, limit: int = SUGGEST_TOP_K) -> list:
+    """Top candidates for a Roman prefix; the rule-based transliteration of the prefix fills a free slot"""
+    prefix = ' '.join(prefix.lower().split())
+    if not prefix:
+        return []
+    candidates = suggestion_index.get(prefix) or suggestion_index.get(fold_diacritics(prefix)) or []
+    candidates = candidates[:limit]
+    if len(candidates) < limit:
+        literal = transliterate_to_hindi(prefix)
+        if literal not in candidates:
+            candidates = candidates + [literal]
+    return candidates
+
+# Devanagari -> Roman: the reverse of transliterate_to_hindi, used to fill the transliteration
+# column. Words are split into aksharas (consonant + nukta + vowel sign/virama + nasal/visarga,
+# or an independent vowel) and each part is looked up in the scheme's tables. With schwa deletion,
+# the inherent 'a' is dropped at the end of a word and between a vowel-consonant and a
+# consonant-vowel pair, scanning right to left. It is kept in single-akshara words, after a
+# syllable carrying anusvara, chandrabindu or visarga, and at the end of a conjunct that closes in a semivowel or
+# nasal, so 'mitra' and 'kṛṣṇa' keep it while 'svarg' and 'siddh' drop it.
+ROMANIZATION_CONSONANTS = {
+    'क': ('k', 'k'), 'ख': ('kh', 'kh'), 'ग': ('g', 'g'), 'घ': ('gh', 'gh'), 'ङ': ('ṅ', 'n'),
+    'च': ('c', 'ch'), 'छ': ('ch', 'chh'), 'ज': ('j', 'j'), 'झ': ('jh', 'jh'), 'ञ': ('ñ', 'n'),
+    'ट': ('ṭ', 't'), 'ठ': ('ṭh', 'th'), 'ड': ('ḍ', 'd'), 'ढ': ('ḍh', 'dh'), 'ण': ('ṇ', 'n'),
+    'त': ('t', 't'), 'थ': ('th', 'th'), 'द': ('d', 'd'), 'ध': ('dh', 'dh'), 'न': ('n', 'n'),
+    'प': ('p', 'p'), 'फ': ('ph', 'ph'), 'ब': ('b', 'b'), 'भ': ('bh', 'bh'), 'म': ('m', 'm'),
+    'य': ('y', 'y'), 'र': ('r', 'r'), 'ल': ('l', 'l'), 'ळ': ('ḷ', 'l'), 'व': ('v', 'v'),
+    'श': ('ś', 'sh'), 'ष': ('ṣ', 'sh'), 'स': ('s', 's'), 'ह': ('h', 'h'),
+    # Nukta consonants as base + nukta (U+093C); the precomposed letters are added below
+    'क़': ('q', 'q'), 'ख़': ('ḵh', 'kh'), 'ग़': ('ġ', 'g'), 'ज़': ('z', 'z'),
+    'ड़': ('ḍ', 'r'), 'ढ़': ('ḍh', 'rh'), 'फ़': ('f', 'f'), 'य़': ('ẏ', 'y'),
+}
+# U+0958-U+095F are composition exclusions (NFC decomposes them), so they are added by code point
+ROMANIZATION_CONSONANTS.update({
+    chr(code): ROMANIZATION_CONSONANTS[unicodedata.normalize('NFD', chr(code))]
+    for code in range(0x0958, 0x0960)
+})
+ROMANIZATION_VOWELS = {
+    'अ': ('a', 'a'), 'आ': ('ā', 'a'), 'इ': ('i', 'i'), 'ई': ('ī', 'i'), 'उ': ('u', 'u'),
+    'ऊ': ('ū', 'u'), 'ऋ': ('ṛ', 'ri'), 'ॠ': ('ṝ', 'ri'), 'ऌ': ('ḷ', 'lri'), 'ए': ('e', 'e'),
+    'ऐ': ('ai', 'ai'), 'ओ': ('o', 'o'), 'औ': ('au', 'au'), 'ऍ': ('e', 'e'), 'ऑ': ('o', 'o'),
+    'ऎ': ('e', 'e'), 'ऒ': ('o', 'o'), 'ॐ': ('oṃ', 'om'),
+}
+ROMANIZATION_VOWEL_SIGNS = {
+    'ा': ('ā', 'a'), 'ि': ('i', 'i'), 'ी': ('ī', 'i'), 'ु': ('u', 'u'), 'ू': ('ū', 'u'),
+    'ृ': ('ṛ', 'ri'), 'ॄ': ('ṝ', 'ri'), 'ॢ': ('ḷ', 'lri'), 'े': ('e', 'e'), 'ै': ('ai', 'ai'),
+    'ो': ('o', 'o'), 'ौ': ('au', 'au'), 'ॅ': ('e', 'e'), 'ॉ': ('o', 'o'), 'ॆ': ('e', 'e'),
+    'ॊ': ('o', 'o'),
+}
+# Chandrabindu, anusvara, visarga, avagraha; the simple scheme writes anusvara as 'm' before labials
+ROMANIZATION_MARKS = {
+    'ऀ': ('m̐', 'n'), 'ँ': ('m̐', 'n'), 'ं': ('ṃ', 'n'), 'ः': ('ḥ', 'h'), 'ऽ': ("'", ''),
+}
+ROMANIZATION_SIMPLE_LABIALS = ('p', 'b', 'm', 'f')
+SCHWA_KEEPING_FINALS = frozenset('यरलवङञणनम')
+# Dandas and Devanagari digits, applied to the whole text after the words are converted
+ROMANIZATION_PUNCTUATION = str.maketrans({'।': '|', '॥': '||', '॰': '.', **{chr(0x0966 + digit): str(digit) for digit in range(10)}})
+ROMANIZATION_SCHEMES = ("iast", "simple")
+ROMANIZATION_WORD_PATTERN = re.compile(r'[ऀ-ॣॱ-ॿ‌‍]+')
+AKSHARA_PATTERN = re.compile(
+    r'([क-हक़-य़]़?)([ा-्ॕ-ॗॢॣ]?)([ऀ-ः]*)'
+    r'|([ऄ-औॐॠॡॲ-ॷ])([ऀ-ः]*)'
+    r'|(.)',
+    re.DOTALL
+)
+VIRAMA = '्'
+
+@lru_cache(maxsize=65536)
+def romanize_word(word: str, scheme: str = "iast", schwa_deletion: bool = True) -> str:
+    """One Devanagari word (no dandas or digits) in the given scheme"""
+    column = ROMANIZATION_SCHEMES.index(scheme)
+    
+    # Units: [onset, vowel (None after a virama), inherent schwa?, nasal/visarga marks]
+    units = []
+    final_consonant = None
+    for consonant, sign, marks, vowel, vowel_marks, other in AKSHARA_PATTERN.findall(word.replace('‌', '').replace('‍', '')):
+        if consonant:
+            final_consonant = consonant[0]
+            roman = ROMANIZATION_CONSONANTS.get(consonant) or ROMANIZATION_CONSONANTS.get(consonant[0], ('', ''))
+            if sign == VIRAMA:
+                units.append([roman[column], None, False, marks])
+            elif sign:
+                units.append([roman[column], ROMANIZATION_VOWEL_SIGNS.get(sign, ('', ''))[column], False, marks])
+            else:
+                units.append([roman[column], 'a', True, marks])
+        elif vowel:
+            units.append(['', ROMANIZATION_VOWELS.get(vowel, ('', ''))[column], False, vowel_marks])
+        elif other in ROMANIZATION_MARKS:
+            units.append(['', '', False, other])
+        elif other in ROMANIZATION_VOWEL_SIGNS:
+            units.append(['', ROMANIZATION_VOWEL_SIGNS[other][column], False, ''])
+    
+    if schwa_deletion and len(units) > 1:
+        def deletable(index: int) -> bool:
+            unit = units[index]
+            return unit[0] and unit[2] and not unit[3]
+        
+        last = len(units) - 1
+        if deletable(last) and (units[last - 1][1] is not None or final_consonant not in SCHWA_KEEPING_FINALS):
+            units[last][1] = ''
+        for index in range(last - 1, 0, -1):
+            previous, following = units[index - 1], units[index + 1]
+            if deletable(index) and previous[1] and not previous[3] and following[0] and following[1]:
+                units[index][1] = ''
+    
+    parts = []
+    for index, (onset, vowel, _, marks) in enumerate(units):
+        parts.append(onset)
+        parts.append(vowel or '')
+        for mark in marks:
+            roman = ROMANIZATION_MARKS[mark][column]
+            if mark == 'ं' and scheme == "simple" and index + 1 < len(units) and units[index + 1][0].startswith(ROMANIZATION_SIMPLE_LABIALS):
+                roman = 'm'
+            parts.append(roman)
+    return ''.join(parts)
+
+def romanize(text: str, scheme: str = "iast", schwa_deletion: bool = True) -> str:
+    """Devanagari in `text` -> Roman in the given scheme; other scripts pass through unchanged"""
+    if scheme not in ROMANIZATION_SCHEMES:
+        raise ValueError(f"Unknown romanization scheme: {scheme}")
+    return ROMANIZATION_WORD_PATTERN.sub(
+        lambda match: romanize_word(match.group(), scheme, schwa_deletion), text
+    ).translate(ROMANIZATION_PUNCTUATION)
+
 def enhance_ocr_with_transliteration(ocr_text: str) -> str:
     """Enhance OCR results by using transliteration to generate Hindi script"""
     try:
         lines = ocr_text.split('\n')
         enhanced_lines = []
+        # Lines to transliterate: (index in enhanced_lines, line, kind); sent as one batch below
+        pending = []
         
         for line in lines:
             line = line.strip()
@@ -820,30 +2592,21 @@ def enhance_ocr_with_transliteration(ocr_text: str) -> str:
                 continue
             
             # Check line composition
-            has_transliteration = any(char in line for char in 'āīūṛṃḥśṣñṭḍ')
-            has_hindi = any('\u0900' <= char <= '\u097F' for char in line)
-            has_english = any(char.isalpha() and ord(char) < 128 for char in line)
-            has_english_words = any(word.isalpha() and len(word) > 2 for word in line.split())
+            features = TextFeatures(line)
+            has_transliteration = features.flags & CHAR_TRANSLITERATION_MARK
+            has_hindi = features.flags & CHAR_HINDI
+            has_english = features.flags & CHAR_ENGLISH
+            has_english_words = has_english and any(word.isalpha() and len(word) > 2 for word in features.words)
             
             # Strategy 1: Pure transliteration line with diacritics (highest priority)
             if has_transliteration and not has_hindi and len(line) < 100:  # Skip very long lines
-                try:
-                    hindi_line = ai_transliterate_to_hindi(line)
-                    enhanced_lines.append(hindi_line)
-                    logger.info(f"Converted transliteration with diacritics: '{line}' -> '{hindi_line}'")
-                except Exception as e:
-                    logger.warning(f"Transliteration failed for line: {e}")
-                    enhanced_lines.append(line)
+                pending.append((len(enhanced_lines), line, "transliteration with diacritics"))
+                enhanced_lines.append(line)
             
             # Strategy 2: Pure English line that looks like transliteration (skip for performance)
             elif has_english and not has_hindi and has_english_words and len(line) < 80 and looks_like_transliteration(line):
-                try:
-                    hindi_line = ai_transliterate_to_hindi(line)
-                    enhanced_lines.append(hindi_line)
-                    logger.info(f"Converted English transliteration: '{line}' -> '{hindi_line}'")
-                except Exception as e:
-                    logger.warning(f"Transliteration failed for line: {e}")
-                    enhanced_lines.append(line)
+                pending.append((len(enhanced_lines), line, "English transliteration"))
+                enhanced_lines.append(line)
             
             # Strategy 3: Mixed Hindi-English line (OCR mistake - English letters in Hindi text)
             elif has_hindi and has_english:
@@ -857,6 +2620,15 @@ def enhance_ocr_with_transliteration(ocr_text: str) -> str:
             else:
                 enhanced_lines.append(line)
         
+        if pending:
+            try:
+                hindi_lines = transliterate_batch([line for _, line, _ in pending])
+                for (index, line, kind), hindi_line in zip(pending, hindi_lines):
+                    enhanced_lines[index] = hindi_line
+                    logger.info(f"Converted {kind}: '{line}' -> '{hindi_line}'")
+            except Exception as e:
+                logger.warning(f"Transliteration failed for {len(pending)} lines: {e}")
+        
         enhanced_text = '\n'.join(enhanced_lines)
         
         # If we made improvements, return enhanced version
@@ -870,36 +2642,36 @@ def enhance_ocr_with_transliteration(ocr_text: str) -> str:
         logger.error(f"Transliteration enhancement error: {e}")
         return ocr_text
 
+# Common spiritual/religious words that are likely transliteration
+TRANSLITERATION_VOCABULARY = frozenset([
+    'hari', 'krishna', 'ram', 'shiva', 'guru', 'dev', 'devi', 'bhagavan',
+    'brahma', 'vishnu', 'ganesh', 'lakshmi', 'saraswati', 'durga', 'kali',
+    'shri', 'om', 'namah', 'siddhant', 'madhuri', 'kripalu', 'braj',
+    'radha', 'gopi', 'gopala', 'nand', 'yashoda', 'balram', 'gokul',
+    'vrindavan', 'mathura', 'dharma', 'karma', 'moksha', 'maya', 'bhakti',
+    'prem', 'ras', 'leela', 'bhajan', 'kirtan', 'stotra', 'mantra', 'shloka',
+    
+    # Kripalu Ji Maharaj specific vocabulary
+    'kripaluji', 'kripalu ji', 'maharaj', 'maharajji', 'maharaj ji',
+    'premras', 'prem ras', 'rasleela', 'ras leela', 'raslila', 'ras lila',
+    'prembhakti', 'prem bhakti', 'bhaktiras', 'bhakti ras', 'premrasa', 'prem rasa',
+    'krishnaprem', 'krishna prem', 'radhaprem', 'radha prem', 'radhakrishna', 'radha krishna',
+    'radheshyam', 'radhe shyam', 'radheshyamji', 'radheshyam ji', 'shyamsundarji', 'shyamsundar ji',
+    'sarvadarshan', 'sarva darshan', 'sarvadarshanasangraha', 'sarva darshan sangraha',
+    'vedanta', 'vedanta darshan', 'advaita', 'dvaita', 'vishishtadvaita', 'vishisht advaita',
+    'krishnaji', 'krishna ji', 'radhaji', 'radha ji', 'ramji', 'ram ji',
+    'sitaramji', 'sita ram ji', 'hanumanji', 'hanuman ji', 'ganeshji', 'ganesh ji',
+    'barsana', 'gokuldham', 'gokul dham', 'vrindavan dham', 'vrindavandham',
+    'premdham', 'prem dham', 'rasdham', 'ras dham', 'jai jai', 'jai sri', 'jai shri',
+    'jai radhe', 'jai krishna', 'jai ram', 'hari bol', 'hari om', 'radhe radhe',
+    'sita ram', 'ram ram', 'satsang', 'sat sang', 'sadhana', 'tapasya', 'dhyan',
+    'samadhi', 'mukti', 'nirvana', 'kaivalya'
+])
+
 def looks_like_transliteration(text: str) -> bool:
     """Check if English text looks like transliteration"""
-    # Common spiritual/religious words that are likely transliteration
-    spiritual_words = [
-        'hari', 'krishna', 'ram', 'shiva', 'guru', 'dev', 'devi', 'bhagavan',
-        'brahma', 'vishnu', 'ganesh', 'lakshmi', 'saraswati', 'durga', 'kali',
-        'shri', 'om', 'namah', 'siddhant', 'madhuri', 'kripalu', 'braj',
-        'radha', 'gopi', 'gopala', 'nand', 'yashoda', 'balram', 'gokul',
-        'vrindavan', 'mathura', 'dharma', 'karma', 'moksha', 'maya', 'bhakti',
-        'prem', 'ras', 'leela', 'bhajan', 'kirtan', 'stotra', 'mantra', 'shloka',
-        
-        # Kripalu Ji Maharaj specific vocabulary
-        'kripaluji', 'kripalu ji', 'maharaj', 'maharajji', 'maharaj ji',
-        'premras', 'prem ras', 'rasleela', 'ras leela', 'raslila', 'ras lila',
-        'prembhakti', 'prem bhakti', 'bhaktiras', 'bhakti ras', 'premrasa', 'prem rasa',
-        'krishnaprem', 'krishna prem', 'radhaprem', 'radha prem', 'radhakrishna', 'radha krishna',
-        'radheshyam', 'radhe shyam', 'radheshyamji', 'radheshyam ji', 'shyamsundarji', 'shyamsundar ji',
-        'sarvadarshan', 'sarva darshan', 'sarvadarshanasangraha', 'sarva darshan sangraha',
-        'vedanta', 'vedanta darshan', 'advaita', 'dvaita', 'vishishtadvaita', 'vishisht advaita',
-        'krishnaji', 'krishna ji', 'radhaji', 'radha ji', 'ramji', 'ram ji',
-        'sitaramji', 'sita ram ji', 'hanumanji', 'hanuman ji', 'ganeshji', 'ganesh ji',
-        'barsana', 'gokuldham', 'gokul dham', 'vrindavan dham', 'vrindavandham',
-        'premdham', 'prem dham', 'rasdham', 'ras dham', 'jai jai', 'jai sri', 'jai shri',
-        'jai radhe', 'jai krishna', 'jai ram', 'hari bol', 'hari om', 'radhe radhe',
-        'sita ram', 'ram ram', 'satsang', 'sat sang', 'sadhana', 'tapasya', 'dhyan',
-        'samadhi', 'mukti', 'nirvana', 'kaivalya'
-    ]
-    
     words = text.lower().split()
-    spiritual_word_count = sum(1 for word in words if word in spiritual_words)
+    spiritual_word_count = sum(1 for word in words if word in TRANSLITERATION_VOCABULARY)
     
     # If more than 30% of words are spiritual words, likely transliteration
     return len(words) > 0 and (spiritual_word_count / len(words)) > 0.3
@@ -913,8 +2685,9 @@ def patch_english_in_hindi_text(text: str) -> str:
         
         for word in words:
             # Check if word has both Hindi and English characters
-            has_hindi = any('\u0900' <= char <= '\u097F' for char in word)
-            has_english = any(char.isalpha() and ord(char) < 128 for char in word)
+            flags = TextFeatures(word).flags
+            has_hindi = flags & CHAR_HINDI
+            has_english = flags & CHAR_ENGLISH
             
             if has_hindi and has_english:
                 # This word has mixed script - try to patch English parts
@@ -981,6 +2754,7 @@ def evaluate_text_quality(text: str) -> float:
     if not text or len(text.strip()) < 5:
         return 0.0
     
+    features = TextFeatures(text)
     score = 0.5  # Base score
     
     # Length assessment
@@ -992,9 +2766,9 @@ def evaluate_text_quality(text: str) -> float:
         score += 0.2
     
     # Character analysis
-    hindi_chars = len([c for c in text if '\u0900' <= c <= '\u097F'])
-    english_chars = len([c for c in text if c.isalpha() and ord(c) < 128])
-    total_chars = len(text)
+    hindi_chars = features.hindi
+    english_chars = features.english
+    total_chars = features.length
     
     # Strong bonus for mixed Hindi-English content (your use case)
     if hindi_chars > 0 and english_chars > 0:
@@ -1006,7 +2780,7 @@ def evaluate_text_quality(text: str) -> float:
             score += 0.2
     
     # Line structure analysis (important for your format)
-    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    lines = features.lines
     line_count = len(lines)
     
     if line_count > 10:  # Multiple verses
@@ -1018,25 +2792,23 @@ def evaluate_text_quality(text: str) -> float:
     
     # Quality indicators
     # Bonus for proper punctuation
-    if any(p in text for p in ['।', '॥', '.', '?', '!']):
+    if features.sentence_punctuation:
         score += 0.1
     
     # Bonus for common spiritual/religious words
-    spiritual_words = ['siddhant', 'madhuri', 'hari', 'krishna', 'guru', 'divine', 'blessed', 'eternal', 'residence', 'abode', 'shri', 'kripalu']
-    text_lower = text.lower()
-    if any(word in text_lower for word in spiritual_words):
+    if features.keyword_hits & BASIC_SPIRITUAL_KEYWORDS:
         score += 0.2
     
     # Penalties for OCR artifacts
     # Excessive special characters
-    special_chars = len([c for c in text if not c.isalnum() and not c.isspace() and not '\u0900' <= c <= '\u097F' and c not in '.,;:!?()[]{}"\'।॥'])
+    special_chars = features.artifact_specials
     if special_chars / total_chars > 0.15:
         score -= 0.4
     elif special_chars / total_chars > 0.08:
         score -= 0.2
     
     # Repetitive text (OCR artifacts)
-    words = text.split()
+    words = features.words
     if len(words) > 0:
         unique_words = len(set(words))
         uniqueness_ratio = unique_words / len(words)
@@ -1057,7 +2829,555 @@ def evaluate_text_quality(text: str) -> float:
     
     return max(0.0, min(2.0, score))  # Cap between 0 and 2
         
+# Uploads: the request body is counted as it arrives and cut off at the largest upload limit
+# (per-type limits are checked against the parsed file's size). Request handlers read the file
+# Starlette already spooled in place; jobs, which outlive the request, copy it into memory or,
+# above UPLOAD_SPOOL_THRESHOLD, a temp file of their own. Extractors accept either raw bytes or
+# a SpooledUpload.
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+UPLOAD_SPOOL_THRESHOLD = int(os.getenv("UPLOAD_SPOOL_THRESHOLD", str(2 * 1024 * 1024)))
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR") or None
+UPLOAD_SIZE_LIMITS = {
+    "image": int(os.getenv("UPLOAD_MAX_IMAGE_BYTES", str(25 * 1024 * 1024))),
+    "pdf": int(os.getenv("UPLOAD_MAX_PDF_BYTES", str(100 * 1024 * 1024))),
+    "document": int(os.getenv("UPLOAD_MAX_DOCUMENT_BYTES", str(25 * 1024 * 1024))),
+    "text": int(os.getenv("UPLOAD_MAX_TEXT_BYTES", str(5 * 1024 * 1024))),
+}
+# Room for multipart boundaries and form fields on top of the largest upload limit
+UPLOAD_REQUEST_OVERHEAD = 64 * 1024
+UPLOAD_REQUEST_MAX_BYTES = max(UPLOAD_SIZE_LIMITS.values()) + UPLOAD_REQUEST_OVERHEAD
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload grows past its size limit"""
+    def __init__(self, limit: int):
+        super().__init__(f"File is larger than the {limit / (1024 * 1024):g} MB limit")
+        self.limit = limit
+
+class PositionalFileReader(io.RawIOBase):
+    """Read-only stream with its own position over a dup'ed file descriptor, which it closes.
+    
+    Duplicated descriptors share one file offset, so reads use pread instead.
+    """
+    
+    def __init__(self, fd: int):
+        self._fd = fd
+        self._position = 0
+    
+    def readable(self) -> bool:
+        return True
+    
+    def seekable(self) -> bool:
+        return True
+    
+    def fileno(self) -> int:
+        return self._fd
+    
+    def readinto(self, buffer) -> int:
+        data = os.pread(self._fd, len(buffer), self._position)
+        buffer[:len(data)] = data
+        self._position += len(data)
+        return len(data)
+    
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += os.fstat(self._fd).st_size
+        self._position = max(0, offset)
+        return self._position
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def close(self):
+        if not self.closed:
+            os.close(self._fd)
+        super().close()
+
+class SpooledUpload:
+    """Upload content held in memory, or in a temp file once it outgrows UPLOAD_SPOOL_THRESHOLD"""
+    
+    def __init__(self, limit: int = None):
+        self.limit = limit
+        self.size = 0
+        self.path = None
+        self._owns_path = True
+        self._buffer = io.BytesIO()
+        self._spool = None
+        self._fd = None
+        self._hash = hashlib.sha256()
+    
+    @classmethod
+    def from_path(cls, path: str):
+        """Wrap an existing file without copying it; close() leaves the file in place"""
+        upload = cls()
+        upload.path = path
+        upload.size = os.path.getsize(path)
+        upload._owns_path = False
+        upload._buffer = None
+        upload._hash = None  # hashed on first use
+        return upload
+    
+    @classmethod
+    def from_upload_file(cls, file: UploadFile):
+        """Wrap the file Starlette spooled the upload into, without copying it.
+        
+        Starlette owns and closes that file when the request ends, so the
+        wrapper is only valid inside the request; use detach() for work that
+        outlives it.
+        """
+        upload = cls()
+        upload._owns_path = False
+        upload._hash = None  # hashed on first use, on a worker thread
+        source = file.file
+        source.seek(0, io.SEEK_END)
+        upload.size = source.tell()
+        source.seek(0)
+        if getattr(source, "_rolled", True):
+            # Rolled over to an anonymous temp file: keep our own descriptor so the file stays
+            # readable by a worker that is still running when Starlette closes it
+            upload._buffer = None
+            upload._fd = os.dup(source.fileno())
+        else:
+            upload._buffer = source._file
+        return upload
+    
+    def detach(self):
+        """A copy that owns its content, for work that outlives the wrapped request file"""
+        upload = SpooledUpload()
+        with self.open() as stream:
+            for chunk in iter(lambda: stream.read(UPLOAD_CHUNK_SIZE), b""):
+                upload.write(chunk)
+        upload.finish()
+        return upload
+    
+    def write(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.limit is not None and self.size > self.limit:
+            raise UploadTooLargeError(self.limit)
+        self._hash.update(chunk)
+        
+        if self._spool is None and self.size > UPLOAD_SPOOL_THRESHOLD:
+            self._spool = tempfile.NamedTemporaryFile(prefix="upload-", dir=UPLOAD_SPOOL_DIR, delete=False)
+            self.path = self._spool.name
+            self._spool.write(self._buffer.getbuffer())
+            self._buffer = None
+        if self._spool is not None:
+            self._spool.write(chunk)
+        else:
+            self._buffer.write(chunk)
+    
+    def finish(self):
+        """Done writing: flush the spool file so readers see all of it"""
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+    
+    @property
+    def sha256(self) -> str:
+        if self._hash is None:
+            self._hash = hashlib.sha256()
+            with self.open() as f:
+                for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
+                    self._hash.update(chunk)
+        return self._hash.hexdigest()
+    
+    @property
+    def in_memory(self) -> bool:
+        return self._buffer is not None
+    
+    def open(self):
+        """A fresh, independent binary stream over the content"""
+        if self.in_memory:
+            return io.BytesIO(self._buffer.getbuffer())
+        if self._fd is not None:
+            return io.BufferedReader(PositionalFileReader(os.dup(self._fd)), UPLOAD_CHUNK_SIZE)
+        return open(self.path, "rb")
+    
+    def close(self):
+        """Delete the spool file, if any"""
+        self.finish()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        if self.path and self._owns_path:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+def get_upload_type(file_extension: str) -> str:
+    """Size-limit class of a file extension"""
+    if file_extension in ['jpg', 'jpeg', 'png', 'gif', 'bmp', 'tiff']:
+        return "image"
+    if file_extension == 'pdf':
+        return "pdf"
+    if file_extension in ['doc', 'docx']:
+        return "document"
+    return "text"
+
+async def spool_upload(file: UploadFile, file_extension: str) -> SpooledUpload:
+    """Wrap an UploadFile's spooled content, answering 413 when it exceeds its type's limit"""
+    limit = UPLOAD_SIZE_LIMITS[get_upload_type(file_extension)]
+    upload = SpooledUpload.from_upload_file(file)
+    if upload.size > limit:
+        raise HTTPException(status_code=413, detail=str(UploadTooLargeError(limit)))
+    return upload
+
+def open_content(file_content):
+    """Readable binary stream over raw bytes or a SpooledUpload"""
+    if isinstance(file_content, SpooledUpload):
+        return file_content.open()
+    return io.BytesIO(file_content)
+
+def content_digest(file_content) -> str:
+    if isinstance(file_content, SpooledUpload):
+        return file_content.sha256
+    return hashlib.sha256(file_content).hexdigest()
+
+def content_size(file_content) -> int:
+    if isinstance(file_content, SpooledUpload):
+        return file_content.size
+    return len(file_content)
+
+@contextmanager
+def content_buffer(file_content):
+    """Bytes-like view of the content; spooled files are memory-mapped instead of read into memory"""
+    if not isinstance(file_content, SpooledUpload):
+        yield file_content
+    elif file_content.in_memory:
+        # A view of the upload's own buffer: no copy, and nothing to close while it is exported
+        view = file_content._buffer.getbuffer()
+        try:
+            yield view
+        finally:
+            view.release()
+    elif file_content.size == 0:
+        yield b""
+    else:
+        with file_content.open() as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+@contextmanager
+def content_path(file_content):
+    """Filesystem path of the content, for tools like poppler that read files"""
+    if isinstance(file_content, SpooledUpload) and file_content.path is not None:
+        yield file_content.path
+        return
+    with tempfile.NamedTemporaryFile(prefix="upload-", dir=UPLOAD_SPOOL_DIR) as f:
+        with open_content(file_content) as stream:
+            shutil.copyfileobj(stream, f, UPLOAD_CHUNK_SIZE)
+        f.flush()
+        yield f.name
+
+# Extraction result cache: keyed by the upload's SHA-256 plus the pipeline version, so
+# identical uploads skip OCR entirely and concurrent duplicates share one computation.
+# Bump OCR_PIPELINE_VERSION whenever a change alters extraction output.
+OCR_PIPELINE_VERSION = "1"
+OCR_CACHE_ENABLED = os.getenv("OCR_CACHE_ENABLED", "1") == "1"
+OCR_CACHE_MEMORY_ENTRIES = int(os.getenv("OCR_CACHE_MEMORY_ENTRIES", "256"))
+OCR_CACHE_PATH = os.getenv(
+    "OCR_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "ocr_cache.sqlite3")
+)
+OCR_CACHE_MAX_BYTES = int(os.getenv("OCR_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+# How long a duplicate request waits for the identical in-flight extraction before running its own
+OCR_COALESCE_WAIT_SECONDS = float(os.getenv("OCR_COALESCE_WAIT_SECONDS", "120"))
+
+class TwoTierCache:
+    """In-memory LRU in front of an SQLite table with size-based eviction.
+    
+    The SQLite tier is shared by every worker process pointing at the same file;
+    an empty path disables it. Entries expire after ttl_seconds (0 keeps them until evicted).
+    """
+    
+    def __init__(self, name: str, memory_entries: int, db_path: str, max_bytes: int, ttl_seconds: float = 0):
+        self.name = name
+        self.memory_entries = memory_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._memory = OrderedDict()  # key -> (value, expires_at or None)
+        self._lock = threading.Lock()
+        self._db = None
+        
+        if db_path:
+            try:
+                self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=5)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS cache_entries ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, accessed_at REAL NOT NULL, expires_at REAL)"
+                )
+                self._db.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache_entries (accessed_at)")
+                self._db.commit()
+            except Exception as e:
+                logger.warning(f"{name} disk cache unavailable, using memory only: {e}")
+                self._db = None
+    
+    def get(self, key: str):
+        return self.get_many([key]).get(key)
+    
+    def get_many(self, keys: list) -> dict:
+        """{key: value} for the keys that are cached and not expired"""
+        found = {}
+        now = time.time()
+        with self._lock:
+            missing = []
+            for key in keys:
+                entry = self._memory.get(key)
+                if entry is not None and (entry[1] is None or entry[1] > now):
+                    self._memory.move_to_end(key)
+                    found[key] = entry[0]
+                else:
+                    if entry is not None:
+                        del self._memory[key]
+                    missing.append(key)
+            
+            if self._db is None or not missing:
+                return found
+            try:
+                touched = []
+                # Stay under SQLite's bound-parameter limit
+                for start in range(0, len(missing), 500):
+                    chunk = missing[start:start + 500]
+                    rows = self._db.execute(
+                        f"SELECT key, value, expires_at FROM cache_entries WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                    ).fetchall()
+                    for key, value, expires_at in rows:
+                        if expires_at is not None and expires_at <= now:
+                            continue
+                        found[key] = value
+                        touched.append((now, key))
+                        self._remember(key, value, expires_at)
+                if touched:
+                    self._db.executemany("UPDATE cache_entries SET accessed_at = ? WHERE key = ?", touched)
+                    self._db.commit()
+            except Exception as e:
+                logger.warning(f"{self.name} disk cache read failed: {e}")
+            return found
+    
+    def set(self, key: str, value: str, ttl_seconds: float = None):
+        self.set_many([(key, value)], ttl_seconds)
+    
+    def set_many(self, items: list, ttl_seconds: float = None):
+        """Store (key, value) pairs in one transaction; ttl_seconds overrides the cache's default"""
+        ttl_seconds = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        now = time.time()
+        expires_at = now + ttl_seconds if ttl_seconds else None
+        with self._lock:
+            for key, value in items:
+                self._remember(key, value, expires_at)
+            
+            if self._db is None or not items:
+                return
+            try:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO cache_entries (key, value, size, accessed_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                    [(key, value, len(value.encode("utf-8")), now, expires_at) for key, value in items]
+                )
+                self._evict_disk()
+                self._db.commit()
+            except Exception as e:
+                logger.warning(f"{self.name} disk cache write failed: {e}")
+    
+    def _remember(self, key: str, value: str, expires_at: float = None):
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+    
+    def _evict_disk(self):
+        """Drop least recently used rows until the table fits in max_bytes"""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+        if total > self.max_bytes:
+            # Expired rows go first
+            self._db.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),))
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        
+        freed = 0
+        doomed = []
+        for key, size in self._db.execute("SELECT key, size FROM cache_entries ORDER BY accessed_at"):
+            if total - freed <= self.max_bytes:
+                break
+            doomed.append((key,))
+            freed += size
+        self._db.executemany("DELETE FROM cache_entries WHERE key = ?", doomed)
+        logger.info(f"🧹 {self.name} evicted {len(doomed)} entries ({freed} bytes)")
+
+# Memory only until open_shared_stores() runs at startup
+ocr_result_cache = TwoTierCache("OCR result cache", OCR_CACHE_MEMORY_ENTRIES, "", OCR_CACHE_MAX_BYTES)
+
+# Transliteration memo: remote answers for texts seen before, shared by all workers through the
+# SQLite tier. Local fallback answers get a short TTL so the remote answer replaces them once the
+# upstream is back.
+TRANSLITERATION_CACHE_ENABLED = os.getenv("TRANSLITERATION_CACHE_ENABLED", "1") == "1"
+TRANSLITERATION_CACHE_MEMORY_ENTRIES = int(os.getenv("TRANSLITERATION_CACHE_MEMORY_ENTRIES", "4096"))
+TRANSLITERATION_CACHE_PATH = os.getenv(
+    "TRANSLITERATION_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "transliteration_cache.sqlite3")
+)
+TRANSLITERATION_CACHE_MAX_BYTES = int(os.getenv("TRANSLITERATION_CACHE_MAX_BYTES", str(20 * 1024 * 1024)))
+TRANSLITERATION_CACHE_TTL_SECONDS = float(os.getenv("TRANSLITERATION_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+TRANSLITERATION_CACHE_FALLBACK_TTL_SECONDS = float(os.getenv("TRANSLITERATION_CACHE_FALLBACK_TTL_SECONDS", "600"))
+# Optional word list (one word or line per line) transliterated in the background at startup
+TRANSLITERATION_CACHE_WARM_PATH = os.getenv("TRANSLITERATION_CACHE_WARM_PATH", "")
+
+# Memory only until open_shared_stores() runs at startup
+transliteration_cache = TwoTierCache(
+    "Transliteration cache", TRANSLITERATION_CACHE_MEMORY_ENTRIES, "",
+    TRANSLITERATION_CACHE_MAX_BYTES, TRANSLITERATION_CACHE_TTL_SECONDS
+)
+transliteration_cache_requests_total = Counter(
+    "transliteration_cache_requests_total", "Transliteration memo cache lookups", ("result",)
+)
+
+def transliteration_cache_key(text: str) -> str:
+    return f"hi:{text}"
+
+def lookup_cached_transliterations(texts: list) -> tuple:
+    """({text: output from the lexicon or the memo cache}, distinct texts still to transliterate)"""
+    results = {}
+    unknown_texts = []
+    for text in dict.fromkeys(texts):
+        learned = lexicon_transliterate(text)
+        if learned is None:
+            unknown_texts.append(text)
+        else:
+            results[text] = learned
+    lexicon_requests_total.inc("hit", amount=len(results))
+    lexicon_requests_total.inc("miss", amount=len(unknown_texts))
+    if not TRANSLITERATION_CACHE_ENABLED or not unknown_texts:
+        return results, unknown_texts
+    
+    cached = transliteration_cache.get_many([transliteration_cache_key(text) for text in unknown_texts])
+    misses = []
+    hits = 0
+    for text in unknown_texts:
+        value = cached.get(transliteration_cache_key(text))
+        if value is None:
+            misses.append(text)
+        else:
+            results[text] = value
+            hits += 1
+    transliteration_cache_requests_total.inc("hit", amount=hits)
+    transliteration_cache_requests_total.inc("miss", amount=len(misses))
+    return results, misses
+
+def store_cached_transliterations(texts: list, outputs: list, results: dict):
+    """Add [(output, source)] for texts to results and to the cache"""
+    by_source = {"remote": [], "local": []}
+    for text, (output, source) in zip(texts, outputs):
+        results[text] = output
+        by_source[source].append((transliteration_cache_key(text), output))
+    if not TRANSLITERATION_CACHE_ENABLED:
+        return
+    transliteration_cache.set_many(by_source["remote"])
+    transliteration_cache.set_many(by_source["local"], TRANSLITERATION_CACHE_FALLBACK_TTL_SECONDS)
+
+def warm_transliteration_cache(path: str):
+    """Transliterate every uncached entry of a word list so first requests hit the cache"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            texts = [line.split('\t')[0].strip() for line in f if line.strip() and not line.startswith('#')]
+        texts = list(dict.fromkeys(texts))
+        # Checked directly so warm-up doesn't count towards the hit/miss metrics
+        cached = transliteration_cache.get_many([transliteration_cache_key(text) for text in texts])
+        misses = [text for text in texts if transliteration_cache_key(text) not in cached]
+        for start in range(0, len(misses), 500):
+            chunk = misses[start:start + 500]
+            store_cached_transliterations(chunk, remote_transliterator.submit(chunk).result(), {})
+        logger.info(f"✅ Transliteration cache warmed: {len(texts) - len(misses)} cached, {len(misses)} added from {path}")
+    except Exception as e:
+        logger.warning(f"⚠️ Could not warm transliteration cache from {path}: {e}")
+
+# key -> Future of the extraction currently computing that key
+_inflight_extractions = {}
+_inflight_extractions_lock = threading.Lock()
+
+def get_pipeline_signature() -> str:
+    """Settings that change extraction output and therefore belong in the cache key"""
+    settings = {
+        "mode": OCR_EXECUTION_MODE,
+        "engine": OCR_ENGINE,
+        "strategies": [name for name, _ in get_preprocessing_strategies()],
+        "configs": [name for name, _, _ in OCR_CONFIGS],
+        "cascade": [OCR_CASCADE_SCORE_THRESHOLD, OCR_CASCADE_TIME_BUDGET, OCR_CASCADE_PATIENCE, OCR_CASCADE_MIN_GAIN],
+        "layout": OCR_LAYOUT_LANGUAGES,
+        "prepass": OCR_SCRIPT_PREPASS,
+        "normalize": [OCR_NORMALIZE, OCR_TARGET_X_HEIGHT],
+        "selection": [OCR_SELECTION, OCR_MIN_LINE_CONFIDENCE, OCR_MAX_CANDIDATES],
+        "pdf_ocr_max_pages": PDF_OCR_MAX_PAGES,
+    }
+    digest = hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    return f"v{OCR_PIPELINE_VERSION}:{digest}"
+
+def extraction_cache_key(kind: str, file_content: bytes) -> str:
+    return f"{kind}:{get_pipeline_signature()}:{content_digest(file_content)}"
+
+def get_or_compute_extraction(kind: str, file_content: bytes, compute) -> str:
+    """Serve an extraction from the cache, or compute it once for all concurrent callers"""
+    if not OCR_CACHE_ENABLED:
+        return compute(file_content)
+    
+    key = extraction_cache_key(kind, file_content)
+    with stage_timer("cache.lookup"):
+        cached = ocr_result_cache.get(key)
+    if cached is not None:
+        logger.info(f"♻️ {kind} extraction served from cache")
+        set_ocr_metadata("cached", True)
+        extraction_cache_requests_total.inc(kind, "hit")
+        return cached
+    
+    with _inflight_extractions_lock:
+        future = _inflight_extractions.get(key)
+        is_owner = future is None
+        if is_owner:
+            future = Future()
+            _inflight_extractions[key] = future
+    
+    if not is_owner:
+        logger.info(f"⏳ Waiting for identical in-flight {kind} extraction")
+        set_ocr_metadata("coalesced", True)
+        extraction_cache_requests_total.inc(kind, "coalesced")
+        try:
+            return future.result(timeout=OCR_COALESCE_WAIT_SECONDS)
+        except FutureTimeoutError:
+            # A hung run must not pin every duplicate's lane worker as well
+            logger.warning(f"⏳ In-flight {kind} extraction still running after {OCR_COALESCE_WAIT_SECONDS:g}s, extracting again")
+            return compute(file_content)
+    extraction_cache_requests_total.inc(kind, "miss")
+    
+    try:
+        # Another caller may have finished between our cache miss and taking ownership
+        result = ocr_result_cache.get(key)
+        if result is None:
+            result = compute(file_content)
+            if result:
+                ocr_result_cache.set(key, result)
+        future.set_result(result)
+        return result
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_extractions_lock:
+            _inflight_extractions.pop(key, None)
+
 def extract_text_from_image(file_content: bytes) -> str:
+    """Extract text from image, reusing cached results for identical uploads"""
+    return get_or_compute_extraction("image", file_content, extract_text_from_image_uncached)
+
+def extract_text_from_image_array(rgb: np.ndarray) -> str:
+    """Extract text from an already decoded RGB page (e.g. a rasterized PDF page)"""
+    if not tesseract_available:
+        logger.error("Tesseract OCR not available")
+        return ""
+    result = ocr_image_array(rgb)
+    return result if result and len(result.strip()) > 5 else ""
+
+def extract_text_from_image_uncached(file_content: bytes) -> str:
     """Extract text from image using imagetotext.io approach"""
     try:
         logger.info("🔍 Starting imagetotext.io style extraction...")
@@ -1080,66 +3400,212 @@ def extract_text_from_image(file_content: bytes) -> str:
         logger.error(f"Error in image text extraction: {e}")
         return ""
 
-def extract_text_from_pdf(file_content: bytes) -> str:
-    """Extract text from PDF file with OCR fallback for scanned PDFs"""
+def parse_page_ranges(spec: str) -> list:
+    """Parse a page selection like "1-3,7,10-" into (first, last) pairs; last is None for open ranges"""
+    ranges = []
+    for part in spec.replace(" ", "").split(","):
+        if not part:
+            continue
+        match = re.fullmatch(r'(\d+)(?:-(\d*))?', part)
+        if not match:
+            raise ValueError(f"Invalid page range: {part!r}")
+        first = int(match.group(1))
+        if match.group(2) is None:
+            last = first
+        else:
+            last = int(match.group(2)) if match.group(2) else None
+        if first < 1 or (last is not None and last < first):
+            raise ValueError(f"Invalid page range: {part!r}")
+        ranges.append((first, last))
+    if not ranges:
+        raise ValueError("Empty page selection")
+    return ranges
+
+def format_page_ranges(ranges: list) -> str:
+    """Canonical form of parsed page ranges, used in cache keys"""
+    return ",".join(f"{first}-{'' if last is None else last}" for first, last in ranges)
+
+def resolve_page_ranges(ranges: list, page_count: int) -> list:
+    """Sorted 1-based page numbers selected by ranges (all pages when ranges is None)"""
+    if ranges is None:
+        return list(range(1, page_count + 1))
+    selected = set()
+    for first, last in ranges:
+        selected.update(range(first, min(page_count, last if last is not None else page_count) + 1))
+    return sorted(selected)
+
+def read_pdf_text_layer(file_content: bytes, page_numbers: list = None) -> list:
+    """Return the native text layer of the given 1-based PDF pages (all pages by default)"""
+    with stage_timer("pdf.text_layer"), open_content(file_content) as stream:
+        pdf_reader = PyPDF2.PdfReader(stream)
+        if page_numbers is None:
+            page_numbers = range(1, len(pdf_reader.pages) + 1)
+        return [pdf_reader.pages[page_number - 1].extract_text() or "" for page_number in page_numbers]
+
+def has_usable_text_layer(text: str) -> bool:
+    """Check whether native PDF text is meaningful enough to skip OCR"""
+    return bool(text.strip()) and len(text.strip()) > 50
+
+def extract_text_from_pdf(file_content: bytes, page_ranges: list = None) -> str:
+    """Extract text from PDF, reusing cached results for identical uploads and page selections"""
+    kind = "pdf" if page_ranges is None else f"pdf[{format_page_ranges(page_ranges)}]"
+    return get_or_compute_extraction(kind, file_content, lambda content: extract_text_from_pdf_uncached(content, page_ranges))
+
+def extract_text_from_pdf_uncached(file_content: bytes, page_ranges: list = None) -> str:
+    """Extract text from PDF pages, using OCR only on pages without a usable text layer"""
     try:
-        # First try native text extraction
-        pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-        text = ""
-        
-        for page_num in range(len(pdf_reader.pages)):
-            page = pdf_reader.pages[page_num]
-            page_text = page.extract_text()
-            text += page_text + "\n"
-        
-        # Check if we got meaningful text
-        if text.strip() and len(text.strip()) > 50:
-            logger.info(f"✅ Native PDF text extraction successful: {len(text)} characters")
-            return text.strip()
-        
-        # If native extraction failed or returned minimal text, try OCR fallback
-        logger.warning("Native PDF text extraction returned minimal text. Trying OCR fallback...")
-        return extract_text_from_pdf_with_ocr(file_content)
+        page_texts = [page_text for _, page_text in iter_pdf_pages(file_content, page_ranges) if page_text]
+        text = "\n\n".join(page_texts)
+        if text.strip():
+            logger.info(f"🎉 PDF text extraction complete: {len(text)} characters from {len(page_texts)} pages")
+        else:
+            logger.error("PDF text extraction failed - no text extracted from any page")
+        return text.strip()
         
+    except Exception as e:
+        logger.error(f"Error in PDF text extraction: {e}")
+        return ""
+
+def get_pdf_page_count(file_content: bytes) -> int:
+    """Number of pages, from PyPDF2 or, for PDFs it cannot parse, from poppler"""
+    try:
+        with open_content(file_content) as stream:
+            return len(PyPDF2.PdfReader(stream).pages)
+    except Exception:
+        with content_path(file_content) as pdf_path:
+            return pdfinfo_from_path(pdf_path)["Pages"]
+
+def iter_pdf_pages(file_content: bytes, page_ranges: list = None):
+    """Yield (page number, text) for the selected PDF pages, in order.
+    
+    Each page uses its native text layer when that is usable; only the
+    remaining pages are rasterized and OCR'd. Without an explicit selection at
+    most PDF_OCR_MAX_PAGES of them are OCR'd; a selection is honoured in full.
+    """
+    page_numbers = resolve_page_ranges(page_ranges, get_pdf_page_count(file_content))
+    try:
+        page_texts = read_pdf_text_layer(file_content, page_numbers)
     except Exception as e:
         logger.error(f"Error in native PDF text extraction: {e}")
-        # Try OCR fallback
-        logger.info("Trying OCR fallback for PDF...")
-        return extract_text_from_pdf_with_ocr(file_content)
+        page_texts = [""] * len(page_numbers)
+    
+    ocr_pages = [
+        page_number for page_number, page_text in zip(page_numbers, page_texts)
+        if not has_usable_text_layer(page_text)
+    ]
+    if page_ranges is None and PDF_OCR_MAX_PAGES and len(ocr_pages) > PDF_OCR_MAX_PAGES:
+        skipped_pages = ocr_pages[PDF_OCR_MAX_PAGES:]
+        ocr_pages = ocr_pages[:PDF_OCR_MAX_PAGES]
+        logger.warning(f"⚠️ Skipping OCR for {len(skipped_pages)} pages beyond PDF_OCR_MAX_PAGES={PDF_OCR_MAX_PAGES}; select them with `pages` to OCR them")
+        set_ocr_metadata("ocr_skipped_pages", skipped_pages)
+    if ocr_pages:
+        logger.info(f"📄 {len(page_numbers) - len(ocr_pages)} pages with a text layer, OCR for pages {ocr_pages}")
+    else:
+        logger.info(f"✅ Native PDF text extraction for all {len(page_numbers)} pages")
+    
+    ocr_results = iter_pdf_pages_with_ocr(file_content, ocr_pages)
+    ocr_page_set = set(ocr_pages)
+    try:
+        for page_number, page_text in zip(page_numbers, page_texts):
+            if page_number in ocr_page_set:
+                # OCR pages come back in the same order they were requested
+                yield next(ocr_results)
+            elif has_usable_text_layer(page_text):
+                yield page_number, page_text.strip()
+            else:
+                yield page_number, ""
+    finally:
+        ocr_results.close()
+
+# Scanned PDFs: pages are rasterized one at a time with a bounded number in flight
+PDF_OCR_MAX_PAGES = int(os.getenv("PDF_OCR_MAX_PAGES", "5"))
+PDF_RASTER_DPI = 300
+PDF_PAGES_IN_FLIGHT = int(os.getenv("PDF_PAGES_IN_FLIGHT", "2"))
+
+_pdf_page_executor = None
+_pdf_page_executor_lock = threading.Lock()
+
+def get_pdf_page_executor() -> ThreadPoolExecutor:
+    """Lazily create the thread pool that rasterizes and OCRs PDF pages"""
+    global _pdf_page_executor
+    with _pdf_page_executor_lock:
+        if _pdf_page_executor is None:
+            _pdf_page_executor = ThreadPoolExecutor(max_workers=PDF_PAGES_IN_FLIGHT, thread_name_prefix="pdf-page")
+        return _pdf_page_executor
+
+def rasterize_and_ocr_pdf_page(pdf_path: str, page_number: int) -> str:
+    """Render a single PDF page and hand its pixels straight to OCR"""
+    logger.info(f"Processing PDF page {page_number} with OCR...")
+    with stage_timer("pdf.rasterize"):
+        images = convert_from_path(pdf_path, dpi=PDF_RASTER_DPI, first_page=page_number, last_page=page_number)
+    if not images:
+        return ""
+    rgb = np.asarray(images[0].convert("RGB"))
+    del images
+    return extract_text_from_image_array(rgb)
+
+def iter_pdf_pages_with_ocr(file_content: bytes, page_numbers: list = None):
+    """Yield (page number, OCR text) for PDF pages (the first PDF_OCR_MAX_PAGES by default), one at a time.
+    
+    Pages are rasterized individually and OCR'd on a small thread pool, with at
+    most PDF_PAGES_IN_FLIGHT pages rendered or being read at once, so peak
+    memory does not grow with the length of the document. Pages are yielded in
+    order as soon as each is done.
+    """
+    logger.info("🔄 Converting PDF pages to images for OCR processing...")
+    
+    if page_numbers is None:
+        try:
+            page_count = get_pdf_page_count(file_content)
+        except Exception as e:
+            logger.error(f"Error in PDF OCR processing: {e}")
+            return
+        page_numbers = list(range(1, (min(page_count, PDF_OCR_MAX_PAGES) if PDF_OCR_MAX_PAGES else page_count) + 1))
+    
+    executor = get_pdf_page_executor()
+    in_flight = deque()
+    pending_pages = deque(page_numbers)
+    # poppler reads the document from disk: spooled uploads already are, bytes are written out once
+    with content_path(file_content) as pdf_path:
+        try:
+            while pending_pages or in_flight:
+                while pending_pages and len(in_flight) < PDF_PAGES_IN_FLIGHT:
+                    # Each page carries the request's context (metadata, stage timings) into its thread
+                    context = contextvars.copy_context()
+                    page_number = pending_pages.popleft()
+                    in_flight.append((page_number, executor.submit(context.run, rasterize_and_ocr_pdf_page, pdf_path, page_number)))
+                
+                page_number, future = in_flight.popleft()
+                try:
+                    page_text = future.result()
+                except Exception as e:
+                    logger.error(f"Error in PDF OCR processing of page {page_number}: {e}")
+                    page_text = ""
+                
+                if page_text:
+                    logger.info(f"✅ Page {page_number} OCR successful: {len(page_text)} characters")
+                else:
+                    logger.warning(f"⚠️ Page {page_number} OCR returned no text")
+                
+                yield page_number, page_text
+        finally:
+            # The consumer stopped early (e.g. a cancelled job): don't render pages nobody will read
+            for _, future in in_flight:
+                future.cancel()
 
 def extract_text_from_pdf_with_ocr(file_content: bytes) -> str:
     """Extract text from scanned PDF using OCR"""
     try:
-        logger.info("🔄 Converting PDF pages to images for OCR processing...")
-        
-        # Convert PDF to images
-        pdf_images = convert_from_bytes(file_content, dpi=300, first_page=1, last_page=5)
-        
-        if not pdf_images:
-            logger.error("Failed to convert PDF to images")
-            return ""
-        
         all_text = ""
+        page_count = 0
         
-        for i, image in enumerate(pdf_images):
-            logger.info(f"Processing PDF page {i + 1} with OCR...")
-            
-            # Convert PIL image to bytes
-            img_buffer = io.BytesIO()
-            image.save(img_buffer, format='PNG')
-            img_bytes = img_buffer.getvalue()
-            
-            # Use the existing OCR system
-            page_text = extract_text_from_image(img_bytes)
-            
+        for _, page_text in iter_pdf_pages_with_ocr(file_content):
+            page_count += 1
             if page_text:
                 all_text += page_text + "\n\n"
-                logger.info(f"✅ Page {i + 1} OCR successful: {len(page_text)} characters")
-            else:
-                logger.warning(f"⚠️ Page {i + 1} OCR returned no text")
         
         if all_text.strip():
-            logger.info(f"🎉 PDF OCR processing complete: {len(all_text)} total characters from {len(pdf_images)} pages")
+            logger.info(f"🎉 PDF OCR processing complete: {len(all_text)} total characters from {page_count} pages")
             return all_text.strip()
         else:
             logger.error("PDF OCR processing failed - no text extracted from any page")
@@ -1150,9 +3616,14 @@ def extract_text_from_pdf_with_ocr(file_content: bytes) -> str:
         return ""
 
 def extract_text_from_docx(file_content: bytes) -> str:
+    """Extract text from Word document, reusing cached results for identical uploads"""
+    return get_or_compute_extraction("docx", file_content, extract_text_from_docx_uncached)
+
+def extract_text_from_docx_uncached(file_content: bytes) -> str:
     """Extract text from Word document"""
     try:
-        doc = docx.Document(io.BytesIO(file_content))
+        with open_content(file_content) as stream:
+            doc = docx.Document(stream)
         text = ""
         
         for paragraph in doc.paragraphs:
@@ -1170,26 +3641,624 @@ def extract_text_from_txt(file_content: bytes) -> str:
         # Try different encodings
         encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
         
-        for encoding in encodings:
-            try:
-                text = file_content.decode(encoding)
-                return text.strip()
-            except UnicodeDecodeError:
-                continue
-        
-        # If all encodings fail, use utf-8 with error handling
-        text = file_content.decode('utf-8', errors='replace')
-        return text.strip()
+        with content_buffer(file_content) as buffer:
+            for encoding in encodings:
+                try:
+                    text = str(buffer, encoding)
+                    return text.strip()
+                except UnicodeDecodeError:
+                    continue
+            
+            # If all encodings fail, use utf-8 with error handling
+            text = str(buffer, 'utf-8', errors='replace')
+            return text.strip()
         
     except Exception as e:
         logger.error(f"Error extracting text from TXT: {e}")
         return ""
 
+# Executor lanes: blocking work runs off the event loop, with one bounded lane per work class
+# so a burst of OCR uploads can never starve the lightweight text endpoints.
+EXECUTOR_LANE_SETTINGS = {
+    # lane: (workers, max queued jobs, Retry-After seconds)
+    "ocr": (int(os.getenv("OCR_LANE_WORKERS", "2")), int(os.getenv("OCR_LANE_QUEUE", "8")), 10),
+    "pdf": (int(os.getenv("PDF_LANE_WORKERS", "1")), int(os.getenv("PDF_LANE_QUEUE", "4")), 30),
+    "text": (int(os.getenv("TEXT_LANE_WORKERS", "8")), int(os.getenv("TEXT_LANE_QUEUE", "256")), 1),
+}
+
+class LaneFullError(Exception):
+    """Raised when an executor lane has no room for another job"""
+    def __init__(self, lane):
+        super().__init__(f"{lane.name} lane is full ({lane.pending} pending)")
+        self.lane = lane
+
+class ExecutorLane:
+    """Thread pool with bounded admission for one class of blocking work"""
+    
+    def __init__(self, name: str, workers: int, max_queue: int, retry_after: int):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self.pending = 0  # running + queued jobs
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{name}-lane")
+    
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self.pending - self.workers)
+    
+    def submit(self, fn, *args):
+        """Queue fn(*args) on this lane, or raise LaneFullError if the queue is full"""
+        with self._lock:
+            if self.pending >= self.workers + self.max_queue:
+                raise LaneFullError(self)
+            self.pending += 1
+        
+        # Carry the caller's context (request-scoped state) into the worker thread
+        context = contextvars.copy_context()
+        try:
+            future = self._executor.submit(context.run, fn, *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+    
+    def _release(self, _future=None):
+        with self._lock:
+            self.pending -= 1
+
+EXECUTOR_LANES = {
+    name: ExecutorLane(name, workers, max_queue, retry_after)
+    for name, (workers, max_queue, retry_after) in EXECUTOR_LANE_SETTINGS.items()
+}
+
+async def run_in_lane(lane_name: str, fn, *args):
+    """Run blocking work on an executor lane, answering 429 when the lane is saturated"""
+    try:
+        future = EXECUTOR_LANES[lane_name].submit(fn, *args)
+    except LaneFullError as e:
+        logger.warning(f"🚦 Rejecting request: {e}")
+        raise HTTPException(
+            status_code=429,
+            detail=f"Server is busy with {lane_name} work, please retry shortly",
+            headers={"Retry-After": str(e.lane.retry_after)}
+        )
+    return await asyncio.wrap_future(future)
+
+def get_extractor(file_extension: str):
+    """Return (description, extractor, executor lane) for a file type, or None if unsupported"""
+    if file_extension in ['jpg', 'jpeg', 'png', 'gif', 'bmp', 'tiff']:
+        return "image file with OCR", extract_text_from_image, "ocr"
+    if file_extension == 'pdf':
+        return "PDF file", extract_text_from_pdf, "pdf"
+    if file_extension in ['doc', 'docx']:
+        return "Word document", extract_text_from_docx, "text"
+    if file_extension == 'txt':
+        return "text file", extract_text_from_txt, "text"
+    return None
+
+# Asynchronous extraction jobs: long OCR work runs outside the HTTP request and is polled or streamed
+JOB_RESULT_TTL_SECONDS = int(os.getenv("JOB_RESULT_TTL_SECONDS", "3600"))
+JOB_STREAM_POLL_INTERVAL = 0.25
+JOB_FINAL_STATUSES = ("completed", "failed", "cancelled")
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+def iter_extracted_pages(file_content: bytes, file_extension: str, page_ranges: list = None):
+    """Yield (page number, text) for any supported upload; non-PDF files are a single page"""
+    if file_extension == 'pdf':
+        yield from iter_pdf_pages(file_content, page_ranges)
+    else:
+        _, extract_fn, _ = get_extractor(file_extension)
+        yield 1, extract_fn(file_content)
+
+def run_extraction_job(job_id: str, file_content: bytes, file_extension: str, page_ranges: list = None):
+    """Lane worker: extract an upload page by page, publishing progress on the job.
+    
+    The upload is closed by a done-callback on the job's future, which also
+    runs when the job is cancelled before it starts.
+    """
+    # The submitting request has already been answered; stage metrics still go to the histograms
+    request_stage_timings.set(None)
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is None or job["cancel_requested"]:
+            return
+        job["status"] = "running"
+    
+    try:
+        for page_number, page_text in iter_extracted_pages(file_content, file_extension, page_ranges):
+            with _jobs_lock:
+                job["pages"].append({"page": page_number, "text": page_text or ""})
+                if job["cancel_requested"]:
+                    job["status"] = "cancelled"
+                    job["finished_at"] = time.time()
+                    logger.info(f"🛑 Job {job_id} cancelled after page {page_number}")
+                    return
+        
+        with _jobs_lock:
+            job["text"] = "\n\n".join(page["text"] for page in job["pages"] if page["text"])
+            job["status"] = "completed"
+            job["finished_at"] = time.time()
+        logger.info(f"✅ Job {job_id} completed: {len(job['pages'])} pages")
+        
+    except Exception as e:
+        logger.error(f"Job {job_id} failed: {e}")
+        with _jobs_lock:
+            job["status"] = "failed"
+            job["error"] = str(e)
+            job["finished_at"] = time.time()
+
+def purge_expired_jobs():
+    """Drop finished jobs whose results are older than JOB_RESULT_TTL_SECONDS"""
+    now = time.time()
+    with _jobs_lock:
+        expired = [
+            job_id for job_id, job in _jobs.items()
+            if job["finished_at"] is not None and now - job["finished_at"] > JOB_RESULT_TTL_SECONDS
+        ]
+        for job_id in expired:
+            del _jobs[job_id]
+    if expired:
+        logger.info(f"🧹 Expired {len(expired)} finished jobs")
+
+def get_job_view(job: dict) -> dict:
+    """Public representation of a job"""
+    with _jobs_lock:
+        return {
+            "job_id": job["job_id"],
+            "filename": job["filename"],
+            "status": job["status"],
+            "pages_completed": len(job["pages"]),
+            "pages": list(job["pages"]),
+            "text": job["text"],
+            "error": job["error"],
+            "created_at": job["created_at"],
+            "finished_at": job["finished_at"],
+            "expires_at": job["finished_at"] + JOB_RESULT_TTL_SECONDS if job["finished_at"] else None,
+        }
+
+def get_page_ranges_or_400(pages: str, file_extension: str):
+    """Validate the optional `pages` form field; None means every page"""
+    if not pages:
+        return None
+    if file_extension != 'pdf':
+        raise HTTPException(status_code=400, detail="Page selection is only supported for PDF files")
+    try:
+        return parse_page_ranges(pages)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def get_job_or_404(job_id: str) -> dict:
+    purge_expired_jobs()
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job
+
+# Songbook index: large PDFs are split into songs once, then served song by song
+SONGBOOK_DIR = os.getenv(
+    "SONGBOOK_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "songbooks")
+)
+# PDFs are only kept while some of their pages still await OCR; least recently used songbooks go first
+SONGBOOK_MAX_BYTES = int(os.getenv("SONGBOOK_MAX_BYTES", str(1024 * 1024 * 1024)))
+# "12. Title", "१२) शीर्षक"
+NUMBERED_TITLE_PATTERN = re.compile(r'^\s*(\d{1,4})\s*[.)\-–:।]\s*(\S.{0,79})$')
+# "Song 12: Title", "भजन १२", "Bhajan No. 12 - Title"
+LABELLED_TITLE_PATTERN = re.compile(
+    r'^\s*(?:song|bhajan|kirtan|hymn|भजन|कीर्तन|गीत|पद)\s*(?:no\.?|number|संख्या|क्रमांक)?\s*[:#]?\s*(\d{1,4})\s*[.)\-–:।]?\s*(.{0,80})$',
+    re.IGNORECASE
+)
+# A page with more headings than this is a table of contents, not songs
+SONG_HEADINGS_PER_PAGE_MAX = 4
+# Headings within this many lines of the top of a page start that page
+SONG_HEADING_PAGE_TOP_LINES = 3
+# How closely a heading must match its table of contents title
+SONG_TITLE_MATCH_RATIO = 0.75
+TOC_LEADER_PATTERN = re.compile(r'[\s.…_·-]*[\d०-९]*\s*$')
+
+def find_song_headings(page_text: str) -> list:
+    """(line index, song number, title) for every song heading on a page"""
+    lines = [line.strip() for line in page_text.splitlines() if line.strip()]
+    headings = []
+    for index, line in enumerate(lines):
+        match = LABELLED_TITLE_PATTERN.match(line) or NUMBERED_TITLE_PATTERN.match(line)
+        if not match:
+            continue
+        # int() reads Devanagari digits as well
+        title = match.group(2).strip(" .-–:।")
+        if not title and index + 1 < len(lines):
+            title = lines[index + 1]
+        headings.append((index, int(match.group(1)), title))
+    return headings
+
+def normalize_song_title(title: str) -> str:
+    """Casefolded title without punctuation, for comparing headings with the contents"""
+    return " ".join(re.sub(r'[^\w\u0900-\u097F]+', " ", title).split()).casefold()
+
+def song_titles_match(heading_title: str, contents_title: str) -> bool:
+    heading_title = normalize_song_title(heading_title)
+    contents_title = normalize_song_title(contents_title)
+    if not heading_title or not contents_title:
+        return not contents_title
+    if heading_title.startswith(contents_title) or contents_title.startswith(heading_title):
+        return True
+    return difflib.SequenceMatcher(None, heading_title, contents_title).ratio() >= SONG_TITLE_MATCH_RATIO
+
+def detect_song_boundaries(page_texts: list) -> list:
+    """Split a songbook into songs from (page number, text or None) pairs.
+    
+    A table of contents page, when there is one, is the authority: only headings
+    whose number and title appear in it start songs. Without one, song numbers
+    must increase (allowing a couple of missed headings), and a heading at the
+    top of a page that repeats an earlier number marks the matches from there on
+    as numbered verses when there are several and all of them sit mid-page; they
+    are dropped and the page-top heading starts the song instead.
+    Returns [{"number", "title", "first_page", "last_page"}].
+    """
+    contents = {}
+    candidates = []
+    for page_number, page_text in page_texts:
+        headings = find_song_headings(page_text or "")
+        if len(headings) > SONG_HEADINGS_PER_PAGE_MAX:
+            for _, number, title in headings:
+                contents.setdefault(number, TOC_LEADER_PATTERN.sub("", title))
+            continue
+        for line_index, number, title in headings:
+            candidates.append({"number": number, "title": title, "first_page": page_number, "line_index": line_index})
+    
+    starts = []
+    if contents:
+        for candidate in candidates:
+            number = candidate["number"]
+            if starts and number <= starts[-1]["number"]:
+                continue
+            if number in contents and song_titles_match(candidate["title"], contents[number]):
+                starts.append(candidate)
+    if not starts:
+        for candidate in candidates:
+            number = candidate["number"]
+            last_number = starts[-1]["number"] if starts else None
+            if last_number is None or last_number < number <= last_number + 3:
+                starts.append(candidate)
+            elif candidate["line_index"] < SONG_HEADING_PAGE_TOP_LINES:
+                repeated = next((index for index, start in enumerate(starts) if start["number"] == number), None)
+                verses = starts[repeated:] if repeated is not None else []
+                if len(verses) > 1 and all(start["line_index"] >= SONG_HEADING_PAGE_TOP_LINES for start in verses):
+                    logger.info(f"📚 Song {number} restarts on page {candidate['first_page']}; "
+                                f"{len(verses)} earlier matches were numbered verses")
+                    del starts[repeated:]
+                    starts.append(candidate)
+    
+    last_page = page_texts[-1][0] if page_texts else 0
+    songs = []
+    for index, start in enumerate(starts):
+        if index + 1 < len(starts):
+            following = starts[index + 1]
+            # A heading at the top of a page means the previous song ended on the page before
+            end_page = following["first_page"] - 1 if following["line_index"] < SONG_HEADING_PAGE_TOP_LINES else following["first_page"]
+        else:
+            end_page = last_page
+        songs.append({
+            "number": start["number"],
+            "title": start["title"],
+            "first_page": start["first_page"],
+            "last_page": max(start["first_page"], end_page),
+        })
+    return songs
+
+class SongbookGoneError(Exception):
+    """The songbook was evicted from the index before its pages could be OCR'd"""
+    
+    def __init__(self, doc_id: str):
+        super().__init__(f"Songbook {doc_id[:12]} is no longer indexed")
+        self.doc_id = doc_id
+
+class SongbookIndex:
+    """Per-document page texts and song page ranges in SQLite, keyed by content hash.
+    
+    Uploaded PDFs are kept next to the index so pages without a text layer can
+    be OCR'd later, only when a song on them is requested. A PDF is deleted once
+    none of its pages await OCR, and the kept PDFs are held to max_bytes by
+    dropping the least recently used songbooks. A songbook whose pages are
+    being OCR'd holds its document lock and is never evicted meanwhile.
+    """
+    
+    def __init__(self, directory: str, max_bytes: int = 0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._document_locks = {}
+        self._db = None
+        if not directory:
+            return
+        try:
+            os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(os.path.join(directory, "index.sqlite3"), check_same_thread=False, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                "doc_id TEXT PRIMARY KEY, filename TEXT, page_count INTEGER NOT NULL, indexed_at REAL NOT NULL, "
+                "pdf_size INTEGER NOT NULL DEFAULT 0, accessed_at REAL)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "doc_id TEXT NOT NULL, page_number INTEGER NOT NULL, text TEXT, source TEXT NOT NULL, "
+                "PRIMARY KEY (doc_id, page_number))"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS songs ("
+                "doc_id TEXT NOT NULL, number INTEGER NOT NULL, title TEXT, first_page INTEGER NOT NULL, "
+                "last_page INTEGER NOT NULL, PRIMARY KEY (doc_id, number))"
+            )
+            self._db.commit()
+        except Exception as e:
+            logger.warning(f"Songbook index unavailable: {e}")
+            self._db = None
+    
+    @property
+    def available(self) -> bool:
+        return self._db is not None
+    
+    def document_path(self, doc_id: str) -> str:
+        return os.path.join(self.directory, f"{doc_id}.pdf")
+    
+    def index_document(self, file_content: bytes, filename: str) -> str:
+        """Index a PDF's text layer and songs (once per distinct file); returns its doc id"""
+        doc_id = content_digest(file_content)
+        if self.get_document(doc_id) is not None:
+            logger.info(f"📚 Songbook {doc_id[:12]} already indexed")
+            return doc_id
+        
+        started = time.monotonic()
+        page_texts = read_pdf_text_layer(file_content)
+        pages = [
+            (page_number, page_text.strip(), "native") if has_usable_text_layer(page_text)
+            else (page_number, None, "pending")
+            for page_number, page_text in enumerate(page_texts, start=1)
+        ]
+        songs = detect_song_boundaries([(page_number, text) for page_number, text, _ in pages])
+        pending = sum(1 for _, _, source in pages if source == "pending")
+        
+        # Write the file first: an indexed document must always be able to OCR its pending pages
+        pdf_size = 0
+        if pending:
+            tmp_path = f"{self.document_path(doc_id)}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f, open_content(file_content) as stream:
+                shutil.copyfileobj(stream, f, UPLOAD_CHUNK_SIZE)
+            os.replace(tmp_path, self.document_path(doc_id))
+            pdf_size = os.path.getsize(self.document_path(doc_id))
+        
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO pages (doc_id, page_number, text, source) VALUES (?, ?, ?, ?)",
+                [(doc_id, page_number, text, source) for page_number, text, source in pages]
+            )
+            self._replace_songs(doc_id, songs)
+            self._db.execute(
+                "INSERT OR REPLACE INTO documents (doc_id, filename, page_count, indexed_at, pdf_size, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (doc_id, filename, len(pages), time.time(), pdf_size, time.time())
+            )
+            self._evict_documents(doc_id)
+            self._db.commit()
+        
+        logger.info(f"📚 Indexed songbook {filename}: {len(pages)} pages, {len(songs)} songs, "
+                    f"{pending} pages awaiting OCR ({time.monotonic() - started:.2f}s)")
+        return doc_id
+    
+    def get_document(self, doc_id: str):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT filename, page_count FROM documents WHERE doc_id = ?", (doc_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE documents SET accessed_at = ? WHERE doc_id = ?", (time.time(), doc_id))
+            self._db.commit()
+            pending = self._db.execute(
+                "SELECT COUNT(*) FROM pages WHERE doc_id = ? AND source = 'pending'", (doc_id,)
+            ).fetchone()[0]
+            songs = self._db.execute(
+                "SELECT number, title, first_page, last_page FROM songs WHERE doc_id = ? ORDER BY number", (doc_id,)
+            ).fetchall()
+        return {
+            "doc_id": doc_id,
+            "filename": row[0],
+            "page_count": row[1],
+            "pending_ocr_pages": pending,
+            "songs": [
+                {"number": number, "title": title, "first_page": first_page, "last_page": last_page}
+                for number, title, first_page, last_page in songs
+            ],
+        }
+    
+    def get_song(self, doc_id: str, number: int):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT title, first_page, last_page FROM songs WHERE doc_id = ? AND number = ?", (doc_id, number)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"number": number, "title": row[0], "first_page": row[1], "last_page": row[2]}
+    
+    def get_pages(self, doc_id: str, first_page: int, last_page: int) -> list:
+        """[(page number, text or None, source)] for a page range"""
+        with self._lock:
+            return self._db.execute(
+                "SELECT page_number, text, source FROM pages WHERE doc_id = ? AND page_number BETWEEN ? AND ? "
+                "ORDER BY page_number",
+                (doc_id, first_page, last_page)
+            ).fetchall()
+    
+    def ocr_pending_pages(self, doc_id: str, page_numbers: list):
+        """OCR pages that have no text yet, store them and re-detect songs with the new text"""
+        with self._lock:
+            document_lock = self._document_locks.setdefault(doc_id, threading.Lock())
+        # One OCR run per songbook at a time; later callers find their pages already done
+        with document_lock:
+            with self._lock:
+                if self._db.execute("SELECT 1 FROM documents WHERE doc_id = ?", (doc_id,)).fetchone() is None:
+                    raise SongbookGoneError(doc_id)
+                placeholders = ",".join("?" * len(page_numbers))
+                page_numbers = [row[0] for row in self._db.execute(
+                    f"SELECT page_number FROM pages WHERE doc_id = ? AND source = 'pending' AND page_number IN ({placeholders}) "
+                    "ORDER BY page_number",
+                    (doc_id, *page_numbers)
+                )]
+            if page_numbers:
+                self._ocr_pages(doc_id, page_numbers)
+    
+    def _ocr_pages(self, doc_id: str, page_numbers: list):
+        """OCR and store pages; the caller holds the document lock"""
+        file_content = SpooledUpload.from_path(self.document_path(doc_id))
+        ocr_pages = [(page_number, page_text or "") for page_number, page_text in iter_pdf_pages_with_ocr(file_content, page_numbers)]
+        with self._lock:
+            self._db.executemany(
+                "UPDATE pages SET text = ?, source = 'ocr' WHERE doc_id = ? AND page_number = ?",
+                [(page_text, doc_id, page_number) for page_number, page_text in ocr_pages]
+            )
+            page_texts = self._db.execute(
+                "SELECT page_number, text FROM pages WHERE doc_id = ? ORDER BY page_number", (doc_id,)
+            ).fetchall()
+            self._replace_songs(doc_id, detect_song_boundaries(page_texts))
+            pending = self._db.execute(
+                "SELECT COUNT(*) FROM pages WHERE doc_id = ? AND source = 'pending'", (doc_id,)
+            ).fetchone()[0]
+            if not pending:
+                # Every page has text now: the PDF is no longer needed
+                self._db.execute("UPDATE documents SET pdf_size = 0 WHERE doc_id = ?", (doc_id,))
+                self._remove_pdf(doc_id)
+            self._db.commit()
+        logger.info(f"📚 OCR'd {len(ocr_pages)} songbook pages for {doc_id[:12]}")
+    
+    def _remove_pdf(self, doc_id: str):
+        try:
+            os.remove(self.document_path(doc_id))
+        except FileNotFoundError:
+            pass
+    
+    def _evict_documents(self, keep_doc_id: str):
+        """Drop least recently used songbooks until the kept PDFs fit in max_bytes"""
+        if not self.max_bytes:
+            return
+        total = self._db.execute("SELECT COALESCE(SUM(pdf_size), 0) FROM documents").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        
+        freed = 0
+        doomed = []
+        for doc_id, pdf_size in self._db.execute(
+            "SELECT doc_id, pdf_size FROM documents WHERE pdf_size > 0 AND doc_id != ? ORDER BY accessed_at", (keep_doc_id,)
+        ).fetchall():
+            if total - freed <= self.max_bytes:
+                break
+            # Its PDF is being OCR'd right now
+            if doc_id in self._document_locks and self._document_locks[doc_id].locked():
+                continue
+            doomed.append(doc_id)
+            freed += pdf_size
+        for doc_id in doomed:
+            for table in ("pages", "songs", "documents"):
+                self._db.execute(f"DELETE FROM {table} WHERE doc_id = ?", (doc_id,))
+            self._document_locks.pop(doc_id, None)
+            self._remove_pdf(doc_id)
+        logger.info(f"🧹 Songbook index evicted {len(doomed)} songbooks ({freed} bytes)")
+    
+    def _replace_songs(self, doc_id: str, songs: list):
+        self._db.execute("DELETE FROM songs WHERE doc_id = ?", (doc_id,))
+        self._db.executemany(
+            "INSERT OR REPLACE INTO songs (doc_id, number, title, first_page, last_page) VALUES (?, ?, ?, ?, ?)",
+            [(doc_id, song["number"], song["title"], song["first_page"], song["last_page"]) for song in songs]
+        )
+
+# Unavailable until open_shared_stores() runs at startup
+songbook_index = SongbookIndex("")
+
+def open_shared_stores():
+    """Open the SQLite-backed stores, build the suggestion index and start the cache warm-up"""
+    global lexicon, ocr_result_cache, transliteration_cache, suggestion_index, songbook_index
+    lexicon = Lexicon(LEXICON_PATH if LEXICON_ENABLED else "")
+    ocr_result_cache = TwoTierCache("OCR result cache", OCR_CACHE_MEMORY_ENTRIES, OCR_CACHE_PATH, OCR_CACHE_MAX_BYTES)
+    transliteration_cache = TwoTierCache(
+        "Transliteration cache", TRANSLITERATION_CACHE_MEMORY_ENTRIES,
+        TRANSLITERATION_CACHE_PATH if TRANSLITERATION_CACHE_ENABLED else "",
+        TRANSLITERATION_CACHE_MAX_BYTES, TRANSLITERATION_CACHE_TTL_SECONDS
+    )
+    songbook_index = SongbookIndex(SONGBOOK_DIR, SONGBOOK_MAX_BYTES)
+    suggestion_index = load_suggestion_index()
+    
+    if TRANSLITERATION_CACHE_ENABLED and TRANSLITERATION_CACHE_WARM_PATH:
+        threading.Thread(
+            target=warm_transliteration_cache, args=(TRANSLITERATION_CACHE_WARM_PATH,),
+            name="transliteration-cache-warmup", daemon=True
+        ).start()
+
+async def get_songbook_or_404(doc_id: str) -> dict:
+    if not songbook_index.available:
+        raise HTTPException(status_code=503, detail="Songbook index is unavailable")
+    document = await run_in_lane("text", songbook_index.get_document, doc_id)
+    if document is None:
+        raise HTTPException(status_code=404, detail="Songbook not found")
+    return document
+
+async def get_songbook_pages(doc_id: str, first_page: int, last_page: int) -> list:
+    """Page texts from the index, OCR'ing (once) any page in the range that has no text yet"""
+    pages = await run_in_lane("text", songbook_index.get_pages, doc_id, first_page, last_page)
+    pending = [page_number for page_number, _, source in pages if source == "pending"]
+    if pending:
+        try:
+            await run_in_lane("pdf", songbook_index.ocr_pending_pages, doc_id, pending)
+        except SongbookGoneError:
+            raise HTTPException(status_code=404, detail="Songbook not found")
+        except FileNotFoundError:
+            logger.error(f"Songbook {doc_id[:12]} has pages awaiting OCR but its PDF is missing")
+            raise HTTPException(status_code=409, detail="Songbook PDF is no longer available for OCR, upload it again")
+        pages = await run_in_lane("text", songbook_index.get_pages, doc_id, first_page, last_page)
+    return [{"page": page_number, "text": text or "", "source": source} for page_number, text, source in pages]
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "message": "YK-CSV API is running"}
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: stage and request latencies, cache lookups, lane and job gauges"""
+    lines = []
+    for metric in (stage_duration_seconds, http_request_duration_seconds, http_requests_total, extraction_cache_requests_total,
+                   remote_transliteration_requests_total, transliteration_cache_requests_total, lexicon_requests_total):
+        lines.extend(metric.render())
+    
+    for gauge, help_text, attribute in (
+        ("executor_lane_queue_depth", "Jobs waiting for a worker on each executor lane", "queue_depth"),
+        ("executor_lane_pending", "Running plus queued jobs on each executor lane", "pending"),
+    ):
+        lines.append(f"# HELP {METRICS_PREFIX}_{gauge} {help_text}")
+        lines.append(f"# TYPE {METRICS_PREFIX}_{gauge} gauge")
+        for name, lane in EXECUTOR_LANES.items():
+            lines.append(f'{METRICS_PREFIX}_{gauge}{{lane="{name}"}} {getattr(lane, attribute)}')
+    
+    with _jobs_lock:
+        job_counts = {status: 0 for status in ("queued", "running") + JOB_FINAL_STATUSES}
+        for job in _jobs.values():
+            job_counts[job["status"]] = job_counts.get(job["status"], 0) + 1
+    lines.append(f"# HELP {METRICS_PREFIX}_remote_transliteration_circuit_open Whether remote transliteration is switched to the local fallback")
+    lines.append(f"# TYPE {METRICS_PREFIX}_remote_transliteration_circuit_open gauge")
+    lines.append(f"{METRICS_PREFIX}_remote_transliteration_circuit_open {int(remote_transliterator.breaker.state == 'open')}")
+    
+    lines.append(f"# HELP {METRICS_PREFIX}_jobs Extraction jobs held in memory by status")
+    lines.append(f"# TYPE {METRICS_PREFIX}_jobs gauge")
+    for status, count in job_counts.items():
+        lines.append(f'{METRICS_PREFIX}_jobs{{status="{status}"}} {count}')
+    
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
+
 @app.post("/transliterate")
 async def transliterate_text(request: dict):
     """Convert transliteration text to Hindi using AI"""
@@ -1198,56 +4267,117 @@ async def transliterate_text(request: dict):
         if not text:
             return {"hindi_text": ""}
         
-        # Use AI-powered transliteration
-        hindi_text = ai_transliterate_to_hindi(text)
+        # Use AI-powered transliteration; awaited on the client's loop, no lane thread is held
+        hindi_text = (await transliterate_remote_async([text]))[0]
         return {"hindi_text": hindi_text}
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Transliteration API error: {e}")
         return {"hindi_text": text}  # Return original if conversion fails
 
+@app.post("/transliterate/batch")
+async def transliterate_text_batch(request: dict):
+    """Convert a list of transliteration texts to Hindi; results come back in the same order"""
+    texts = request.get("texts")
+    if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+        raise HTTPException(status_code=400, detail="texts must be a list of strings")
+    if len(texts) > TRANSLITERATE_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {TRANSLITERATE_BATCH_MAX_ITEMS} texts per batch")
+    
+    try:
+        # Duplicates are transliterated once; distinct texts share packed upstream requests
+        unique_texts = [text for text in dict.fromkeys(texts) if text]
+        results = dict(zip(unique_texts, await transliterate_remote_async(unique_texts))) if unique_texts else {}
+        return {"hindi_texts": [results.get(text, "") for text in texts]}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Batch transliteration API error: {e}")
+        return {"hindi_texts": texts}  # Return originals if conversion fails
+
+@app.post("/romanize/batch")
+async def romanize_text_batch(request: dict):
+    """Convert a list of Devanagari texts (e.g. every line of a song) to IAST or simple Roman, in order"""
+    texts = request.get("texts")
+    scheme = request.get("scheme", "iast")
+    schwa_deletion = request.get("schwa_deletion", True)
+    if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+        raise HTTPException(status_code=400, detail="texts must be a list of strings")
+    if scheme not in ROMANIZATION_SCHEMES:
+        raise HTTPException(status_code=400, detail=f"scheme must be one of: {', '.join(ROMANIZATION_SCHEMES)}")
+    if not isinstance(schwa_deletion, bool):
+        raise HTTPException(status_code=400, detail="schwa_deletion must be a boolean")
+    if len(texts) > TRANSLITERATE_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {TRANSLITERATE_BATCH_MAX_ITEMS} texts per batch")
+    
+    # Table lookups over memoized words, tens of microseconds per line; cheaper inline than a hop through the text lane
+    return {"transliterations": [romanize(text, scheme, schwa_deletion) for text in texts]}
+
+@app.get("/suggest")
+async def suggest(prefix: str = "", limit: int = SUGGEST_TOP_K):
+    """Top Devanagari completions for a Roman prefix, ranked by frequency"""
+    if limit < 1 or limit > SUGGEST_TOP_K:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {SUGGEST_TOP_K}")
+    
+    # A dict lookup; cheaper inline than a hop through the text lane
+    suggestions = suggest_transliterations(prefix, limit)
+    return JSONResponse(
+        content={"prefix": prefix, "suggestions": suggestions},
+        headers={"Cache-Control": f"public, max-age={SUGGEST_CACHE_SECONDS}"}
+    )
+
 @app.post("/extract-text")
-async def extract_text(file: UploadFile = File(...)):
-    """Extract text from uploaded file"""
+async def extract_text(file: UploadFile = File(...), pages: str = Form(None)):
+    """Extract text from uploaded file, optionally only some PDF pages (e.g. pages="1-3,7")"""
     try:
         if not file.filename:
             raise HTTPException(status_code=400, detail="No file provided")
         
-        # Read file content
-        file_content = await file.read()
         file_extension = file.filename.lower().split('.')[-1]
         
-        logger.info(f"Processing file: {file.filename} (type: {file_extension}, size: {len(file_content)} bytes)")
-        
         # Extract text based on file type
+        extractor = get_extractor(file_extension)
+        if extractor is None:
+            raise HTTPException(status_code=400, detail=f"Unsupported file type: {file_extension}")
+        description, extract_fn, lane_name = extractor
+        page_ranges = get_page_ranges_or_400(pages, file_extension)
+        
+        # Stream the upload in; large files go to a spool file rather than memory
+        file_content = await spool_upload(file, file_extension)
+        logger.info(f"Processing file: {file.filename} (type: {file_extension}, size: {file_content.size} bytes)")
+        
+        metadata = {}
+        ocr_request_metadata.set(metadata)
+        
         try:
-            if file_extension in ['jpg', 'jpeg', 'png', 'gif', 'bmp', 'tiff']:
-                logger.info("Processing image file with OCR...")
-                text = extract_text_from_image(file_content)
-            elif file_extension == 'pdf':
-                logger.info("Processing PDF file...")
-                text = extract_text_from_pdf(file_content)
-            elif file_extension in ['doc', 'docx']:
-                logger.info("Processing Word document...")
-                text = extract_text_from_docx(file_content)
-            elif file_extension == 'txt':
-                logger.info("Processing text file...")
-                text = extract_text_from_txt(file_content)
+            logger.info(f"Processing {description}...")
+            if page_ranges is None:
+                text = await run_in_lane(lane_name, extract_fn, file_content)
             else:
-                raise HTTPException(status_code=400, detail=f"Unsupported file type: {file_extension}")
+                text = await run_in_lane(lane_name, extract_fn, file_content, page_ranges)
             
             logger.info(f"Text extraction completed. Length: {len(text) if text else 0} characters")
             
+        except HTTPException:
+            raise
         except Exception as extraction_error:
             logger.error(f"Text extraction failed: {extraction_error}")
             raise HTTPException(status_code=500, detail=f"Text extraction failed: {str(extraction_error)}")
+        finally:
+            file_content.close()
         
         if not text:
             logger.warning("No text extracted from file")
             raise HTTPException(status_code=400, detail="No text could be extracted from the file")
         
         logger.info("Text extraction successful")
-        return {"extracted_text": text}
+        response = {"extracted_text": text}
+        if metadata:
+            response["ocr_metadata"] = metadata
+        return response
         
     except HTTPException:
         raise
@@ -1255,6 +4385,152 @@ async def extract_text(file: UploadFile = File(...)):
         logger.error(f"Unexpected error processing file: {e}")
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
+@app.post("/jobs")
+async def submit_job(file: UploadFile = File(...), pages: str = Form(None)):
+    """Submit an extraction job and return immediately with its id"""
+    if not file.filename:
+        raise HTTPException(status_code=400, detail="No file provided")
+    
+    file_extension = file.filename.lower().split('.')[-1]
+    extractor = get_extractor(file_extension)
+    if extractor is None:
+        raise HTTPException(status_code=400, detail=f"Unsupported file type: {file_extension}")
+    _, _, lane_name = extractor
+    page_ranges = get_page_ranges_or_400(pages, file_extension)
+    
+    purge_expired_jobs()
+    # The job outlives this request and Starlette closes the request's file when it ends
+    request_content = await spool_upload(file, file_extension)
+    file_content = await asyncio.to_thread(request_content.detach)
+    job_id = uuid.uuid4().hex
+    job = {
+        "job_id": job_id,
+        "filename": file.filename,
+        "status": "queued",
+        "pages": [],
+        "text": None,
+        "error": None,
+        "created_at": time.time(),
+        "finished_at": None,
+        "cancel_requested": False,
+        "future": None,
+    }
+    
+    with _jobs_lock:
+        _jobs[job_id] = job
+    try:
+        job["future"] = EXECUTOR_LANES[lane_name].submit(run_extraction_job, job_id, file_content, file_extension, page_ranges)
+        # Runs when the job finishes and also when it is cancelled before it ever started
+        job["future"].add_done_callback(lambda _future: file_content.close())
+    except LaneFullError as e:
+        with _jobs_lock:
+            del _jobs[job_id]
+        file_content.close()
+        logger.warning(f"🚦 Rejecting job: {e}")
+        raise HTTPException(
+            status_code=429,
+            detail=f"Server is busy with {lane_name} work, please retry shortly",
+            headers={"Retry-After": str(e.lane.retry_after)}
+        )
+    
+    logger.info(f"📥 Queued job {job_id} for {file.filename} on the {lane_name} lane")
+    return JSONResponse(status_code=202, content={"job_id": job_id, "status": "queued"})
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Poll the status and per-page results of an extraction job"""
+    return get_job_view(get_job_or_404(job_id))
+
+@app.get("/jobs/{job_id}/stream")
+async def stream_job(job_id: str):
+    """Stream each page's text as NDJSON as soon as it is extracted"""
+    job = get_job_or_404(job_id)
+    
+    async def job_events():
+        sent = 0
+        while True:
+            with _jobs_lock:
+                new_pages = job["pages"][sent:]
+                status = job["status"]
+                error = job["error"]
+            for page in new_pages:
+                yield json.dumps({"event": "page", **page}, ensure_ascii=False) + "\n"
+            sent += len(new_pages)
+            if status in JOB_FINAL_STATUSES:
+                yield json.dumps({"event": "status", "status": status, "error": error}) + "\n"
+                return
+            await asyncio.sleep(JOB_STREAM_POLL_INTERVAL)
+    
+    return StreamingResponse(job_events(), media_type="application/x-ndjson")
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job; running jobs stop after the current page"""
+    job = get_job_or_404(job_id)
+    with _jobs_lock:
+        if job["status"] not in JOB_FINAL_STATUSES:
+            job["cancel_requested"] = True
+            if job["future"] is not None and job["future"].cancel():
+                job["status"] = "cancelled"
+                job["finished_at"] = time.time()
+    logger.info(f"🛑 Cancellation requested for job {job_id}")
+    return get_job_view(job)
+
+@app.post("/songbooks")
+async def index_songbook(file: UploadFile = File(...)):
+    """Index a PDF songbook into songs; uploading the same file again returns the existing index"""
+    if not file.filename or file.filename.lower().split('.')[-1] != 'pdf':
+        raise HTTPException(status_code=400, detail="Songbooks must be PDF files")
+    if not songbook_index.available:
+        raise HTTPException(status_code=503, detail="Songbook index is unavailable")
+    
+    file_content = await spool_upload(file, "pdf")
+    try:
+        doc_id = await run_in_lane("pdf", songbook_index.index_document, file_content, file.filename)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Songbook indexing failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Songbook indexing failed: {str(e)}")
+    finally:
+        file_content.close()
+    return await get_songbook_or_404(doc_id)
+
+@app.get("/songbooks/{doc_id}")
+async def get_songbook(doc_id: str, title: str = None):
+    """List a songbook's songs and page ranges, optionally filtered by a title substring"""
+    document = await get_songbook_or_404(doc_id)
+    if title:
+        needle = title.casefold()
+        document["songs"] = [song for song in document["songs"] if needle in (song["title"] or "").casefold()]
+    return document
+
+@app.get("/songbooks/{doc_id}/songs/{number}")
+async def get_songbook_song(doc_id: str, number: int):
+    """Text of one song, served from the index (pages without a text layer are OCR'd on first request)"""
+    await get_songbook_or_404(doc_id)
+    song = await run_in_lane("text", songbook_index.get_song, doc_id, number)
+    if song is None:
+        raise HTTPException(status_code=404, detail=f"Song {number} not found")
+    
+    pages = await get_songbook_pages(doc_id, song["first_page"], song["last_page"])
+    # Headings found on freshly OCR'd pages can move the song's boundaries
+    updated = await run_in_lane("text", songbook_index.get_song, doc_id, number)
+    if updated and (updated["first_page"], updated["last_page"]) != (song["first_page"], song["last_page"]):
+        song = updated
+        pages = await get_songbook_pages(doc_id, song["first_page"], song["last_page"])
+    song["pages"] = pages
+    song["text"] = "\n\n".join(page["text"] for page in pages if page["text"])
+    return song
+
+@app.get("/songbooks/{doc_id}/pages/{page_number}")
+async def get_songbook_page(doc_id: str, page_number: int):
+    """Text of a single songbook page"""
+    document = await get_songbook_or_404(doc_id)
+    if not 1 <= page_number <= document["page_count"]:
+        raise HTTPException(status_code=404, detail="Page not found")
+    return (await get_songbook_pages(doc_id, page_number, page_number))[0]
+
 @app.post("/parse-text")
 async def parse_text(data: dict):
     """Parse text using smart backend parsing logic"""
@@ -1279,9 +4555,67 @@ async def parse_text(data: dict):
         logger.error(f"Error parsing text: {e}")
         raise HTTPException(status_code=500, detail=f"Text parsing failed: {str(e)}")
 
+def build_csv_content(title: str, lyrics: list) -> str:
+    """Build the VMix CSV text from a title and lyric rows"""
+    # Create CSV content
+    csv_lines = []
+    
+    # Add title row if provided
+    if title:
+        csv_lines.append(f'"{title}",')
+    
+    # Add lyrics rows
+    for lyric in lyrics:
+        hindi = lyric.get("hindi", "")
+        transliteration = lyric.get("transliteration", "")
+        translation = lyric.get("translation", "")
+        
+        # Combine Hindi and transliteration with ALT+ENTER (represented as \n)
+        hindi_transliteration = f"{hindi}\n{transliteration}" if transliteration else hindi
+        
+        # Escape quotes and create CSV row
+        hindi_transliteration_escaped = hindi_transliteration.replace('"', '""')
+        translation_escaped = translation.replace('"', '""')
+        csv_lines.append(f'"{hindi_transliteration_escaped}","{translation_escaped}"')
+    
+    return "\n".join(csv_lines)
+
+@app.get("/lexicon/export")
+async def export_lexicon():
+    """Download the learned lexicon as roman<TAB>devanagari<TAB>count lines"""
+    entries = await run_in_lane("text", lexicon.entries)
+    content = "".join(f"{roman}\t{devanagari}\t{count}\n" for roman, devanagari, count in entries)
+    return PlainTextResponse(
+        content, media_type="text/tab-separated-values; charset=utf-8",
+        headers={"Content-Disposition": 'attachment; filename="lexicon.tsv"'}
+    )
+
+@app.post("/lexicon/import")
+async def import_lexicon(file: UploadFile = File(...)):
+    """Merge a lexicon exported by another site; counts are added to ours"""
+    global suggestion_index
+    file_content = await spool_upload(file, "tsv")
+    try:
+        with open_content(file_content) as stream:
+            pairs = await run_in_lane("text", read_lexicon_entries, stream)
+        if pairs:
+            await run_in_lane("text", lexicon.add_pairs, pairs)
+            suggestion_index = await run_in_lane("text", load_suggestion_index)
+        logger.info(f"📖 Imported {len(pairs)} lexicon entries from {file.filename}")
+        return {"imported": len(pairs), "words": len(lexicon)}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Lexicon import failed: {e}")
+        raise HTTPException(status_code=400, detail=f"Could not import lexicon: {str(e)}")
+    finally:
+        file_content.close()
+
 @app.post("/generate-csv")
 async def generate_csv(data: dict):
     """Generate CSV from lyrics data"""
+    global suggestion_index
     try:
         title = data.get("title", "")
         lyrics = data.get("lyrics", [])
@@ -1289,31 +4623,20 @@ async def generate_csv(data: dict):
         if not lyrics:
             raise HTTPException(status_code=400, detail="No lyrics data provided")
         
-        # Create CSV content
-        csv_lines = []
-        
-        # Add title row if provided
-        if title:
-            csv_lines.append(f'"{title}",')
+        csv_content = await run_in_lane("text", build_csv_content, title, lyrics)
         
-        # Add lyrics rows
-        for lyric in lyrics:
-            hindi = lyric.get("hindi", "")
-            transliteration = lyric.get("transliteration", "")
-            translation = lyric.get("translation", "")
-            
-            # Combine Hindi and transliteration with ALT+ENTER (represented as \n)
-            hindi_transliteration = f"{hindi}\n{transliteration}" if transliteration else hindi
-            
-            # Escape quotes and create CSV row
-            hindi_transliteration_escaped = hindi_transliteration.replace('"', '""')
-            translation_escaped = translation.replace('"', '""')
-            csv_lines.append(f'"{hindi_transliteration_escaped}","{translation_escaped}"')
-        
-        csv_content = "\n".join(csv_lines)
+        # The submitted rows were corrected by hand; learn their word pairs
+        try:
+            if await run_in_lane("text", learn_lexicon_from_lyrics, lyrics):
+                # New words become prefix suggestions right away
+                suggestion_index = await run_in_lane("text", load_suggestion_index)
+        except Exception as e:
+            logger.warning(f"Lexicon learning failed: {e}")
         
         return {"csv_content": csv_content}
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating CSV: {e}")
         raise HTTPException(status_code=500, detail=f"Error generating CSV: {str(e)}")
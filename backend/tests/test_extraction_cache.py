@@ -0,0 +1,43 @@
+"""Extraction cache keys and coalescing of identical in-flight extractions."""
+import threading
+
+import main
+
+
+def test_signature_covers_output_settings(monkeypatch):
+    signature = main.get_pipeline_signature()
+    for name, value in [
+        ("PDF_OCR_MAX_PAGES", main.PDF_OCR_MAX_PAGES + 1),
+        ("OCR_CASCADE_SCORE_THRESHOLD", main.OCR_CASCADE_SCORE_THRESHOLD + 1),
+        ("OCR_CASCADE_TIME_BUDGET", main.OCR_CASCADE_TIME_BUDGET + 1),
+        ("OCR_CASCADE_PATIENCE", main.OCR_CASCADE_PATIENCE + 1),
+        ("OCR_CASCADE_MIN_GAIN", main.OCR_CASCADE_MIN_GAIN + 1),
+        ("OCR_LAYOUT_LANGUAGES", {**main.OCR_LAYOUT_LANGUAGES, "extra": "eng"}),
+        ("get_preprocessing_strategies", lambda graph=None: [("original", "rgb")]),
+    ]:
+        with monkeypatch.context() as patch:
+            patch.setattr(main, name, value)
+            assert main.get_pipeline_signature() != signature, name
+    assert main.get_pipeline_signature() == signature
+
+
+def test_coalesced_waiter_stops_waiting_on_a_hung_extraction(monkeypatch):
+    monkeypatch.setattr(main, "OCR_CACHE_ENABLED", True)
+    monkeypatch.setattr(main, "ocr_result_cache", main.TwoTierCache("ocr", 8, "", 0))
+    monkeypatch.setattr(main, "OCR_COALESCE_WAIT_SECONDS", 0.1)
+    started = threading.Event()
+    release = threading.Event()
+
+    def hung_compute(content):
+        started.set()
+        release.wait(5)
+        return "owner"
+
+    owner = threading.Thread(target=main.get_or_compute_extraction, args=("text", b"same upload", hung_compute))
+    owner.start()
+    try:
+        assert started.wait(5)
+        assert main.get_or_compute_extraction("text", b"same upload", lambda content: "waiter") == "waiter"
+    finally:
+        release.set()
+        owner.join(5)
@@ -0,0 +1,84 @@
+"""Extraction jobs: submit, poll, NDJSON stream, cancel and expiry."""
+import json
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+import main
+
+client = TestClient(main.app)
+
+
+def submit(content: bytes, filename: str = "song.txt"):
+    return client.post("/jobs", files={"file": (filename, content, "text/plain")})
+
+
+def wait_for_status(job_id: str, statuses=main.JOB_FINAL_STATUSES) -> dict:
+    deadline = time.monotonic() + 5
+    while True:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in statuses or time.monotonic() > deadline:
+            return job
+        time.sleep(0.02)
+
+
+def test_job_lifecycle():
+    response = submit(b"Radhe Govind\nGopal Krishna\n")
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    assert response.json()["status"] == "queued"
+
+    job = wait_for_status(job_id)
+    assert job["status"] == "completed"
+    assert job["pages"] == [{"page": 1, "text": "Radhe Govind\nGopal Krishna"}]
+    assert job["text"] == "Radhe Govind\nGopal Krishna"
+    assert job["expires_at"] == job["finished_at"] + main.JOB_RESULT_TTL_SECONDS
+
+    events = [json.loads(line) for line in client.get(f"/jobs/{job_id}/stream").text.splitlines()]
+    assert events == [
+        {"event": "page", "page": 1, "text": "Radhe Govind\nGopal Krishna"},
+        {"event": "status", "status": "completed", "error": None},
+    ]
+
+    # Cancelling a finished job changes nothing
+    assert client.delete(f"/jobs/{job_id}").json()["status"] == "completed"
+
+
+def test_queued_job_can_be_cancelled(monkeypatch):
+    lane = main.ExecutorLane("text", 1, 4, 1)
+    monkeypatch.setitem(main.EXECUTOR_LANES, "text", lane)
+    release = threading.Event()
+    blocker = lane.submit(release.wait)
+    try:
+        job_id = submit(b"Radhe Govind cancelled\n").json()["job_id"]
+        assert client.get(f"/jobs/{job_id}").json()["status"] == "queued"
+
+        job = client.delete(f"/jobs/{job_id}").json()
+        assert job["status"] == "cancelled"
+        assert job["pages_completed"] == 0
+    finally:
+        release.set()
+        blocker.result(timeout=5)
+
+    events = [json.loads(line) for line in client.get(f"/jobs/{job_id}/stream").text.splitlines()]
+    assert events == [{"event": "status", "status": "cancelled", "error": None}]
+
+
+def test_finished_jobs_expire(monkeypatch):
+    job_id = submit(b"Radhe Govind expires\n").json()["job_id"]
+    assert wait_for_status(job_id)["status"] == "completed"
+
+    monkeypatch.setattr(main, "JOB_RESULT_TTL_SECONDS", 0)
+    time.sleep(0.01)
+    assert client.get(f"/jobs/{job_id}").status_code == 404
+
+
+def test_unknown_job_is_404():
+    assert client.get("/jobs/missing").status_code == 404
+    assert client.delete("/jobs/missing").status_code == 404
+
+
+def test_unsupported_file_type_is_rejected():
+    response = client.post("/jobs", files={"file": ("song.xyz", b"data", "application/octet-stream")})
+    assert response.status_code == 400
@@ -0,0 +1,43 @@
+"""Executor lanes: bounded admission and 429 + Retry-After when a lane is full."""
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+client = TestClient(main.app)
+
+
+def test_lane_admits_workers_plus_queue():
+    lane = main.ExecutorLane("test", 1, 1, 3)
+    release = threading.Event()
+    running = lane.submit(release.wait)
+    queued = lane.submit(lambda: "done")
+    assert (lane.pending, lane.queue_depth) == (2, 1)
+
+    with pytest.raises(main.LaneFullError):
+        lane.submit(lambda: "rejected")
+
+    release.set()
+    running.result(timeout=5)
+    assert queued.result(timeout=5) == "done"
+    assert lane.pending == 0
+
+
+def test_full_lane_answers_429_with_retry_after(monkeypatch):
+    lane = main.ExecutorLane("text", 1, 0, 7)
+    monkeypatch.setitem(main.EXECUTOR_LANES, "text", lane)
+    release = threading.Event()
+    blocker = lane.submit(release.wait)
+    try:
+        response = client.post("/extract-text", files={"file": ("lanes.txt", b"Radhe Govind lanes", "text/plain")})
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "7"
+    finally:
+        release.set()
+        blocker.result(timeout=5)
+
+    response = client.post("/extract-text", files={"file": ("lanes.txt", b"Radhe Govind lanes", "text/plain")})
+    assert response.status_code == 200
+    assert response.json()["extracted_text"] == "Radhe Govind lanes"
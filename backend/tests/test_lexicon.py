@@ -0,0 +1,92 @@
+"""Learned lexicon: word alignment, precedence over the built-in map, diacritics and export/import."""
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+client = TestClient(main.app)
+
+
+@pytest.fixture
+def lexicon(tmp_path, monkeypatch):
+    learned = main.Lexicon(str(tmp_path / "lexicon.sqlite3"))
+    monkeypatch.setattr(main, "lexicon", learned)
+    monkeypatch.setattr(main, "LEXICON_MIN_COUNT", 2)
+    monkeypatch.setattr(main, "suggestion_index", main.build_suggestion_index({}))
+    return learned
+
+
+def submit(hindi: str, transliteration: str, times: int = 1):
+    for _ in range(times):
+        response = client.post("/generate-csv", json={"title": "t", "lyrics": [{"hindi": hindi, "transliteration": transliteration}]})
+        assert response.status_code == 200
+
+
+def test_lines_are_aligned_word_by_word():
+    pairs = main.align_lyric_words("राधे गोविंद।\nश्याम सुंदर", "Rādhe, govind\nshyām sundar")
+    assert pairs == [("rādhe", "राधे"), ("govind", "गोविंद"), ("shyām", "श्याम"), ("sundar", "सुंदर")]
+
+
+def test_lines_that_do_not_line_up_are_skipped():
+    # Different word counts on the second line
+    assert main.align_lyric_words("राधे गोविंद\nश्याम", "radhe govind\nshyam sundar") == [("radhe", "राधे"), ("govind", "गोविंद")]
+    # A word in the wrong script
+    assert main.align_lyric_words("राधे govind", "radhe govind") == []
+
+
+def test_single_submission_is_not_used(lexicon):
+    submit("राधे", "radhe")
+    assert lexicon.get("radhe") is None
+    submit("राधे", "radhe")
+    assert lexicon.get("radhe") == "राधे"
+
+
+def test_learned_spelling_must_outvote_the_map(lexicon):
+    mapped = main.TRANSLITERATION_MAP["hari"]
+    submit("हरी", "hari", times=2)
+    assert main.transliterate_to_hindi("hari") == "हरी"
+
+    submit(mapped, "hari", times=2)
+    # A tie keeps the map's spelling
+    assert main.transliterate_to_hindi("hari") == mapped
+
+
+def test_phrases_win_over_learned_words(lexicon):
+    submit("राधेय", "radhe", times=3)
+    assert main.transliterate_to_hindi("radhe shyam") == "राधे श्याम"
+    assert main.transliterate_to_hindi("radhe") == "राधेय"
+
+
+def test_diacritics_and_unicode_forms_match(lexicon):
+    submit("दास", "dās", times=2)
+    # Typed without the macron, with a decomposed one and in capitals
+    assert lexicon.get("das") == "दास"
+    assert lexicon.get("da\u0304s") == "दास"
+    assert lexicon.get("D\u0100S") == "दास"
+
+    # Decomposed spellings are stored composed
+    lexicon.add_pairs({("sya\u0304m", "श्याम"): 2})
+    assert ("sy\u0101m", "श्याम", 2) in lexicon.entries()
+
+
+def test_learned_words_are_suggested_immediately(lexicon):
+    submit("गिरिधारी", "giridhaari")
+    assert "गिरिधारी" in client.get("/suggest", params={"prefix": "giridh"}).json()["suggestions"]
+
+
+def test_export_import_round_trip(lexicon, tmp_path, monkeypatch):
+    submit("राधे गोविंद", "rādhe govind", times=2)
+    submit("हरी", "hari")
+    exported = client.get("/lexicon/export").text
+    assert sorted(exported.splitlines()) == sorted(["govind\tगोविंद\t2", "hari\tहरी\t1", "rādhe\tराधे\t2"])
+
+    other = main.Lexicon(str(tmp_path / "other.sqlite3"))
+    monkeypatch.setattr(main, "lexicon", other)
+    response = client.post("/lexicon/import", files={"file": ("lexicon.tsv", exported.encode("utf-8"), "text/tab-separated-values")})
+    assert response.json() == {"imported": 3, "words": 3}
+    assert sorted(other.entries()) == sorted(lexicon.entries())
+    assert other.get("radhe") == "राधे"
+
+    # Importing again adds the counts
+    client.post("/lexicon/import", files={"file": ("lexicon.tsv", exported.encode("utf-8"), "text/tab-separated-values")})
+    assert ("hari", "हरी", 2) in other.entries()
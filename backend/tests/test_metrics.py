@@ -0,0 +1,70 @@
+"""Prometheus /metrics exposition and the Server-Timing header."""
+import io
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import main
+
+client = TestClient(main.app)
+
+
+def server_timing(response) -> dict:
+    entries = dict(entry.split(";dur=") for entry in response.headers["Server-Timing"].split(", "))
+    return {name: float(duration) for name, duration in entries.items()}
+
+
+def test_format_server_timing_sums_repeated_stages():
+    header = main.format_server_timing([("ocr.hin+eng", 0.010), ("decode", 0.002), ("ocr.hin+eng", 0.005)], 0.02)
+    assert header == "ocr.hin+eng;dur=15.0, decode;dur=2.0, total;dur=20.0"
+
+
+def test_format_server_timing_replaces_invalid_name_characters():
+    assert main.format_server_timing([("cache lookup/disk", 0.001)], 0.001) == "cache_lookup_disk;dur=1.0, total;dur=1.0"
+
+
+def test_every_response_has_a_total_server_timing():
+    response = client.post("/extract-text", files={"file": ("song.txt", b"Radhe Govind timing", "text/plain")})
+    assert response.status_code == 200
+    assert server_timing(response)["total"] >= 0
+
+
+@pytest.mark.skipif(not main.tesseract_available, reason="tesseract is not installed")
+def test_image_extraction_reports_its_stages(monkeypatch):
+    monkeypatch.setattr(main, "OCR_CACHE_ENABLED", False)
+    image = io.BytesIO()
+    Image.new("RGB", (200, 100), "white").save(image, "PNG")
+    response = client.post("/extract-text", files={"file": ("page.png", image.getvalue(), "image/png")})
+    assert response.status_code == 200
+    timings = server_timing(response)
+    assert "decode" in timings
+    assert any(name.startswith("ocr.") for name in timings)
+    assert any(name.startswith("preprocess.") for name in timings)
+    assert timings["total"] >= max(duration for name, duration in timings.items() if name != "total")
+
+
+def test_metrics_exposes_requests_lanes_and_jobs():
+    client.post("/extract-text", files={"file": ("song.txt", b"Radhe Govind metrics", "text/plain")})
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+
+    assert "# TYPE ykcsv_http_request_duration_seconds histogram" in body
+    assert re.search(r'^ykcsv_http_requests_total\{method="POST",path="/extract-text",status="200"\} [1-9]', body, re.M)
+    assert re.search(r'^ykcsv_http_request_duration_seconds_bucket\{method="POST",path="/extract-text",le="\+Inf"\} [1-9]', body, re.M)
+    for lane in main.EXECUTOR_LANES:
+        assert f'ykcsv_executor_lane_queue_depth{{lane="{lane}"}} ' in body
+        assert f'ykcsv_executor_lane_pending{{lane="{lane}"}} ' in body
+    for status in ("queued", "running") + main.JOB_FINAL_STATUSES:
+        assert f'ykcsv_jobs{{status="{status}"}} ' in body
+    assert "ykcsv_remote_transliteration_circuit_open " in body
+
+
+def test_job_ids_do_not_become_metric_labels():
+    client.get("/jobs/some-missing-job-id")
+    body = client.get("/metrics").text
+    assert "some-missing-job-id" not in body
+    assert 'path="/jobs/{job_id}",status="404"' in body
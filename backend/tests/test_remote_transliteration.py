@@ -0,0 +1,109 @@
+"""Remote transliteration client against a local stub of the translate endpoint."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import main
+
+
+class StubTranslateServer(ThreadingHTTPServer):
+    """Answers translate_a/single requests; `mode` is "ok", "fail" or "hang" """
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubTranslateHandler)
+        self.mode = "ok"
+        self.queries = []
+        self.release = threading.Event()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/translate_a/single"
+
+
+class StubTranslateHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)["q"][0]
+        self.server.queries.append(query)
+        if self.server.mode == "hang":
+            self.server.release.wait(10)
+            return
+        if self.server.mode == "fail":
+            self.send_response(500)
+            self.end_headers()
+            return
+        output = "\n".join(f"हि {line}" for line in query.split("\n"))
+        body = json.dumps([[[output, query, None, None]]], ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    server = StubTranslateServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("NO_PROXY", "127.0.0.1")
+    monkeypatch.setattr(main, "REMOTE_TRANSLITERATE_URL", server.url)
+    monkeypatch.setattr(main, "REMOTE_TRANSLITERATE_TIMEOUT", 0.5)
+    monkeypatch.setattr(main, "REMOTE_TRANSLITERATE_RATE", 0)
+    yield server
+    server.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+def test_lines_are_packed_into_few_requests_in_order(stub_server):
+    lines = [f"radhe govind line {index}" for index in range(300)]
+    transliterator = main.RemoteTransliterator()
+
+    results = transliterator.submit(lines).result(timeout=10)
+
+    expected_packs = main.pack_transliteration_texts(lines, main.REMOTE_TRANSLITERATE_BATCH_CHARS)
+    assert 1 < len(stub_server.queries) == len(expected_packs) <= 6
+    sent_lines = sorted((query.split("\n") for query in stub_server.queries), key=lambda pack: lines.index(pack[0]))
+    assert [line for pack in sent_lines for line in pack] == lines
+    assert results == [(f"हि {line}", "remote") for line in lines]
+
+
+def test_breaker_opens_after_failures_and_closes_after_trial(stub_server, monkeypatch):
+    monkeypatch.setattr(main, "REMOTE_TRANSLITERATE_BREAKER_FAILURES", 3)
+    monkeypatch.setattr(main, "REMOTE_TRANSLITERATE_BREAKER_SECONDS", 0.3)
+    transliterator = main.RemoteTransliterator()
+    stub_server.mode = "fail"
+
+    for _ in range(3):
+        assert transliterator.submit(["radhe"]).result(timeout=5) == [(main.transliterate_to_hindi("radhe"), "local")]
+    assert transliterator.breaker.state == "open"
+
+    # While open, nothing reaches the upstream
+    assert transliterator.submit(["govind"]).result(timeout=5)[0][1] == "local"
+    assert len(stub_server.queries) == 3
+
+    stub_server.mode = "ok"
+    time.sleep(0.35)
+    assert transliterator.breaker.state == "half_open"
+    assert transliterator.submit(["govind"]).result(timeout=5) == [("हि govind", "remote")]
+    assert len(stub_server.queries) == 4
+    assert transliterator.breaker.state == "closed"
+
+
+def test_hung_upstream_times_out_to_local_fallback(stub_server):
+    transliterator = main.RemoteTransliterator()
+    stub_server.mode = "hang"
+
+    started = time.monotonic()
+    results = transliterator.submit(["radhe govind"]).result(timeout=5)
+
+    assert results == [(main.transliterate_to_hindi("radhe govind"), "local")]
+    assert time.monotonic() - started < 2
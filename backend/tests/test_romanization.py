@@ -0,0 +1,76 @@
+"""Devanagari -> Roman: both schemes, schwa deletion, nukta spellings, dandas and digits."""
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+client = TestClient(main.app)
+
+# text, IAST, simple
+ROMANIZATIONS = [
+    ("मित्र", "mitra", "mitra"),
+    ("कृष्ण", "kṛṣṇa", "krishna"),
+    ("धर्म", "dharma", "dharma"),
+    ("श्री", "śrī", "shri"),
+    ("श्याम", "śyām", "shyam"),
+    ("स्वर्ग", "svarg", "svarg"),
+    ("सिद्ध", "siddh", "siddh"),
+    ("हंस", "haṃs", "hans"),
+    ("दुःख", "duḥkh", "duhkh"),
+    ("राधे श्याम", "rādhe śyām", "radhe shyam"),
+    # Precomposed nukta letters and base letter + U+093C spell the same sound
+    ("\u095b", "za", "za"),
+    ("\u091c\u093c", "za", "za"),
+    ("\u095eिर", "fir", "fir"),
+    ("\u092b\u093cिर", "fir", "fir"),
+    ("\u0958लम", "qalam", "qalam"),
+    ("\u0915\u093cलम", "qalam", "qalam"),
+    # Dandas and Devanagari digits
+    ("राम।", "rām|", "ram|"),
+    ("राधे॥ २॥", "rādhe|| 2||", "radhe|| 2||"),
+    ("१२३", "123", "123"),
+]
+
+
+@pytest.mark.parametrize("text, iast, simple", ROMANIZATIONS)
+def test_romanize_both_schemes(text, iast, simple):
+    assert main.romanize(text, "iast") == iast
+    assert main.romanize(text, "simple") == simple
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("श्याम", "śyāma"),
+    ("स्वर्ग", "svarga"),
+    ("मित्र", "mitra"),
+    ("राम।", "rāma|"),
+    ("\u095eिर", "fira"),
+])
+def test_schwa_deletion_can_be_turned_off(text, expected):
+    assert main.romanize(text, "iast", schwa_deletion=False) == expected
+
+
+def test_batch_keeps_order_and_options():
+    texts = ["श्याम", "", "मित्र", "श्याम"]
+    response = client.post("/romanize/batch", json={"texts": texts, "scheme": "simple"})
+    assert response.status_code == 200
+    assert response.json() == {"transliterations": ["shyam", "", "mitra", "shyam"]}
+
+    response = client.post("/romanize/batch", json={"texts": ["श्याम"], "schwa_deletion": False})
+    assert response.json() == {"transliterations": ["śyāma"]}
+
+
+@pytest.mark.parametrize("body", [
+    {},
+    {"texts": "श्याम"},
+    {"texts": ["श्याम", 1]},
+    {"texts": ["श्याम"], "scheme": "hunterian"},
+    {"texts": ["श्याम"], "schwa_deletion": "no"},
+])
+def test_batch_rejects_bad_requests(body):
+    assert client.post("/romanize/batch", json=body).status_code == 400
+
+
+def test_oversized_batch_is_413(monkeypatch):
+    monkeypatch.setattr(main, "TRANSLITERATE_BATCH_MAX_ITEMS", 2)
+    assert client.post("/romanize/batch", json={"texts": ["क", "ख"]}).status_code == 200
+    assert client.post("/romanize/batch", json={"texts": ["क", "ख", "ग"]}).status_code == 413
@@ -0,0 +1,20 @@
+"""Script pre-pass config pruning."""
+import main
+
+
+def config_names(script_counts: dict) -> list:
+    return [name for name, _, _ in main.select_ocr_configs(script_counts)]
+
+
+def test_latin_page_keeps_english_and_primary_mixed_config():
+    assert config_names({"latin": 12, "devanagari": 0}) == ["hin+eng_psm6", "eng_only_psm6"]
+
+
+def test_devanagari_page_keeps_hindi_and_primary_mixed_config():
+    assert config_names({"latin": 0, "devanagari": 9}) == ["hin+eng_psm6", "hin_only_psm6", "hin_only_legacy"]
+
+
+def test_mixed_or_unclear_page_keeps_every_config():
+    assert main.select_ocr_configs({"latin": 3, "devanagari": 4}) == main.OCR_CONFIGS
+    assert main.select_ocr_configs({"latin": 0, "devanagari": 0}) == main.OCR_CONFIGS
+
@@ -0,0 +1,53 @@
+"""Song boundary detection on songbook page texts."""
+import main
+
+
+def lyrics(count: int) -> list:
+    return [f"radhe govinda gopala line {index}" for index in range(count)]
+
+
+def page(*lines) -> str:
+    return "\n".join(lines)
+
+
+def test_numbered_verses_do_not_start_songs():
+    pages = [
+        (1, page("1. Radhe Govind", *lyrics(6))),
+        (2, page(*lyrics(4), "2. Shyama Shyam kahe", *lyrics(3), "3. Hari bol hari bol", *lyrics(3))),
+        (3, page(*lyrics(8))),
+        (4, page("2. Mere Man Mein Basa", *lyrics(6))),
+        (5, page("3. Braj Ras", *lyrics(6))),
+    ]
+    songs = main.detect_song_boundaries(pages)
+    assert [(song["number"], song["first_page"], song["last_page"]) for song in songs] == [
+        (1, 1, 3), (2, 4, 4), (3, 5, 5),
+    ]
+    assert songs[1]["title"] == "Mere Man Mein Basa"
+
+
+def test_table_of_contents_is_the_authority():
+    pages = [
+        (1, page("Contents", "1. Radhe Govind .... 1", "2. Mere Man Mein Basa .... 3",
+                 "3. Braj Ras .... 4", "4. Guru Kripa .... 5", "5. Prem Ras .... 6")),
+        (2, page("1. Radhe Govind", *lyrics(6), "2. Shyama Shyam kahe", *lyrics(3))),
+        (3, page("3. Hari bol hari bol", *lyrics(4), "2. Mere Man Mein Basa", *lyrics(4))),
+        (4, page("3. Braj Ras", *lyrics(6))),
+        (5, page("4. Guru Kripa", *lyrics(6))),
+        (6, page("5. Prem Ras", *lyrics(6))),
+    ]
+    songs = main.detect_song_boundaries(pages)
+    assert [(song["number"], song["first_page"], song["last_page"]) for song in songs] == [
+        (1, 2, 3), (2, 3, 3), (3, 4, 4), (4, 5, 5), (5, 6, 6),
+    ]
+
+
+def test_consecutive_songs_on_shared_pages():
+    pages = [
+        (1, page("1. Radhe Govind", *lyrics(3), "2. Mere Man Mein Basa", *lyrics(3))),
+        (2, page("3. Braj Ras", *lyrics(3), "4. Guru Kripa", *lyrics(3))),
+        (3, page("2. Hari bol hari bol", *lyrics(4))),
+    ]
+    songs = main.detect_song_boundaries(pages)
+    assert [(song["number"], song["first_page"], song["last_page"]) for song in songs] == [
+        (1, 1, 1), (2, 1, 1), (3, 2, 2), (4, 2, 3),
+    ]
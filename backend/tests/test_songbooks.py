@@ -0,0 +1,130 @@
+"""Songbook index: lazy OCR of pages without a text layer, eviction and the GET endpoints."""
+import io
+import os
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import main
+
+client = TestClient(main.app)
+
+
+def scanned_pdf(pages: int, shade: int = 255) -> bytes:
+    """A PDF of blank images: no text layer, so every page awaits OCR"""
+    images = [Image.new("RGB", (120, 160), (shade, shade, shade - index)) for index in range(pages)]
+    buffer = io.BytesIO()
+    images[0].save(buffer, "PDF", save_all=True, append_images=images[1:])
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    songbooks = main.SongbookIndex(str(tmp_path))
+    monkeypatch.setattr(main, "songbook_index", songbooks)
+    return songbooks
+
+
+@pytest.fixture
+def fake_ocr(monkeypatch):
+    """Record OCR'd pages; set `release` blocked to hold an OCR run open"""
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+    release.set()
+
+    def iter_pdf_pages_with_ocr(file_content, page_numbers):
+        calls.append(list(page_numbers))
+        started.set()
+        release.wait(5)
+        with open(file_content.path, "rb"):
+            pass
+        for page_number in page_numbers:
+            yield page_number, f"Radhe Govind page {page_number}"
+
+    monkeypatch.setattr(main, "iter_pdf_pages_with_ocr", iter_pdf_pages_with_ocr)
+    return calls, started, release
+
+
+def index_pdf(content: bytes, filename: str = "songbook.pdf") -> str:
+    response = client.post("/songbooks", files={"file": (filename, content, "application/pdf")})
+    assert response.status_code == 200
+    return response.json()["doc_id"]
+
+
+def write_pdf(index, content: bytes) -> str:
+    path = os.path.join(index.directory, f"upload-{len(os.listdir(index.directory))}.bin")
+    with open(path, "wb") as f:
+        f.write(content)
+    return path
+
+
+def test_pending_page_is_ocrd_once_and_pdf_released(index, fake_ocr):
+    calls, _, _ = fake_ocr
+    doc_id = index_pdf(scanned_pdf(2))
+    assert client.get(f"/songbooks/{doc_id}").json()["pending_ocr_pages"] == 2
+    assert os.path.exists(index.document_path(doc_id))
+
+    assert client.get(f"/songbooks/{doc_id}/pages/1").json() == {"page": 1, "text": "Radhe Govind page 1", "source": "ocr"}
+    assert client.get(f"/songbooks/{doc_id}/pages/1").json()["source"] == "ocr"
+    assert calls == [[1]]
+
+    client.get(f"/songbooks/{doc_id}/pages/2")
+    assert calls == [[1], [2]]
+    assert client.get(f"/songbooks/{doc_id}").json()["pending_ocr_pages"] == 0
+    assert not os.path.exists(index.document_path(doc_id))
+
+
+def test_concurrent_requests_share_one_ocr_run(index, fake_ocr):
+    calls, started, release = fake_ocr
+    doc_id = index.index_document(main.SpooledUpload.from_path(write_pdf(index, scanned_pdf(1))), "songbook.pdf")
+    release.clear()
+    first = threading.Thread(target=index.ocr_pending_pages, args=(doc_id, [1]))
+    first.start()
+    assert started.wait(5)
+    second = threading.Thread(target=index.ocr_pending_pages, args=(doc_id, [1]))
+    second.start()
+    release.set()
+    first.join(5)
+    second.join(5)
+    assert calls == [[1]]
+
+
+def test_songbook_being_ocrd_is_not_evicted(tmp_path, fake_ocr):
+    calls, started, release = fake_ocr
+    index = main.SongbookIndex(str(tmp_path), max_bytes=1)
+    busy = index.index_document(main.SpooledUpload.from_path(write_pdf(index, scanned_pdf(1, 250))), "busy.pdf")
+    release.clear()
+    ocr = threading.Thread(target=index.ocr_pending_pages, args=(busy, [1]))
+    ocr.start()
+    assert started.wait(5)
+
+    # Over max_bytes, but the only eviction candidate is mid-OCR
+    other = index.index_document(main.SpooledUpload.from_path(write_pdf(index, scanned_pdf(1, 200))), "other.pdf")
+    assert index.get_document(busy) is not None
+    release.set()
+    ocr.join(5)
+    assert index.get_pages(busy, 1, 1) == [(1, "Radhe Govind page 1", "ocr")]
+
+    # Once idle it is evicted like any other songbook
+    index.index_document(main.SpooledUpload.from_path(write_pdf(index, scanned_pdf(1, 150))), "third.pdf")
+    assert index.get_document(other) is None
+    with pytest.raises(main.SongbookGoneError):
+        index.ocr_pending_pages(other, [1])
+
+
+def test_missing_pdf_answers_409(index, fake_ocr):
+    doc_id = index_pdf(scanned_pdf(1))
+    os.remove(index.document_path(doc_id))
+    response = client.get(f"/songbooks/{doc_id}/pages/1")
+    assert response.status_code == 409
+
+
+def test_unknown_songbook_and_page_are_404(index):
+    assert client.get("/songbooks/missing").status_code == 404
+    doc_id = index_pdf(scanned_pdf(1))
+    assert client.get(f"/songbooks/{doc_id}/pages/2").status_code == 404
+    assert client.get(f"/songbooks/{doc_id}/songs/99").status_code == 404
+
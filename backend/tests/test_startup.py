@@ -0,0 +1,44 @@
+"""Import-time side effects: pool workers re-import main, so only the server's startup opens stores."""
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_backend(tmp_path, code: str) -> subprocess.CompletedProcess:
+    env = dict(
+        os.environ,
+        LEXICON_PATH=str(tmp_path / "lexicon.sqlite3"),
+        OCR_CACHE_PATH=str(tmp_path / "ocr_cache.sqlite3"),
+        TRANSLITERATION_CACHE_PATH=str(tmp_path / "transliteration_cache.sqlite3"),
+        TRANSLITERATION_CACHE_WARM_PATH=str(tmp_path / "warm.txt"),
+        SONGBOOK_DIR=str(tmp_path / "songbooks"),
+    )
+    (tmp_path / "warm.txt").write_text("radhe\n", encoding="utf-8")
+    return subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=120)
+
+
+def test_import_opens_no_stores(tmp_path):
+    result = run_backend(tmp_path, (
+        "import threading, main\n"
+        "assert main.suggestion_index == {}\n"
+        "assert not main.songbook_index.available\n"
+        "assert not any(thread.name == 'transliteration-cache-warmup' for thread in threading.enumerate())\n"
+    ))
+    assert result.returncode == 0, result.stderr
+    assert sorted(os.listdir(tmp_path)) == ["warm.txt"]
+
+
+def test_startup_opens_stores(tmp_path):
+    result = run_backend(tmp_path, (
+        "import main\n"
+        "from fastapi.testclient import TestClient\n"
+        "with TestClient(main.app):\n"
+        "    assert main.suggestion_index\n"
+        "    assert main.songbook_index.available\n"
+    ))
+    assert result.returncode == 0, result.stderr
+    created = os.listdir(tmp_path)
+    for name in ("lexicon.sqlite3", "ocr_cache.sqlite3", "transliteration_cache.sqlite3", "songbooks"):
+        assert name in created
@@ -0,0 +1,32 @@
+"""Per-thread tesserocr handle cache: bounded, least recently used handles are ended."""
+import types
+
+import main
+
+
+class FakeTessBaseAPI:
+    def __init__(self, lang, oem, path=None):
+        self.lang = lang
+        self.ended = False
+
+    def SetVariable(self, name, value):
+        pass
+
+    def End(self):
+        self.ended = True
+
+
+def test_handles_are_bounded_and_ended_on_eviction(monkeypatch):
+    monkeypatch.setattr(main, "tesserocr", types.SimpleNamespace(PyTessBaseAPI=FakeTessBaseAPI))
+    monkeypatch.setattr(main, "TESSEROCR_MAX_HANDLES", 2)
+    monkeypatch.setattr(main, "_tesserocr_handles", main.threading.local())
+
+    hin = main.get_tesserocr_api("hin", 3, {})
+    eng = main.get_tesserocr_api("eng", 3, {})
+    assert main.get_tesserocr_api("hin", 3, {}) is hin
+
+    # "eng" is now the least recently used handle
+    both = main.get_tesserocr_api("hin+eng", 3, {})
+    assert eng.ended and not hin.ended and not both.ended
+    assert main.get_tesserocr_api("hin", 3, {}) is hin
+    assert main.get_tesserocr_api("eng", 3, {}) is not eng
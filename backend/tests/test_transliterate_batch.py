@@ -0,0 +1,47 @@
+"""POST /transliterate/batch: order, de-duplication and request validation."""
+from fastapi.testclient import TestClient
+
+import main
+
+client = TestClient(main.app)
+
+
+def fake_remote(monkeypatch) -> list:
+    """Replace the remote transliteration path; returns the list of texts each call received"""
+    calls = []
+
+    async def transliterate_remote_async(texts):
+        calls.append(list(texts))
+        return [f"hi:{text}" for text in texts]
+
+    monkeypatch.setattr(main, "transliterate_remote_async", transliterate_remote_async)
+    return calls
+
+
+def test_results_keep_request_order_and_duplicates_are_sent_once(monkeypatch):
+    calls = fake_remote(monkeypatch)
+    response = client.post("/transliterate/batch", json={"texts": ["radhe", "govind", "", "radhe", "shyam", "govind"]})
+    assert response.status_code == 200
+    assert response.json() == {"hindi_texts": ["hi:radhe", "hi:govind", "", "hi:radhe", "hi:shyam", "hi:govind"]}
+    assert calls == [["radhe", "govind", "shyam"]]
+
+
+def test_empty_batch_makes_no_remote_call(monkeypatch):
+    calls = fake_remote(monkeypatch)
+    assert client.post("/transliterate/batch", json={"texts": []}).json() == {"hindi_texts": []}
+    assert client.post("/transliterate/batch", json={"texts": ["", ""]}).json() == {"hindi_texts": ["", ""]}
+    assert calls == []
+
+
+def test_texts_must_be_a_list_of_strings(monkeypatch):
+    fake_remote(monkeypatch)
+    for body in ({}, {"texts": "radhe"}, {"texts": ["radhe", 3]}, {"texts": None}):
+        assert client.post("/transliterate/batch", json=body).status_code == 400
+
+
+def test_oversized_batch_is_413(monkeypatch):
+    calls = fake_remote(monkeypatch)
+    monkeypatch.setattr(main, "TRANSLITERATE_BATCH_MAX_ITEMS", 3)
+    assert client.post("/transliterate/batch", json={"texts": ["a", "b", "c"]}).status_code == 200
+    assert client.post("/transliterate/batch", json={"texts": ["a", "b", "c", "d"]}).status_code == 413
+    assert calls == [["a", "b", "c"]]
@@ -0,0 +1,61 @@
+"""Compiled transliteration tries: phrase matching, longest character keys and punctuation."""
+import pytest
+
+import main
+
+
+@pytest.fixture(autouse=True)
+def empty_lexicon(monkeypatch):
+    monkeypatch.setattr(main, "lexicon", main.Lexicon(""))
+
+
+def test_phrase_match_takes_the_longest_key():
+    words = "sarva darshan sangraha".split()
+    assert main.match_transliteration_phrase(words, 0, "sarva") == ("सर्व दर्शन संग्रह", 2, "")
+    assert main.match_transliteration_phrase(words[:2], 0, "sarva") == ("सर्व दर्शन", 1, "")
+
+
+def test_phrase_match_stops_at_punctuation():
+    # Trailing punctuation ends the phrase after the word that carries it
+    assert main.match_transliteration_phrase("sarva darshan, sangraha".split(), 0, "sarva") == ("सर्व दर्शन", 1, ",")
+    # Leading punctuation on the next word keeps it out of the phrase
+    assert main.match_transliteration_phrase("sarva .darshan".split(), 0, "sarva") is None
+
+
+def test_phrase_match_without_a_complete_key():
+    assert main.match_transliteration_phrase(["sarva"], 0, "sarva") is None
+    assert main.match_transliteration_phrase("sarva sangraha".split(), 0, "sarva") is None
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("sarva darshan sangraha", "सर्व दर्शन संग्रह"),
+    ("Radhe Shyam", "राधे श्याम"),
+    ("kripalu ji maharaj", "कृपालु जी महाराज"),
+    # Punctuation between the words breaks the phrase
+    ("sarva darshan, sangraha", "सर्व दर्शन, " + main.transliterate_word_characters("sangraha")),
+    ("radhe, shyam", main.transliterate_word_characters("radhe") + ", " + main.transliterate_word_characters("shyam")),
+    # Punctuation around a phrase stays where it was
+    ("radhe shyam!", "राधे श्याम!"),
+    ("..radhe shyam", "..राधे श्याम"),
+    ("sarva darshan sangraha.", "सर्व दर्शन संग्रह."),
+])
+def test_phrases_and_punctuation(text, expected):
+    assert main.transliterate_to_hindi(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("lrii", "ॡ"),
+    ("lri", "ऌ"),
+    ("ai", "ऐ"),
+])
+def test_longest_character_key_wins(text, expected):
+    assert main.transliterate_word_characters(text) == expected
+
+
+def test_unmapped_characters_keep_their_case():
+    assert main.transliterate_word_characters("Q") == "Q"
+    assert main.transliterate_word_characters("xQ").endswith("Q")
+
+
+def test_repeated_words_are_converted_consistently():
+    assert main.transliterate_to_hindi("radhe shyam radhe shyam") == "राधे श्याम राधे श्याम"
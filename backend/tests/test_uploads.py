@@ -0,0 +1,150 @@
+"""Upload size limits, in-place request uploads and job spool cleanup."""
+import os
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+import main
+
+client = TestClient(main.app)
+
+
+def multipart_body(filename: str, content: bytes, boundary: str = "upload-boundary") -> bytes:
+    return (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        "Content-Type: application/octet-stream\r\n\r\n"
+    ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+
+
+def capture_job_copies(monkeypatch) -> list:
+    """Collect the copies jobs make of their uploads"""
+    spooled = []
+    detach = main.SpooledUpload.detach
+
+    def capturing_detach(upload):
+        copy = detach(upload)
+        spooled.append(copy)
+        return copy
+
+    monkeypatch.setattr(main.SpooledUpload, "detach", capturing_detach)
+    return spooled
+
+
+def test_small_text_upload_is_extracted():
+    response = client.post("/extract-text", files={"file": ("song.txt", "राधे गोविंद\nRadhe Govind\n".encode(), "text/plain")})
+    assert response.status_code == 200
+    assert response.json()["extracted_text"] == "राधे गोविंद\nRadhe Govind"
+
+
+def test_declared_content_length_over_limit_is_rejected():
+    limited = TestClient(main.RequestBodyLimitMiddleware(main.app, max_bytes=1024))
+    response = limited.post("/extract-text", files={"file": ("song.txt", b"x" * 4096, "text/plain")})
+    assert response.status_code == 413
+
+
+def test_chunked_body_over_limit_is_rejected_while_streaming(monkeypatch):
+    spooled = []
+    monkeypatch.setattr(main, "spool_upload", lambda *args: spooled.append(args))
+    limited = TestClient(main.RequestBodyLimitMiddleware(main.app, max_bytes=1024))
+    body = multipart_body("song.txt", b"x" * 64 * 1024)
+
+    def chunks():
+        for start in range(0, len(body), 256):
+            yield body[start:start + 256]
+
+    # A generator body goes out chunked, without a Content-Length to pre-check
+    response = limited.post(
+        "/extract-text",
+        content=chunks(),
+        headers={"Content-Type": "multipart/form-data; boundary=upload-boundary"},
+    )
+    assert response.status_code == 413
+    assert spooled == []
+
+
+def test_request_file_is_wrapped_in_place(monkeypatch):
+    wrapped = []
+    spool_upload = main.spool_upload
+
+    async def capturing_spool_upload(file, file_extension):
+        upload = await spool_upload(file, file_extension)
+        wrapped.append((file.file, upload, upload.sha256))
+        return upload
+
+    monkeypatch.setattr(main, "spool_upload", capturing_spool_upload)
+    # Over Starlette's 1 MB in-memory limit, so it rolled over to an anonymous temp file
+    content = ("Radhe Govind " * 100000).encode()
+    response = client.post("/extract-text", files={"file": ("song.txt", content, "text/plain")})
+    assert response.status_code == 200
+    source, upload, sha256 = wrapped[0]
+    assert source._rolled and upload.path is None
+    assert upload.size == len(content)
+    assert sha256 == main.hashlib.sha256(content).hexdigest()
+
+
+def test_readers_of_a_rolled_upload_keep_their_own_position():
+    source = main.tempfile.SpooledTemporaryFile(max_size=4)
+    source.write(b"Radhe Govind")
+    upload = main.SpooledUpload.from_upload_file(main.UploadFile(source))
+    with upload.open() as first, upload.open() as second:
+        assert first.read(5) == b"Radhe"
+        assert second.read() == b"Radhe Govind"
+        assert first.read() == b" Govind"
+    with main.content_buffer(upload) as buffer:
+        assert bytes(buffer) == b"Radhe Govind"
+    copy = upload.detach()
+    with copy.open() as stream:
+        assert stream.read() == b"Radhe Govind"
+
+    # Our descriptor outlives Starlette closing its file
+    source.close()
+    with upload.open() as stream:
+        assert stream.read() == b"Radhe Govind"
+    upload.close()
+
+
+def test_per_type_limit_is_checked_before_copying(monkeypatch):
+    monkeypatch.setitem(main.UPLOAD_SIZE_LIMITS, "text", 16)
+    response = client.post("/extract-text", files={"file": ("song.txt", b"x" * 64, "text/plain")})
+    assert response.status_code == 413
+
+
+def test_cancelled_queued_job_removes_its_spool_file(monkeypatch):
+    monkeypatch.setattr(main, "UPLOAD_SPOOL_THRESHOLD", 0)
+    spooled = capture_job_copies(monkeypatch)
+
+    # Occupy every worker of the text lane so the job stays queued
+    lane = main.EXECUTOR_LANES["text"]
+    release = threading.Event()
+    blockers = [lane.submit(release.wait) for _ in range(lane.workers)]
+    try:
+        response = client.post("/jobs", files={"file": ("song.txt", b"Radhe Govind " * 100, "text/plain")})
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+        assert os.path.exists(spooled[0].path)
+
+        response = client.delete(f"/jobs/{job_id}")
+        assert response.json()["status"] == "cancelled"
+        assert not os.path.exists(spooled[0].path)
+    finally:
+        release.set()
+        for blocker in blockers:
+            blocker.result(timeout=5)
+
+
+def test_finished_job_removes_its_spool_file(monkeypatch):
+    monkeypatch.setattr(main, "UPLOAD_SPOOL_THRESHOLD", 0)
+    spooled = capture_job_copies(monkeypatch)
+    response = client.post("/jobs", files={"file": ("song.txt", b"Radhe Govind " * 100, "text/plain")})
+    job_id = response.json()["job_id"]
+    deadline = time.monotonic() + 5
+    while client.get(f"/jobs/{job_id}").json()["status"] != "completed" and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert client.get(f"/jobs/{job_id}").json()["status"] == "completed"
+    # The done-callback runs right after the job function returns
+    deadline = time.monotonic() + 5
+    while os.path.exists(spooled[0].path) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not os.path.exists(spooled[0].path)
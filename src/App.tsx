@@ -770,17 +770,13 @@ const App: React.FC = () => {
     const suggestions: string[] = [];
     
     try {
-      // Get backend suggestion
-      const response = await fetch(`${BACKEND_URL}/transliterate`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ text: word })
-      });
-      
+      // Get ranked backend suggestions for the typed prefix (cacheable GET)
+      const response = await fetch(`${BACKEND_URL}/suggest?prefix=${encodeURIComponent(word)}`);
+
       if (response.ok) {
         const data = await response.json();
-        if (data.hindi_text) {
-          suggestions.push(data.hindi_text);
+        if (Array.isArray(data.suggestions)) {
+          suggestions.push(...data.suggestions);
         }
       }
     } catch (error) {
@@ -1136,6 +1132,37 @@ const App: React.FC = () => {
     setLyrics(prev => [...prev, { hindi: '', transliteration: '', translation: '' }]);
   }, []);
 
+  // Fill empty transliteration fields from the Hindi lines in one batch request
+  const fillTransliterations = useCallback(async () => {
+    const targets = lyrics
+      .map((lyric, index) => ({ index, hindi: lyric.hindi.trim() }))
+      .filter(({ index, hindi }) => hindi && !lyrics[index].transliteration.trim());
+    if (targets.length === 0) return;
+    
+    try {
+      const response = await fetch(`${BACKEND_URL}/romanize/batch`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ texts: targets.map(({ hindi }) => hindi), scheme: 'iast' }),
+      });
+      
+      if (!response.ok) {
+        throw new Error('Failed to transliterate Hindi lines');
+      }
+      
+      const data = await response.json();
+      setLyrics(prev => prev.map((lyric, index) => {
+        const position = targets.findIndex(target => target.index === index);
+        // Keep anything typed while the request was in flight
+        if (position === -1 || lyric.transliteration.trim()) return lyric;
+        return { ...lyric, transliteration: data.transliterations[position] ?? '' };
+      }));
+    } catch (error) {
+      console.error('Transliteration fill error:', error);
+      alert(`Transliteration failed: ${error instanceof Error ? error.message : 'Unknown error'}`);
+    }
+  }, [lyrics]);
+
   const removeLyric = useCallback((index: number) => {
     setLyrics(prev => prev.filter((_, i) => i !== index));
   }, []);
@@ -1465,6 +1492,9 @@ const App: React.FC = () => {
         <button onClick={addLyric} className="btn btn-secondary">
           ➕ Add Line
         </button>
+        <button onClick={fillTransliterations} className="btn btn-secondary">
+          🔤 Fill Transliterations
+        </button>
         <button onClick={generateCSV} className="btn btn-primary">
           📥 Download CSV
         </button>